@@ -0,0 +1,72 @@
+import argparse
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+#Columnas del export de pedidos que lee DataAnalysis
+csvColumns = ['Nro Orden', 'Fe y Hr Creac', 'Destino', 'SKU', 'Cant. Orignial Ordenada', 'Cantidad Ordenada', 'Cantidad Asignada',
+              'Cant. Empacada', 'BG Enviada', 'Cantidad Cancelada', 'CEVE', 'Fecha Comercial', 'Mes', 'Sem']
+
+def generateOrders(filePath:str, days:int=20, destinations:int=30, skus:int=200, linesPerDay:int=2000, zipfExponent:float=1.1,
+                   maxTrays:int=240, startDate:str='2023-03-01', seed:int=0) -> pd.DataFrame:
+  """Genera un CSV de pedidos sintético con el formato del export real. La demanda por SKU sigue una ley tipo Zipf
+  (probabilidad proporcional a 1/rango^zipfExponent) sobre un orden de SKUs fijo por semilla, los destinos son uniformes
+  y las cantidades en bandejas son uniformes entre 1 y maxTrays, así que parte de las líneas incluye pallets completos
+
+  Args:
+      filePath (str): Ruta del CSV a generar
+      days (int, optional): Cantidad de días consecutivos. Defaults to 20.
+      destinations (int, optional): Cantidad de destinos. Defaults to 30.
+      skus (int, optional): Cantidad de SKUs. Defaults to 200.
+      linesPerDay (int, optional): Líneas de pedido por día. Defaults to 2000.
+      zipfExponent (float, optional): Exponente de la distribución de demanda por SKU. Defaults to 1.1.
+      maxTrays (int, optional): Máximo de bandejas por línea. Defaults to 240.
+      startDate (str, optional): Primer día. Defaults to '2023-03-01'.
+      seed (int, optional): Semilla. Defaults to 0.
+
+  Returns:
+      pd.DataFrame: Líneas generadas con las columnas de csvColumns
+  """
+  rng = np.random.default_rng(seed)
+  skuCodes = 1000 + rng.permutation(skus)                           #Rango de popularidad -> código de SKU
+  weights = 1.0/np.arange(1, skus + 1)**zipfExponent
+  destinationNames = np.array([f'C{d:03d}' for d in range(destinations)])
+
+  lines = days*linesPerDay
+  dates = pd.Timestamp(startDate) + pd.to_timedelta(np.repeat(np.arange(days), linesPerDay), unit='D')
+  trays = rng.integers(1, maxTrays + 1, size=lines)
+  ordersDF = pd.DataFrame({'Nro Orden': np.arange(1, lines + 1),
+                           'Fe y Hr Creac': dates.strftime('%d/%m/%Y 08:00'),
+                           'Destino': destinationNames[rng.integers(0, destinations, size=lines)],
+                           'SKU': skuCodes[rng.choice(skus, size=lines, p=weights/weights.sum())],
+                           'Cant. Orignial Ordenada': trays, 'Cantidad Ordenada': trays, 'Cantidad Asignada': trays,
+                           'Cant. Empacada': trays, 'BG Enviada': trays, 'Cantidad Cancelada': 0, 'CEVE': 'CV1',
+                           'Fecha Comercial': dates.strftime('%d/%m/%Y'), 'Mes': dates.month, 'Sem': dates.isocalendar().week.to_numpy()},
+                          columns=csvColumns)
+  ordersDF.to_csv(filePath, sep=';', index=False, encoding='latin-1')
+  return ordersDF
+
+def buildParser() -> argparse.ArgumentParser:
+  """Parser de argumentos del generador
+
+  Returns:
+      argparse.ArgumentParser: Parser
+  """
+  parser = argparse.ArgumentParser(description='Genera un CSV de pedidos sintético')
+  parser.add_argument('csv', help='Archivo CSV a generar')
+  parser.add_argument('--days', type=int, default=20, help='Cantidad de días')
+  parser.add_argument('--destinations', type=int, default=30, help='Cantidad de destinos')
+  parser.add_argument('--skus', type=int, default=200, help='Cantidad de SKUs')
+  parser.add_argument('--lines', type=int, default=2000, help='Líneas de pedido por día')
+  parser.add_argument('--zipf', type=float, default=1.1, help='Exponente de la demanda por SKU')
+  parser.add_argument('--seed', type=int, default=0, help='Semilla')
+  return parser
+
+def main(argv:List[str]=None) -> None:
+  args = buildParser().parse_args(argv)
+  generateOrders(args.csv, days=args.days, destinations=args.destinations, skus=args.skus, linesPerDay=args.lines,
+                 zipfExponent=args.zipf, seed=args.seed)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,183 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generator import generateOrders
+from palletizing_sim import Simulation
+
+#Escalas de datos sintéticos: argumentos de generateOrders
+scales = {'small': {'days': 5, 'destinations': 20, 'skus': 100, 'linesPerDay': 1000},
+          'medium': {'days': 20, 'destinations': 40, 'skus': 300, 'linesPerDay': 4000},
+          'large': {'days': 60, 'destinations': 80, 'skus': 600, 'linesPerDay': 10000}}
+stages = ['ingestion', 'datasetForRobot', 'exitPalletDefinition', 'entryPalletSelection', 'daySimulation']
+defaultBaseline = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+def timeStage(func, repeat:int) -> List[float]:
+  """Tiempos de repeat ejecuciones de func
+
+  Args:
+      func (callable): Función sin argumentos
+      repeat (int): Cantidad de ejecuciones
+
+  Returns:
+      List[float]: Segundos de cada ejecución
+  """
+  times = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    func()
+    times += [time.perf_counter() - start]
+  return times
+
+def benchmarkScale(scale:str, filePath:str, topNumber:int, startingPallets:int, numPalletsEntry:int, repeat:int, seed:int) -> List[dict]:
+  """Mide cada etapa sobre un CSV sintético. Las etapas por día (exitPalletDefinition, entryPalletSelection,
+  daySimulation) se miden como el total de todos los días
+
+  Args:
+      scale (str): Nombre de la escala
+      filePath (str): CSV generado
+      topNumber (int): topNumber de datasetForRobot
+      startingPallets (int): Pallets de entrada de daySimulation
+      numPalletsEntry (int): Posiciones de entrada de entryPalletSelection
+      repeat (int): Repeticiones por etapa
+      seed (int): Semilla de la simulación
+
+  Returns:
+      List[dict]: Una fila por etapa. Claves: Escala, Etapa, Segundos (mínimo), Media, Repeticiones, Lineas, Dias
+  """
+  sim = Simulation(filePath, useCache=False)
+  robotDF = sim.datasetForRobot(topNumber)
+  days = list(sim.days)
+  dayDatasets = []
+  for day in days:
+    sim.getSimulationDayDataset(day, robotDF)
+    dayDatasets += [sim.dayDataset]
+  assignments = []
+  for dayDF in dayDatasets:
+    sim.setDayDataset(dayDF)
+    assignments += [sim.exitPalletDefinition()]
+
+  def exitPallets():
+    for dayDF in dayDatasets:
+      sim.setDayDataset(dayDF)
+      sim.exitPalletDefinition()
+
+  def entryPallets():
+    for assignmentDF in assignments:
+      sim.entryPalletSelection(assignmentDF, numPalletsEntry)
+
+  def simulation():
+    for k, dayDF in enumerate(dayDatasets):
+      sim.resetSimulation()
+      sim.setDayDataset(dayDF)
+      sim.daySimulation(startingPallets, rng=np.random.default_rng([seed, k]))
+    sim.resetSimulation()
+
+  funcs = {'ingestion': lambda: Simulation(filePath, useCache=False), 'datasetForRobot': lambda: sim.datasetForRobot(topNumber),
+           'exitPalletDefinition': exitPallets, 'entryPalletSelection': entryPallets, 'daySimulation': simulation}
+  rows = []
+  for stage in stages:
+    times = timeStage(funcs[stage], repeat)
+    rows += [{'Escala': scale, 'Etapa': stage, 'Segundos': min(times), 'Media': float(np.mean(times)), 'Repeticiones': repeat,
+              'Lineas': len(sim.fileDF), 'Dias': len(days)}]
+  return rows
+
+def runBenchmarks(scaleNames:List[str], workDir:str=None, topNumber:int=20, startingPallets:int=8, numPalletsEntry:int=6,
+                  repeat:int=3, seed:int=0) -> dict:
+  """Genera los CSV sintéticos de cada escala y mide todas las etapas
+
+  Args:
+      scaleNames (List[str]): Escalas a medir, claves de scales
+      workDir (str, optional): Carpeta donde se guardan los CSV. Defaults to None (carpeta temporal).
+      topNumber (int, optional): topNumber de datasetForRobot. Defaults to 20.
+      startingPallets (int, optional): Pallets de entrada de daySimulation. Defaults to 8.
+      numPalletsEntry (int, optional): Posiciones de entrada de entryPalletSelection. Defaults to 6.
+      repeat (int, optional): Repeticiones por etapa. Defaults to 3.
+      seed (int, optional): Semilla de datos y simulación. Defaults to 0.
+
+  Returns:
+      dict: meta (versiones, plataforma, parámetros) y results (filas de benchmarkScale)
+  """
+  results = []
+  with tempfile.TemporaryDirectory() as tmpDir:
+    folder = workDir if workDir is not None else tmpDir
+    for scale in scaleNames:
+      filePath = os.path.join(folder, f'orders_{scale}_{seed}.csv')
+      if not os.path.exists(filePath):
+        generateOrders(filePath, seed=seed, **scales[scale])
+      results += benchmarkScale(scale, filePath, topNumber, startingPallets, numPalletsEntry, repeat, seed)
+
+  meta = {'fecha': datetime.datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+          'numpy': np.__version__, 'pandas': pd.__version__, 'plataforma': platform.platform(),
+          'parametros': {'topNumber': topNumber, 'startingPallets': startingPallets, 'numPalletsEntry': numPalletsEntry,
+                         'repeat': repeat, 'seed': seed}}
+  return {'meta': meta, 'results': results}
+
+def compareBaseline(results:dict, baseline:dict, tolerance:float=0.25) -> pd.DataFrame:
+  """Compara los tiempos mínimos contra una línea base guardada
+
+  Args:
+      results (dict): Salida de runBenchmarks
+      baseline (dict): Salida de runBenchmarks guardada como línea base
+      tolerance (float, optional): Aumento relativo tolerado antes de marcar una regresión. Defaults to 0.25.
+
+  Returns:
+      pd.DataFrame: Columnas: Escala, Etapa, Segundos, Base, Ratio, Regresion
+  """
+  currentDF = pd.DataFrame(results['results'])[['Escala', 'Etapa', 'Segundos']]
+  baseDF = pd.DataFrame(baseline['results'])[['Escala', 'Etapa', 'Segundos']].rename(columns={'Segundos': 'Base'})
+  comparisonDF = currentDF.merge(baseDF, how='left', on=['Escala', 'Etapa'])
+  comparisonDF['Ratio'] = comparisonDF['Segundos']/comparisonDF['Base']
+  comparisonDF['Regresion'] = comparisonDF['Ratio'] > 1 + tolerance
+  return comparisonDF
+
+def buildParser() -> argparse.ArgumentParser:
+  """Parser de argumentos de los benchmarks
+
+  Returns:
+      argparse.ArgumentParser: Parser
+  """
+  parser = argparse.ArgumentParser(description='Benchmarks de las etapas de la simulación con pedidos sintéticos')
+  parser.add_argument('--scales', nargs='+', choices=list(scales), default=['small', 'medium'], help='Escalas a medir')
+  parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por etapa')
+  parser.add_argument('--seed', type=int, default=0, help='Semilla de datos y simulación')
+  parser.add_argument('--workdir', default=None, help='Carpeta para guardar y reutilizar los CSV generados')
+  parser.add_argument('--output', default='benchmark_results.json', help='JSON de salida')
+  parser.add_argument('--baseline', default=defaultBaseline, help='JSON de línea base para comparar')
+  parser.add_argument('--tolerance', type=float, default=0.25, help='Aumento relativo tolerado respecto de la línea base')
+  parser.add_argument('--save-baseline', action='store_true', help='Guarda los resultados como nueva línea base')
+  return parser
+
+def main(argv:List[str]=None) -> int:
+  args = buildParser().parse_args(argv)
+  results = runBenchmarks(args.scales, workDir=args.workdir, repeat=args.repeat, seed=args.seed)
+  with open(args.output, 'w') as f:
+    json.dump(results, f, indent=2)
+  print(pd.DataFrame(results['results'])[['Escala', 'Etapa', 'Segundos', 'Media']].to_string(index=False, float_format='{:.4f}'.format))
+
+  regressions = 0
+  if args.save_baseline:
+    with open(args.baseline, 'w') as f:
+      json.dump(results, f, indent=2)
+    print(f"Línea base guardada en {args.baseline}")
+  elif os.path.exists(args.baseline):
+    with open(args.baseline) as f:
+      comparisonDF = compareBaseline(results, json.load(f), args.tolerance)
+    print(comparisonDF.to_string(index=False, float_format='{:.4f}'.format))
+    regressions = int(comparisonDF['Regresion'].sum())
+    if regressions:
+      print(f"{regressions} etapas más lentas que la línea base (tolerancia {args.tolerance:.0%})")
+  else:
+    print(f"No hay línea base en {args.baseline}, usar --save-baseline para crearla")
+  return 1 if regressions else 0
+
+if __name__ == '__main__':
+  raise SystemExit(main())
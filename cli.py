@@ -0,0 +1,193 @@
+import argparse
+import logging
+from typing import List
+
+from entry_policies import entryPolicies
+
+#Solo se importan módulos livianos al inicio. pandas, la simulación y matplotlib se importan dentro de cada subcomando,
+#así `--help`, los trabajos cortos y los procesos del pool no pagan imports que no usan
+
+def configureLogging(logFile:str, level:str) -> None:
+  """Configura el logging de la corrida. La librería no configura logging al importarse
+
+  Args:
+      logFile (str): Archivo de log. None escribe en stderr
+      level (str): Nivel de logging (DEBUG, INFO, WARNING, ...)
+  """
+  if logFile:
+    logging.basicConfig(filename=logFile, encoding='utf-8', level=level)
+  else:
+    logging.basicConfig(level=level)
+
+def writeOutput(df, output:str, index:bool=True) -> None:
+  """Guarda un DataFrame en CSV si se pidió una salida y lo muestra por consola
+
+  Args:
+      df (pd.DataFrame): Tabla a mostrar
+      output (str): CSV de salida o None
+      index (bool, optional): Guarda el índice. Defaults to True.
+  """
+  if output:
+    df.to_csv(output, index=index)
+  print(df.to_string())
+
+def analyze(args:argparse.Namespace) -> None:
+  """Estadísticas de pedidos por día: pallets, capas del top de SKUs y mejor caso de paletizado con robot
+  """
+  from palletizing_sim import DataAnalysis
+
+  analysis = DataAnalysis(args.csv, useCache=not args.no_cache, cacheDir=args.cache_dir)
+  _, topDF = analysis.dailySKUStats(analysis.fileDF, args.top)
+  movementsDF, _ = analysis.bestCasePalletizing(analysis.datasetForRobot(args.top))
+  statsDF = analysis.palletsPerDay(analysis.fileDF).set_index('Fecha')
+  statsDF = statsDF.join(topDF[['%Top', 'CantSKU']]).join(movementsDF.set_index('Fecha')[['Movimientos', 'Ratio']])
+  writeOutput(statsDF, args.output)
+  if args.curve:
+    writeOutput(analysis.topCurve(args.curve), args.curve_output)
+
+def simulate(args:argparse.Namespace) -> None:
+  """Simula cada día con un único parámetro de pallets de entrada y muestra las métricas por día
+  """
+  import numpy as np
+  import pandas as pd
+
+  from decorators import instrumentation
+  from movement_trace import MovementTrace
+  from palletizing_sim import Simulation
+
+  if args.profile:
+    instrumentation.enable()
+  trace = MovementTrace(args.trace) if args.trace else None
+  rng = np.random.default_rng(args.seed) if args.seed is not None else None
+  simulationArgs = {'limited': args.limited, 'maxExitPallets': args.exit_positions, 'entryPolicy': args.policy}
+
+  if args.stream:
+    sim = Simulation(trace=trace)
+    rows = list(sim.streamSimulation(args.csv, args.top, args.pallets, rng=rng, **simulationArgs))
+  else:
+    sim = Simulation(args.csv, useCache=not args.no_cache, cacheDir=args.cache_dir, trace=trace)
+    robotDF = sim.datasetForRobot(args.top)
+    rows = []
+    for day in sim.days:
+      sim.resetSimulation()
+      sim.getSimulationDayDataset(day, robotDF)
+      sim.daySimulation(args.pallets, rng=rng, **simulationArgs)
+      rows += [{'Fecha': day, **sim.getDayMetrics()}]
+      if sim.remainingLayers > 0:
+        logging.warning(f"No se asignaron todas las capas el día {day}: {sim.remainingLayers}/{sim.totalLayers}")
+  if trace is not None:
+    trace.close()
+
+  sim.dayMetrics = pd.DataFrame(rows).set_index('Fecha') if rows else pd.DataFrame()
+  writeOutput(sim.dayMetrics, args.output)
+  print(sim.aggregateMetrics().to_string())
+  if args.profile:
+    instrumentation.exportJSON(args.profile)
+
+def sweep(args:argparse.Namespace) -> None:
+  """Barrido de parámetros, delega los argumentos en sweep.main
+  """
+  import sweep as sweepModule
+
+  sweepModule.main(args.args)
+
+def plot(args:argparse.Namespace) -> None:
+  """Grafica métricas por día (CSV de simulate o sweep con columna Fecha) o el registro por paso de un día
+  reconstruido desde una traza .npy
+  """
+  import pandas as pd
+
+  if args.file.endswith('.npy'):
+    import replay
+
+    recordDF = replay.replayRecord(args.file)
+    days = recordDF.index.get_level_values('Fecha').unique()
+    day = pd.Timestamp(args.day) if args.day else days[0]
+    if day not in days:
+      raise ValueError(f"El día {day.date()} no está en la traza")
+    plotDF = recordDF.loc[day]
+  else:
+    plotDF = pd.read_csv(args.file, parse_dates=['Fecha']).set_index('Fecha')
+  combinations = ['TopNumber', 'StartingPallets']
+  isSweep = set(combinations) <= set(plotDF.columns)
+  if isSweep:
+    plotDF = plotDF.set_index(combinations, append=True)
+  if args.columns:
+    plotDF = plotDF[args.columns]
+  if isSweep:                                                       #Salida de sweep: una serie por métrica y combinación
+    plotDF = plotDF.unstack(combinations)
+    plotDF.columns = [f'{metric} top={top} pallets={pallets}' for metric, top, pallets in plotDF.columns]
+
+  import matplotlib
+  if args.output:
+    matplotlib.use('Agg')                                           #Sin ventana, solo archivo
+  from matplotlib import pyplot as plt
+
+  plotDF.plot(grid=True, style='.-')
+  if args.output:
+    plt.savefig(args.output)
+  else:
+    plt.show()
+
+def buildParser() -> argparse.ArgumentParser:
+  """Parser de argumentos con un subcomando por tarea
+
+  Returns:
+      argparse.ArgumentParser: Parser
+  """
+  parser = argparse.ArgumentParser(description='Simulación de paletizado robótico')
+  parser.add_argument('--log', default='simulation.log', help='Archivo de log. Vacío escribe en stderr')
+  parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help='Nivel de logging')
+  subparsers = parser.add_subparsers(dest='command', required=True)
+
+  analyzeParser = subparsers.add_parser('analyze', help='Estadísticas de pedidos por día')
+  analyzeParser.add_argument('csv', help='Archivo CSV de pedidos')
+  analyzeParser.add_argument('--top', type=int, default=20, help='Cantidad de SKUs del top por día')
+  analyzeParser.add_argument('--curve', type=int, default=None, help='Calcula la curva de %%Top de 1 a N SKUs')
+  analyzeParser.add_argument('--curve-output', default=None, help='CSV de salida de la curva')
+  analyzeParser.add_argument('--no-cache', action='store_true', help='No usa ni guarda el caché del CSV')
+  analyzeParser.add_argument('--cache-dir', default=None, help='Carpeta del caché del CSV. Por defecto PALLETIZING_CACHE_DIR o ~/.cache/palletizing')
+  analyzeParser.add_argument('--output', default=None, help='CSV de salida con una fila por día')
+  analyzeParser.set_defaults(handler=analyze)
+
+  simulateParser = subparsers.add_parser('simulate', help='Simulación día por día')
+  simulateParser.add_argument('csv', help='Archivo CSV de pedidos')
+  simulateParser.add_argument('--top', type=int, default=20, help='Cantidad de SKUs por día para el dataset de robot')
+  simulateParser.add_argument('--pallets', type=int, default=10, help='Pallets de entrada (posiciones de entrada en la simulación limitada)')
+  simulateParser.add_argument('--seed', type=int, default=None, help='Semilla')
+  simulateParser.add_argument('--limited', action='store_true', help='Simulación de posiciones limitadas por tandas')
+  simulateParser.add_argument('--policy', choices=entryPolicies, default='random', help='Política de reemplazo de pallets de entrada')
+  simulateParser.add_argument('--exit-positions', type=int, default=None, help='Posiciones de salida de la simulación limitada')
+  simulateParser.add_argument('--stream', action='store_true', help='Lee el CSV por bloques y simula cada día al completarse (CSV ordenado por fecha)')
+  simulateParser.add_argument('--no-cache', action='store_true', help='No usa ni guarda el caché del CSV')
+  simulateParser.add_argument('--cache-dir', default=None, help='Carpeta del caché del CSV. Por defecto PALLETIZING_CACHE_DIR o ~/.cache/palletizing')
+  simulateParser.add_argument('--trace', default=None, help='Archivo .npy para la traza de movimientos')
+  simulateParser.add_argument('--profile', default=None, help='Habilita la instrumentación y guarda el resumen en este JSON')
+  simulateParser.add_argument('--output', default=None, help='CSV de salida con una fila por día')
+  simulateParser.set_defaults(handler=simulate)
+
+  #Los argumentos se pasan sin procesar a sweep.main para no importar la simulación al armar el parser
+  sweepParser = subparsers.add_parser('sweep', help='Barrido topNumber × startingPallets (ver sweep -h)', add_help=False)
+  sweepParser.add_argument('args', nargs=argparse.REMAINDER, help='Argumentos de sweep.py')
+  sweepParser.set_defaults(handler=sweep)
+
+  plotParser = subparsers.add_parser('plot', help='Gráfico de métricas por día o del registro de un día desde una traza')
+  plotParser.add_argument('file', help='CSV con columna Fecha (salida de simulate o sweep) o traza .npy')
+  plotParser.add_argument('--day', default=None, help='Día a graficar de la traza. Por defecto el primero')
+  plotParser.add_argument('--columns', nargs='+', default=None, help='Columnas a graficar')
+  plotParser.add_argument('--output', default=None, help='Imagen de salida. Por defecto abre una ventana')
+  plotParser.set_defaults(handler=plot)
+  return parser
+
+def main(argv:List[str]=None) -> None:
+  parser = buildParser()
+  args, unknown = parser.parse_known_args(argv)
+  if args.command == 'sweep':
+    args.args += unknown                                            #Opciones de sweep.py como -h o --top
+  elif unknown:
+    parser.error(f"argumentos no reconocidos: {' '.join(unknown)}")
+  configureLogging(args.log, args.log_level)
+  args.handler(args)
+
+if __name__ == '__main__':
+  main()
@@ -1,18 +1,210 @@
+import bisect
+import contextlib
+import csv
 import functools
+import json
+import math
+import os
 import time
 
-def timer(func):
-    """Print the runtime of the decorated function"""
+# Latency histogram bucket upper edges in seconds: 4 buckets per decade from 100 ns to 100 s
+histogramEdges = [10 ** (e / 4) for e in range(-28, 9)]
+
+
+class Instrumentation:
+    """Process-wide registry of named timers and counters.
+
+    Disabled by default: instrumented calls then only check `enabled`. When enabled, each timer keeps
+    call count, total, min, max and a log-spaced latency histogram. Between `beginDay` and `endDay` stats
+    accumulate in the current day; `endDay` keeps a per-day summary and folds them into the run totals.
+    Work outside a day (loading data, building robot datasets) goes to a separate setup bucket.
+    Each worker process has its own registry.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        """Drop all recorded timers, counters and day summaries"""
+        self.dayTimers = {}
+        self.dayCounters = {}
+        self.setupTimers = {}
+        self.setupCounters = {}
+        self.runTimers = {}
+        self.runCounters = {}
+        self.dayRows = []
+        self.dayOpen = False
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def record(self, name, seconds):
+        """Add one call of `seconds` to the timer `name` in the current day, or in the setup bucket outside a day"""
+        timers = self.dayTimers if self.dayOpen else self.setupTimers
+        stats = timers.get(name)
+        if stats is None:
+            stats = timers[name] = [0, 0.0, math.inf, 0.0, [0] * (len(histogramEdges) + 1)]
+        stats[0] += 1
+        stats[1] += seconds
+        if seconds < stats[2]:
+            stats[2] = seconds
+        if seconds > stats[3]:
+            stats[3] = seconds
+        stats[4][bisect.bisect_left(histogramEdges, seconds)] += 1
+
+    def count(self, name, value=1):
+        """Increment the counter `name`"""
+        if self.enabled:
+            counters = self.dayCounters if self.dayOpen else self.setupCounters
+            counters[name] = counters.get(name, 0) + value
+
+    def phase(self, name):
+        """Context manager timing a named phase"""
+        if not self.enabled:
+            return nullPhase
+        return self.__phase(name)
+
+    @contextlib.contextmanager
+    def __phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def beginDay(self):
+        """Start attributing stats to the current day (no-op if a day is already open)"""
+        self.dayOpen = True
+
+    def endDay(self, day=None):
+        """Close the current day: keep its summary and fold its stats into the run totals"""
+        self.dayOpen = False
+        if not (self.dayTimers or self.dayCounters):
+            return
+        label = str(day) if day is not None else str(len({row['Dia'] for row in self.dayRows}))
+        self.dayRows += [{'Dia': label, **row} for row in summaryRows(self.dayTimers, self.dayCounters)]
+        mergeTimers(self.runTimers, self.dayTimers)
+        mergeCounters(self.runCounters, self.dayCounters)
+        self.dayTimers = {}
+        self.dayCounters = {}
+
+    def runSummary(self):
+        """Per-run summary rows: closed days, setup work and a day not closed yet. Does not modify the registry"""
+        timers = {}
+        counters = {}
+        for bucket in (self.runTimers, self.setupTimers, self.dayTimers):
+            mergeTimers(timers, bucket)
+        for bucket in (self.runCounters, self.setupCounters, self.dayCounters):
+            mergeCounters(counters, bucket)
+        return summaryRows(timers, counters)
+
+    def setupSummary(self):
+        """Summary rows of the work recorded outside any day"""
+        return summaryRows(self.setupTimers, self.setupCounters)
+
+    def daySummary(self):
+        """Per-day summary rows"""
+        return list(self.dayRows)
+
+    def exportJSON(self, path):
+        """Write run, setup and per-day summaries to a JSON file"""
+        with open(path, 'w') as f:
+            json.dump({'run': self.runSummary(), 'setup': self.setupSummary(), 'days': self.daySummary()}, f, indent=2)
+
+    def exportCSV(self, path, level='run'):
+        """Write the run ('run'), setup ('setup') or per-day ('days') summary to a CSV file"""
+        summaries = {'run': self.runSummary, 'setup': self.setupSummary, 'days': self.daySummary}
+        if level not in summaries:
+            raise ValueError(f"Unknown summary level: {level}. Options: {', '.join(summaries)}")
+        rows = summaries[level]()
+        columns = (['Dia'] if level == 'days' else []) + summaryColumns
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+summaryColumns = ['Nombre', 'Tipo', 'Llamadas', 'Total', 'Media', 'Min', 'Max', 'P50', 'P95']
+
+
+def mergeTimers(into, timers):
+    """Add the timer stats of `timers` into `into` (copies new entries)"""
+    for name, stats in timers.items():
+        merged = into.get(name)
+        if merged is None:
+            into[name] = [stats[0], stats[1], stats[2], stats[3], list(stats[4])]
+            continue
+        merged[0] += stats[0]
+        merged[1] += stats[1]
+        merged[2] = min(merged[2], stats[2])
+        merged[3] = max(merged[3], stats[3])
+        merged[4] = [a + b for a, b in zip(merged[4], stats[4])]
+
+
+def mergeCounters(into, counters):
+    """Add the counters of `counters` into `into`"""
+    for name, value in counters.items():
+        into[name] = into.get(name, 0) + value
+
+
+def histogramQuantile(histogram, count, q):
+    """Upper bucket edge containing the q quantile of a latency histogram"""
+    target = q * count
+    cumulative = 0
+    for edge, bucketCount in zip(histogramEdges + [math.inf], histogram):
+        cumulative += bucketCount
+        if cumulative >= target:
+            return edge
+    return math.inf
+
+
+def summaryRows(timers, counters):
+    """Summary rows for timers and counters, sorted by total time"""
+    rows = []
+    for name, (calls, total, low, high, histogram) in sorted(timers.items(), key=lambda item: -item[1][1]):
+        rows += [{'Nombre': name, 'Tipo': 'timer', 'Llamadas': calls, 'Total': total, 'Media': total / calls, 'Min': low, 'Max': high,
+                  'P50': histogramQuantile(histogram, calls, 0.5), 'P95': histogramQuantile(histogram, calls, 0.95)}]
+    for name, value in sorted(counters.items()):
+        rows += [{'Nombre': name, 'Tipo': 'counter', 'Llamadas': value, 'Total': value, 'Media': None, 'Min': None, 'Max': None,
+                  'P50': None, 'P95': None}]
+    return rows
+
+
+nullPhase = contextlib.nullcontext()
+instrumentation = Instrumentation()
+if os.environ.get('PALLETIZING_INSTRUMENTATION', '') not in ('', '0'):
+    instrumentation.enable()
+
+
+def timer(func=None, *, name=None):
+    """Record the runtime of the decorated function in the instrumentation registry.
+    Usable as @timer or @timer(name='...'); when the registry is disabled only a flag is checked"""
+    if func is None:
+        return functools.partial(timer, name=name)
+    timerName = name if name is not None else func.__qualname__
+    registry = instrumentation
+
     @functools.wraps(func)
     def wrapper_timer(*args, **kwargs):
-        start_time = time.perf_counter()    # 1
-        value = func(*args, **kwargs)
-        end_time = time.perf_counter()      # 2
-        run_time = end_time - start_time    # 3
-        print(f"Finished {func.__name__!r} in {run_time:.4f} secs")
-        return value
+        if not registry.enabled:
+            return func(*args, **kwargs)
+        start_time = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            registry.record(timerName, time.perf_counter() - start_time)
     return wrapper_timer
 
+
+def phase(name):
+    """Context manager timing a named phase in the instrumentation registry"""
+    return instrumentation.phase(name)
+
+
 def debug(func):
     """Print the function signature and return value"""
     @functools.wraps(func)
@@ -32,4 +224,4 @@ def slow_down(func):
     def wrapper_slow_down(*args, **kwargs):
         time.sleep(1)
         return func(*args, **kwargs)
-    return wrapper_slow_down
\ No newline at end of file
+    return wrapper_slow_down
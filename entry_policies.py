@@ -0,0 +1,3 @@
+#Políticas de reemplazo de pallets de entrada de EntryPalletSelector. Módulo sin dependencias para que la CLI
+#pueda validar la opción sin importar la simulación
+entryPolicies = ('random', 'demand', 'destinations')
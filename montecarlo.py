@@ -0,0 +1,148 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from palletizing_sim import DataAnalysis
+from parallel_sim import getWorkerSimulation
+
+def replicateDay(task:tuple) -> List[dict]:
+  """Corre todas las réplicas de un día. El dataset del día se filtra y convierte a capas una sola vez
+  y se reutiliza en cada réplica con un generador independiente
+
+  Args:
+      task (tuple): (día, slice del dataset de robot para ese día, cantidad de pallets de entrada, lista de np.random.SeedSequence)
+
+  Returns:
+      List[dict]: Una fila por réplica con Fecha, Replica y métricas de Simulation.getDayMetrics
+  """
+  day, dayDF, startingPallets, seedSequences = task
+  sim = getWorkerSimulation()
+  sim.getSimulationDayDataset(day, dayDF)
+  preparedDF = sim.dayDataset                                      #Dataset del día en capas, sin modificar
+  sim.resetSimulation()
+
+  rows = []
+  for replica, seedSequence in enumerate(seedSequences):
+    sim.setDayDataset(preparedDF)
+    sim.daySimulation(startingPallets, rng=np.random.default_rng(seedSequence))
+    rows += [{'Fecha': day, 'Replica': replica, **sim.getDayMetrics()}]
+    sim.resetSimulation()
+  return rows
+
+def runReplicates(analysis:DataAnalysis, robotDataset:pd.DataFrame, startingPallets:int, replicates:int, seed:int, workers:int=1) -> pd.DataFrame:
+  """Corre replicates simulaciones por día con generadores derivados de una semilla base. Cada día y cada réplica
+  reciben su propia SeedSequence, por lo que los resultados no dependen de la cantidad de procesos
+
+  Args:
+      analysis (DataAnalysis): Objeto con los días a simular (analysis.days)
+      robotDataset (pd.DataFrame): Dataset de robot. Columnas: Fecha (index), Destino, SKU, Cantidad
+      startingPallets (int): Cantidad de pallets de entrada
+      replicates (int): Réplicas por día
+      seed (int): Semilla base
+      workers (int, optional): Cantidad de procesos. None usa os.cpu_count(). Defaults to 1.
+
+  Returns:
+      pd.DataFrame: Una fila por día y réplica. Columnas: Fecha, Replica, BatchTransfers, TransferedLayers,
+      RemainingLayers, TotalLayers, MaxExitPallets, PalletChanges
+  """
+  days = list(analysis.days)
+  daySequences = np.random.SeedSequence(seed).spawn(len(days))
+  tasks = [(day, analysis.filterByDate(day, robotDataset), startingPallets, daySequence.spawn(replicates))
+           for day, daySequence in zip(days, daySequences)]
+
+  workers = workers if workers is not None else (os.cpu_count() or 1)
+  if workers == 1 or len(tasks) <= 1:
+    results = [replicateDay(task) for task in tasks]
+  else:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+      results = list(pool.map(replicateDay, tasks))
+
+  return pd.DataFrame([row for dayRows in results for row in dayRows])
+
+def incompleteBeta(x:float, a:float, b:float) -> float:
+  """Función beta incompleta regularizada I_x(a, b) por fracción continua (Lentz)
+
+  Args:
+      x (float): Punto en [0, 1]
+      a (float): Parámetro a > 0
+      b (float): Parámetro b > 0
+
+  Returns:
+      float: I_x(a, b)
+  """
+  if x <= 0.0 or x >= 1.0:
+    return 0.0 if x <= 0.0 else 1.0
+  if x > (a + 1)/(a + b + 2):                                      #La fracción converge rápido por debajo de la media
+    return 1.0 - incompleteBeta(1.0 - x, b, a)
+  front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a*math.log(x) + b*math.log1p(-x))/a
+  tiny = 1e-300
+  c, d = 1.0, 1.0 - (a + b)*x/(a + 1)
+  d = 1.0/(d if abs(d) > tiny else tiny)
+  result = d
+  for m in range(1, 300):
+    for numerator in (m*(b - m)*x/((a + 2*m - 1)*(a + 2*m)), -(a + m)*(a + b + m)*x/((a + 2*m)*(a + 2*m + 1))):
+      d = 1.0 + numerator*d
+      d = 1.0/(d if abs(d) > tiny else tiny)
+      c = 1.0 + numerator/c
+      c = c if abs(c) > tiny else tiny
+      result *= c*d
+    if abs(c*d - 1.0) < 1e-15:
+      break
+  return front*result
+
+def studentTQuantile(p:float, degrees:int) -> float:
+  """Cuantil p de la distribución t de Student, por bisección sobre la acumulada
+
+  Args:
+      p (float): Probabilidad acumulada en (0.5, 1)
+      degrees (int): Grados de libertad (>= 1)
+
+  Returns:
+      float: t tal que P(T <= t) = p
+  """
+  def upperTail(t:float) -> float:
+    return 0.5*incompleteBeta(degrees/(degrees + t*t), degrees/2, 0.5)
+
+  low, high = 0.0, 1.0
+  while upperTail(high) > 1 - p:
+    low, high = high, 2*high
+  for _ in range(100):
+    middle = (low + high)/2
+    if upperTail(middle) > 1 - p:
+      low = middle
+    else:
+      high = middle
+  return (low + high)/2
+
+def summarizeReplicates(replicatesDF:pd.DataFrame, metrics:List[str]=None, percentiles:List[float]=None, confidence:float=0.95) -> pd.DataFrame:
+  """Resume las réplicas por día: media, desvío, percentiles e intervalo de confianza de la media
+  (t de Student con n-1 grados de libertad, mean ± t*std/sqrt(n); con una sola réplica el intervalo queda en NaN)
+
+  Args:
+      replicatesDF (pd.DataFrame): Salida de runReplicates
+      metrics (List[str], optional): Métricas a resumir. Defaults to None (MaxExitPallets y BatchTransfers).
+      percentiles (List[float], optional): Percentiles a calcular. Defaults to None (5, 50 y 95).
+      confidence (float, optional): Nivel de confianza del intervalo. Defaults to 0.95.
+
+  Returns:
+      pd.DataFrame: Una fila por día. Columnas: (métrica, estadístico)
+  """
+  metrics = metrics if metrics is not None else ['MaxExitPallets', 'BatchTransfers']
+  percentiles = percentiles if percentiles is not None else [5, 50, 95]
+  grouped = replicatesDF.groupby('Fecha')[metrics]
+  mean = grouped.mean()
+  std = grouped.std(ddof=1).fillna(0.0)
+  count = grouped.count()
+  quantiles = {n: studentTQuantile(0.5 + confidence/2, n - 1) if n > 1 else np.nan for n in np.unique(count.to_numpy())}
+  halfWidth = count.replace(quantiles)*std/np.sqrt(count)
+
+  stats = {'Media': mean, 'Desvio': std, 'ICInf': mean - halfWidth, 'ICSup': mean + halfWidth}
+  for p in percentiles:
+    stats[f'P{p:g}'] = grouped.quantile(p/100)
+
+  summaryDF = pd.concat(stats, axis=1).swaplevel(axis=1)
+  return summaryDF[[(metric, stat) for metric in metrics for stat in stats]]
@@ -0,0 +1,168 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+#Tipos de evento: movimiento de capas, apertura y retiro de un pallet de salida, cambio de pallet de entrada
+traceMove, traceOpen, traceRetire, traceChange = 0, 1, 2, 3
+#Registro de ancho fijo de cada evento de la simulación. El destino se guarda como código y los nombres en una tabla aparte.
+#Los campos que no aplican al evento quedan en -1 (p. ej. el pallet de entrada al abrir un pallet de salida)
+traceDtype = np.dtype([('day', 'datetime64[D]'), ('step', np.int64), ('entryPallet', np.int64), ('sku', np.int64),
+                       ('exitPallet', np.int64), ('destination', np.int32), ('layers', np.int32), ('kind', np.int8)])
+traceHeaderSize = 256                                               #Encabezado .npy de tamaño fijo para poder reescribirlo al crecer
+traceBufferRows = 65536
+
+def traceHeader(rows:int) -> bytes:
+  """Encabezado .npy (versión 1.0) de un array de rows movimientos, con relleno hasta traceHeaderSize bytes
+
+  Args:
+      rows (int): Cantidad de movimientos
+
+  Returns:
+      bytes: Encabezado
+  """
+  header = repr({'descr': np.lib.format.dtype_to_descr(traceDtype), 'fortran_order': False, 'shape': (rows,)})
+  header = header.ljust(traceHeaderSize - 10 - 1) + '\n'            #Magic (6) + versión (2) + largo (2)
+  return b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1')
+
+def destinationsPath(path:str) -> str:
+  """Ruta de la tabla de destinos de una traza guardada
+
+  Args:
+      path (str): Archivo .npy de la traza
+
+  Returns:
+      str: Archivo .json con los nombres de destino en orden de código
+  """
+  return path + '.destinations.json'
+
+class MovementTrace:
+  """Traza de movimientos en un array estructurado de ancho fijo. Además de cada movimiento de capas registra la apertura
+  y el retiro de los pallets de salida y los cambios de pallets de entrada (campo kind). Con ruta, el buffer se vuelca a un archivo .npy
+  cada bufferRows movimientos (y al cerrar) actualizando el encabezado, así que el archivo siempre es válido y se
+  lee sin copiar con loadTrace. Sin ruta, el array crece en memoria duplicando su capacidad.
+  Los destinos se guardan como códigos enteros (orden de aparición) y la tabla de nombres se escribe junto al archivo
+  en cada volcado (loadDestinations), así que no hay límite de largo para los nombres
+  """
+
+  def __init__(self, path:str=None, bufferRows:int=traceBufferRows) -> None:
+    """Inicialización de clase con buffer vacío
+
+    Args:
+        path (str, optional): Archivo .npy de salida. Defaults to None (traza en memoria).
+        bufferRows (int, optional): Movimientos por volcado a disco o capacidad inicial en memoria. Defaults to traceBufferRows.
+    """
+    self.path = path
+    self.buffer = np.empty(bufferRows, dtype=traceDtype)
+    self.size = 0                                                   #Movimientos en el buffer
+    self.writtenRows = 0                                            #Movimientos ya volcados al archivo
+    self.destinationCodes = {}                                      #Destino -> código
+    self.destinations = []                                          #Nombres de destino en orden de código
+    self.file = None
+    if path is not None:
+      self.file = open(path, 'wb')
+      self.file.write(traceHeader(0))
+      self.__writeDestinations()
+
+  def __len__(self) -> int:
+    return self.writtenRows + self.size
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc) -> None:
+    self.close()
+
+  def append(self, day, step:int, entryPallet:int, SKU:int, exitPallet:int, destination:str, layers:int, kind:int=traceMove) -> None:
+    """Agrega un evento
+
+    Args:
+        day (pd.Timestamp | np.datetime64 | None): Día simulado, None queda como NaT
+        step (int): Último paso registrado de la simulación (índice de simulationRecord), -1 antes del primero.
+            El evento se refleja en el registro a partir del paso siguiente
+        entryPallet (int): id del pallet de entrada, -1 si no aplica
+        SKU (int): SKU del pallet de entrada, -1 si no aplica
+        exitPallet (int): id del pallet de salida, -1 si no aplica
+        destination (str): Destino del pallet de salida, None si no aplica (código -1)
+        layers (int): Capas movidas, 0 en los eventos que no son movimientos
+        kind (int, optional): Tipo de evento (traceMove, traceOpen, traceRetire o traceChange). Defaults to traceMove.
+    """
+    code = -1 if destination is None else self.destinationCodes.get(destination)
+    if code is None:
+      code = len(self.destinations)
+      self.destinationCodes[destination] = code
+      self.destinations.append(str(destination))
+
+    if self.size == len(self.buffer):
+      if self.file is not None:
+        self.flush()
+      else:
+        self.buffer = np.resize(self.buffer, 2*len(self.buffer))   #Traza en memoria, se duplica la capacidad
+    self.buffer[self.size] = (np.datetime64(day, 'D') if day is not None else np.datetime64('NaT', 'D'), step, entryPallet, SKU,
+                              exitPallet, code, layers, kind)
+    self.size += 1
+
+  def flush(self) -> None:
+    """Vuelca el buffer al archivo y actualiza el encabezado con la cantidad de movimientos
+    """
+    if self.file is None or self.size == 0:
+      return
+    self.file.write(self.buffer[:self.size].tobytes())
+    self.writtenRows += self.size
+    self.size = 0
+    self.file.seek(0)
+    self.file.write(traceHeader(self.writtenRows))
+    self.file.seek(0, 2)
+    self.file.flush()
+    self.__writeDestinations()
+
+  def __writeDestinations(self) -> None:
+    """Escribe la tabla de destinos junto al archivo con reemplazo atómico
+    """
+    tablePath = destinationsPath(self.path)
+    with open(tablePath + '.tmp', 'w', encoding='utf-8') as f:
+      json.dump(self.destinations, f, ensure_ascii=False)
+    os.replace(tablePath + '.tmp', tablePath)
+
+  def close(self) -> None:
+    """Vuelca lo pendiente y cierra el archivo
+    """
+    if self.file is not None:
+      self.flush()
+      self.file.close()
+      self.file = None
+
+  def toArray(self) -> np.ndarray:
+    """Eventos registrados. En memoria es una vista del buffer; con archivo se vuelca y se mapea el archivo
+
+    Returns:
+        np.ndarray: Array estructurado con dtype traceDtype
+    """
+    if self.path is None:
+      return self.buffer[:self.size]
+    self.flush()
+    return loadTrace(self.path)
+
+def loadTrace(path:str) -> np.ndarray:
+  """Carga una traza guardada sin copiarla a memoria (memory-map de solo lectura)
+
+  Args:
+      path (str): Archivo .npy de MovementTrace
+
+  Returns:
+      np.ndarray: Array estructurado con dtype traceDtype
+  """
+  return np.load(path, mmap_mode='r')
+
+def loadDestinations(path:str) -> np.ndarray:
+  """Nombres de destino de una traza guardada, indexados por el código del campo destination
+
+  Args:
+      path (str): Archivo .npy de MovementTrace
+
+  Returns:
+      np.ndarray: Nombres de destino (object)
+  """
+  with open(destinationsPath(path), encoding='utf-8') as f:
+    return np.array(json.load(f), dtype=object)
@@ -0,0 +1,224 @@
+import heapq
+import math
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+def exactSubset(quantities:List[int], capacity:int) -> List[int]:
+  """Busca el subconjunto de ítems con menos ítems que suma exactamente capacity (subset-sum por programación dinámica)
+
+  Args:
+      quantities (List[int]): Capas de cada ítem
+      capacity (int): Capas por pallet
+
+  Returns:
+      List[int]: Posiciones de los ítems elegidos, vacía si no hay subconjunto exacto
+  """
+  unreachable = len(quantities) + 1
+  best = [0] + [unreachable]*capacity                                #Mínima cantidad de ítems para sumar c
+  take = []                                                          #take[i][c]: el ítem i mejoró la suma c
+  for q in quantities:
+    improved = [False]*(capacity + 1)
+    for c in range(capacity, q - 1, -1):
+      if best[c - q] + 1 < best[c]:
+        best[c] = best[c - q] + 1
+        improved[c] = True
+    take.append(improved)
+
+  if best[capacity] >= unreachable:
+    return []
+  chosen = []
+  c = capacity
+  for i in range(len(quantities) - 1, -1, -1):                     #Reconstrucción en orden inverso de ítems
+    if take[i][c]:
+      chosen.append(i)
+      c -= quantities[i]
+  return chosen[::-1]
+
+def packDestination(skus:List[int], quantities:List[int], capacity:int, splitSkus:bool=False) -> List[Tuple[int, int, int]]:
+  """Arma los pallets de salida de un destino. Primero se arman pallets exactos (subset-sum), luego se ubica el resto
+  con first-fit-decreasing o, si se permite dividir SKUs, llenando pallets en orden para llegar a la cota ceil(total/capacity)
+
+  Args:
+      skus (List[int]): SKUs del destino
+      quantities (List[int]): Capas de cada SKU
+      capacity (int): Capas por pallet
+      splitSkus (bool, optional): Permite repartir un SKU entre varios pallets. Defaults to False.
+
+  Returns:
+      List[Tuple[int, int, int]]: (pallet desde 1, SKU, capas)
+  """
+  assignments = []
+  pallet = 0
+  items = []
+  for sku, q in zip(skus, quantities):
+    q = int(q)
+    while q >= capacity:                                             #Pallets completos de un único SKU
+      pallet += 1
+      assignments.append((pallet, sku, capacity))
+      q -= capacity
+    if q > 0:
+      items.append((sku, q))
+  items.sort(key=lambda item: item[1], reverse=True)
+
+  #Pallets exactos
+  while items:
+    chosen = exactSubset([q for _, q in items], capacity)
+    if not chosen:
+      break
+    pallet += 1
+    assignments += [(pallet, items[i][0], items[i][1]) for i in chosen]
+    chosenSet = set(chosen)
+    items = [item for i, item in enumerate(items) if i not in chosenSet]
+
+  if splitSkus:
+    #Se llenan pallets en orden repartiendo SKUs, todos quedan completos salvo el último
+    space = 0
+    for sku, q in items:
+      while q > 0:
+        if space == 0:
+          pallet += 1
+          space = capacity
+        layers = min(q, space)
+        assignments.append((pallet, sku, layers))
+        q -= layers
+        space -= layers
+  else:
+    #First-fit-decreasing
+    firstOpen = pallet + 1
+    spaces = []
+    for sku, q in items:
+      for b, space in enumerate(spaces):
+        if q <= space:
+          spaces[b] -= q
+          assignments.append((firstOpen + b, sku, q))
+          break
+      else:
+        spaces.append(capacity - q)
+        assignments.append((firstOpen + len(spaces) - 1, sku, q))
+
+  assignments.sort(key=lambda row: row[0])
+  return assignments
+
+def packDay(dayDataset:pd.DataFrame, capacity:int, splitSkus:bool=False, destinations:List[str]=None) -> pd.DataFrame:
+  """Arma los pallets de salida de todos los destinos del día
+
+  Args:
+      dayDataset (pd.DataFrame): Dataset del día en capas. Columnas: Destino, SKU, Cantidad
+      capacity (int): Capas por pallet
+      splitSkus (bool, optional): Permite repartir un SKU entre varios pallets. Defaults to False.
+      destinations (List[str], optional): Orden de destinos. Defaults to None (orden de aparición).
+
+  Returns:
+      pd.DataFrame: Pallets definidos. Columnas: Destino, Pallet, SKU, Cantidad
+  """
+  df = dayDataset[dayDataset['Cantidad'] > 0]
+  destCodes, destNames = pd.factorize(df['Destino'])
+  skus = df['SKU'].to_numpy()
+  quantities = df['Cantidad'].to_numpy(dtype=np.int64)
+  order = np.argsort(destCodes, kind='stable')
+  bounds = np.searchsorted(destCodes[order], np.arange(len(destNames) + 1))
+  destinations = destinations if destinations is not None else list(destNames)
+  position = {dest: code for code, dest in enumerate(destNames)}
+
+  rows = []
+  for dest in destinations:
+    code = position.get(dest)
+    if code is None:
+      continue
+    rowsDest = order[bounds[code]:bounds[code + 1]]
+    rows += [(dest, pallet, sku, q) for pallet, sku, q in packDestination(skus[rowsDest].tolist(), quantities[rowsDest].tolist(), capacity, splitSkus)]
+
+  return pd.DataFrame(rows, columns=['Destino', 'Pallet', 'SKU', 'Cantidad'])
+
+def packingSummary(assignmentDF:pd.DataFrame, capacity:int) -> pd.DataFrame:
+  """Compara la cantidad de pallets armados por destino con la cota inferior ceil(total/capacity)
+
+  Args:
+      assignmentDF (pd.DataFrame): Salida de packDay. Columnas: Destino, Pallet, SKU, Cantidad
+      capacity (int): Capas por pallet
+
+  Returns:
+      pd.DataFrame: Columnas: Destino (index), Capas, Pallets, CotaInferior, Exceso
+  """
+  summaryDF = assignmentDF.groupby('Destino', sort=False).agg(Capas=('Cantidad', 'sum'), Pallets=('Pallet', 'nunique'))
+  summaryDF['CotaInferior'] = [math.ceil(layers/capacity) for layers in summaryDF['Capas']]
+  summaryDF['Exceso'] = summaryDF['Pallets'] - summaryDF['CotaInferior']
+  return summaryDF
+
+def groupExitPallets(assignmentDF:pd.DataFrame, numPalletsEntry:int, capacity:int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+  """Agrupa pallets de salida que se pueden armar con a lo sumo numPalletsEntry SKUs de entrada a la vez.
+  Cada pallet se representa como un bitset de SKUs (fila de la matriz de incidencia pallets × SKUs) y un índice
+  invertido SKU -> pallets pendientes limita la búsqueda a los pallets que comparten SKUs con el grupo.
+  Cada grupo comienza con el primer pallet pendiente, suma pallets que comparten algún SKU mientras la unión
+  entre en las posiciones de entrada, y toma todos los pallets pendientes cuyos SKUs estén contenidos en esa unión.
+  Siempre termina porque el pallet inicial queda en su grupo
+
+  Args:
+      assignmentDF (pd.DataFrame): Pallets de salida definidos. Columnas: Destino, Pallet, SKU, Cantidad
+      numPalletsEntry (int): Cantidad límite de SKUs de entrada por grupo (un pallet con más SKUs forma su propio grupo)
+      capacity (int): Capas por pallet
+
+  Returns:
+      Tuple[pd.DataFrame, pd.DataFrame]: Pallets de entrada (Grupo, SKU, CantidadPallets) y de salida (Grupo, Destino, Pallet, SKU, Cantidad)
+  """
+  if assignmentDF.empty:                                             #Día sin capas: no hay pallets para agrupar
+    return (pd.DataFrame({'Grupo': pd.Series(dtype=np.int64), 'SKU': pd.Series(dtype=np.int64), 'CantidadPallets': pd.Series(dtype=np.int64)}),
+            pd.DataFrame({'Grupo': pd.Series(dtype=np.int64), 'Destino': pd.Series(dtype=object), 'Pallet': pd.Series(dtype=np.int64),
+                          'SKU': pd.Series(dtype=np.int64), 'Cantidad': pd.Series(dtype=np.int64)}))
+
+  palletCodes, _ = pd.factorize(pd.MultiIndex.from_frame(assignmentDF[['Destino', 'Pallet']]))
+  skuCodes, _ = pd.factorize(assignmentDF['SKU'])
+  numPallets = int(palletCodes.max()) + 1
+
+  #Matriz de incidencia como bitsets por pallet e índice invertido SKU -> pallets pendientes (ordenados)
+  masks = [0]*numPallets
+  skuPallets = {}
+  for p, s in zip(palletCodes.tolist(), skuCodes.tolist()):
+    masks[p] |= 1 << s
+    skuPallets.setdefault(s, {})[p] = None
+
+  def skusOf(mask:int) -> List[int]:
+    return [s for s in range(mask.bit_length()) if mask >> s & 1]
+
+  groups = np.zeros(numPallets, dtype=np.int64)
+  pending = dict.fromkeys(range(numPallets))                          #Pallets sin grupo, en orden
+  group = 0
+  while pending:
+    group += 1
+    seed = next(iter(pending))
+    skuSet = masks[seed]
+    limit = max(numPalletsEntry, bin(skuSet).count('1'))
+
+    #Suma pallets que comparten algún SKU con el grupo, en orden, mientras entren en las posiciones de entrada
+    candidates = sorted({p for s in skusOf(skuSet) for p in skuPallets[s]})
+    visited = set(candidates)
+    while candidates and bin(skuSet).count('1') < limit:
+      p = heapq.heappop(candidates)
+      union = skuSet | masks[p]
+      if union != skuSet and bin(union).count('1') <= limit:
+        for s in skusOf(union & ~skuSet):                             #SKUs nuevos aportan nuevos candidatos
+          for q in skuPallets[s]:
+            if q not in visited:
+              visited.add(q)
+              heapq.heappush(candidates, q)
+        skuSet = union
+
+    #Todos los pallets pendientes cuyos SKUs están contenidos en el conjunto del grupo
+    members = {p for s in skusOf(skuSet) for p in skuPallets[s] if masks[p] & ~skuSet == 0}
+    for p in members:
+      groups[p] = group
+      del pending[p]
+      for s in skusOf(masks[p]):
+        del skuPallets[s][p]
+
+  palletsSalida = assignmentDF[['Destino', 'Pallet', 'SKU', 'Cantidad']].copy()
+  palletsSalida.insert(0, 'Grupo', groups[palletCodes])
+  palletsSalida = palletsSalida.sort_values(by=['Grupo'], kind='stable').reset_index(drop=True)
+
+  palletsEntrada = palletsSalida.groupby(['Grupo', 'SKU'], as_index=False)['Cantidad'].sum()
+  palletsEntrada['CantidadPallets'] = -(-palletsEntrada['Cantidad'] // capacity)    #Pallets de entrada necesarios por SKU
+  palletsEntrada = palletsEntrada[['Grupo', 'SKU', 'CantidadPallets']]
+
+  return palletsEntrada, palletsSalida
@@ -1,57 +1,452 @@
 import numpy as np
 import math
+import heapq
 import datetime
+import hashlib
+import os
 import pandas as pd
-from decorators import timer
+from decorators import instrumentation, phase, timer
+from entry_policies import entryPolicies
+import packing
+from movement_trace import MovementTrace, traceChange, traceOpen, traceRetire
 import itertools
-from typing import List
-from matplotlib import pyplot as plt
+from typing import Iterator, List, Tuple
 import logging
 
 layersPerPallet = 15
 traysPerLayer = 4
-
-logging.basicConfig(filename='simulation.log', encoding='utf-8', level=logging.DEBUG)
+cacheVersion = 1
+partitionCacheSize = 8
+streamChunkSize = 100000
+csvReadOptions = {'sep': ';', 'usecols': ['Destino', 'SKU', 'BG Enviada', 'Fecha Comercial'], 'parse_dates': ['Fecha Comercial'], 'dayfirst': True,
+                  'encoding': 'latin-1', 'dtype': {'Destino': str, 'SKU': np.int64, 'BG Enviada': np.int64, 'Fecha Comercial': str}}
+
+def defaultCacheDir() -> str:
+  """Carpeta del caché del CSV: PALLETIZING_CACHE_DIR si está definida, si no palletizing dentro de XDG_CACHE_HOME (~/.cache).
+  No se escribe junto a los datos, que pueden estar en una carpeta de solo lectura
+
+  Returns:
+      str: Ruta a la carpeta
+  """
+  folder = os.environ.get('PALLETIZING_CACHE_DIR')
+  if folder:
+    return folder
+  return os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'palletizing')
 
 class DataAnalysis:
 
-  def __init__(self, filePath:str) -> None:
-    """Inicializacion de clase con lectura de CSV
+  def __init__(self, filePath:str=None, useCache:bool=True, cacheDir:str=None) -> None:
+    """Inicializacion de clase con lectura de CSV. Si existe un caché válido para el archivo se carga de ahí
+
+    Args:
+        filePath (str, optional): Ruta al archivo csv. Si es None se inicia con un dataset vacío. Defaults to None.
+        useCache (bool, optional): Leer y guardar el dataset limpio en un caché binario. Si no se puede guardar se avisa
+            y se sigue sin caché. Defaults to True.
+        cacheDir (str, optional): Carpeta del caché. Defaults to None (defaultCacheDir()).
+    """
+    pd.options.display.float_format = '{:.2f}'.format
+    self.partitionCache = {}                                        #Índices de partición por día guardados por identidad de DataFrame
+    self.robotCache = {}                                            #Datasets de robot por topNumber, actualizados por appendOrders
+    if filePath is None:                                            #Sin archivo, p. ej. procesos que solo simulan días ya filtrados
+      self.__emptyDataset()
+      return
+    cachePath = self.__cachePath(filePath, cacheDir)
+    if useCache and self.__loadCache(filePath, cachePath):
+      return
+
+    self.__readCSV(filePath)
+    if useCache:
+      self.__saveCache(filePath, cachePath)
+
+  def __emptyDataset(self) -> None:
+    """Inicializa fileDF, destinations, skus y days vacíos con los tipos del dataset limpio
+    """
+    self.fileDF = pd.DataFrame({'Destino': pd.Series(dtype=object), 'SKU': pd.Series(dtype=np.int64), 'Cantidad': pd.Series(dtype=np.int64)},
+                               index=pd.DatetimeIndex([], name='Fecha'))
+    self.destinations = pd.Series(dtype=object)
+    self.skus = np.array([], dtype=np.int64)
+    self.days = pd.Series(dtype='datetime64[ns]')
+
+  def __readCSV(self, filePath:str) -> None:
+    """Lee el CSV en una sola pasada con solo las columnas necesarias y lo limpia
 
     Args:
         filePath (str): Ruta al archivo csv
     """
-    dtypes = {'Nro Orden': np.int64, 'Fe y Hr Creac': str, 'Destino': str, 'SKU': np.int64, 'Cant. Orignial Ordenada': np.int64,\
-              'Cantidad Ordenada': np.int64, 'Cantidad Asignada': np.int64, 'Cant. Empacada': np.int64, 'BG Enviada': np.int64, \
-              'Cantidad Cancelada': np.int64, 'CEVE': str, 'Fecha Comercial': str, 'Mes': np.int64, 'Sem': np.int64}
-    #Series de fechas
-    #self.datesCol = pd.read_csv(filePath, sep=';', dtype=dtypes, parse_dates=[11], dayfirst=True, encoding='latin-1')['Fecha Comercial']
-    #self.days = self.datesCol.unique()
-    #self.days = pd.Series(self.days).dropna()
-    #Series de clientes
-    self.clientsCol = pd.read_csv(filePath, sep=';', dtype=dtypes, encoding='latin-1')['Destino']
-    self.destinations = self.clientsCol.unique()
-    self.destinations = pd.Series(self.destinations).dropna()
     #DataFrame general
-    self.fileDF = pd.read_csv(filePath, sep=';', dtype=dtypes, parse_dates=[11], dayfirst=True, encoding='latin-1')
-    self.fileDF = self.fileDF.sort_index()
-    #Se eliminan columnas no importantes
-    self.fileDF = self.fileDF.drop(labels=['Nro Orden', 'Fe y Hr Creac', 'Cant. Orignial Ordenada', 'Cantidad Ordenada', 'Cantidad Asignada', 'Cant. Empacada', 'Cantidad Cancelada', 'CEVE', 'Mes', 'Sem'], axis=1)
-    #Renombrado de columnas
-    self.fileDF.rename(columns = {'BG Enviada' : 'Cantidad', 'Fecha Comercial' : 'Fecha'}, inplace = True)
-    self.fileDF = self.fileDF.set_index('Fecha')
-    #Modulo 60 para eliminar pallets completos
-    self.fileDF['Cantidad'] = self.fileDF['Cantidad'] % (layersPerPallet*traysPerLayer)
-    pd.options.display.float_format = '{:.2f}'.format
-    #Eliminar filas con cantidad 0
-    self.fileDF = self.fileDF[self.fileDF.Cantidad > 0]
+    rawDF = pd.read_csv(filePath, **csvReadOptions)
+    #Series de clientes (antes de filtrar cantidades)
+    self.destinations = pd.Series(rawDF['Destino'].unique()).dropna()
+    self.fileDF = self.__cleanOrders(rawDF)
     self.skus = self.fileDF['SKU'].unique()
     #Serie de fechas sin los dias con cantidad 0
     self.days = np.unique(self.fileDF.index.values)
     self.days = pd.Series(self.days).dropna()
 
+  def __cleanOrders(self, rawDF:pd.DataFrame) -> pd.DataFrame:
+    """Limpieza de líneas de pedido leídas del CSV: renombra columnas, indexa por fecha, descarta pallets completos
+    (módulo layersPerPallet*traysPerLayer) y elimina filas con cantidad 0
+
+    Args:
+        rawDF (pd.DataFrame): Líneas leídas con csvReadOptions. Columnas: Destino, SKU, BG Enviada, Fecha Comercial
+
+    Returns:
+        pd.DataFrame: Líneas limpias. Columnas: Fecha (index), Destino, SKU, Cantidad
+    """
+    #Renombrado de columnas
+    df = rawDF.rename(columns = {'BG Enviada' : 'Cantidad', 'Fecha Comercial' : 'Fecha'})
+    df = df.set_index('Fecha')
+    #Modulo 60 para eliminar pallets completos
+    df['Cantidad'] = df['Cantidad'] % (layersPerPallet*traysPerLayer)
+    #Eliminar filas con cantidad 0
+    return df[df.Cantidad > 0]
+
+  def streamDays(self, filePath:str, chunkSize:int=streamChunkSize) -> Iterator[Tuple[pd.Timestamp, pd.DataFrame]]:
+    """Lee el CSV por bloques con la misma limpieza que la lectura completa y entrega cada día completo en orden de fecha.
+    Un día se entrega cuando aparece una fecha posterior, así que el archivo debe estar ordenado por fecha y la memoria
+    usada queda acotada al bloque y los días todavía abiertos. Las líneas sin fecha se descartan
+
+    Args:
+        filePath (str): Ruta al archivo csv
+        chunkSize (int, optional): Filas leídas por bloque. Defaults to streamChunkSize.
+
+    Raises:
+        ValueError: Si aparecen líneas de un día ya entregado (archivo no ordenado por fecha)
+
+    Yields:
+        Iterator[Tuple[pd.Timestamp, pd.DataFrame]]: (día, líneas del día). Columnas: Fecha (index), Destino, SKU, Cantidad
+    """
+    pending = {}                                                    #Día -> lista de bloques, en orden de aparición
+    lastYielded = None
+
+    def completeDays(before):
+      for day in sorted(day for day in pending if before is None or day < before):
+        yield day, pd.concat(pending.pop(day))
+
+    with pd.read_csv(filePath, chunksize=chunkSize, **csvReadOptions) as reader:
+      for rawDF in reader:
+        chunkDF = self.__cleanOrders(rawDF)
+        chunkDF = chunkDF[chunkDF.index.notna()]
+        if chunkDF.empty:
+          continue
+        dayKeys = chunkDF.index.normalize()
+        if lastYielded is not None and dayKeys.min() <= lastYielded:
+          raise ValueError(f"El archivo {filePath} no está ordenado por fecha: aparecen líneas del {dayKeys.min().date()} luego de entregar el {lastYielded.date()}")
+        for day, dayDF in chunkDF.groupby(dayKeys, sort=False):
+          pending.setdefault(day, []).append(dayDF)
+        for day, dayDF in completeDays(dayKeys.max()):
+          lastYielded = day
+          yield day, dayDF
+
+    for day, dayDF in completeDays(None):
+      yield day, dayDF
+
+  def __cachePath(self, filePath:str, cacheDir:str=None) -> str:
+    """Ruta del archivo de caché para el csv dado. El nombre incluye un hash de la ruta absoluta del csv, así que
+    archivos con el mismo nombre en carpetas distintas no comparten caché
+
+    Args:
+        filePath (str): Ruta al archivo csv
+        cacheDir (str, optional): Carpeta del caché. Defaults to None (defaultCacheDir()).
+
+    Returns:
+        str: Ruta al archivo .npz
+    """
+    folder = cacheDir if cacheDir is not None else defaultCacheDir()
+    pathHash = hashlib.sha1(os.path.abspath(filePath).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(folder, f'{os.path.basename(filePath)}.{pathHash}.cache.npz')
+
+  def __fileKey(self, filePath:str, withHash:bool=True) -> dict:
+    """Clave del archivo de origen para validar el caché
+
+    Args:
+        filePath (str): Ruta al archivo csv
+        withHash (bool, optional): Calcular hash del contenido. Defaults to True.
+
+    Returns:
+        dict: Tamaño, fecha de modificación, hash y constantes de paletizado
+    """
+    stat = os.stat(filePath)
+    key = {'version': cacheVersion, 'size': stat.st_size, 'mtime': stat.st_mtime_ns,
+           'layersPerPallet': layersPerPallet, 'traysPerLayer': traysPerLayer, 'sha1': ''}
+    if withHash:
+      sha1 = hashlib.sha1()
+      with open(filePath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+          sha1.update(block)
+      key['sha1'] = sha1.hexdigest()
+    return key
+
+  def __loadCache(self, filePath:str, cachePath:str) -> bool:
+    """Carga el dataset limpio desde el caché si corresponde al archivo y constantes actuales.
+    Si coinciden tamaño y fecha de modificación no se recalcula el hash
+
+    Args:
+        filePath (str): Ruta al archivo csv
+        cachePath (str): Ruta al archivo .npz
+
+    Returns:
+        bool: Se cargó el caché
+    """
+    if not os.path.exists(cachePath):
+      return False
+    try:
+      with np.load(cachePath, allow_pickle=False) as cache:
+        stored = {k[4:]: cache[k].item() for k in cache.files if k.startswith('key_')}
+        key = self.__fileKey(filePath, withHash=False)
+        sameConstants = all(stored.get(k) == key[k] for k in ['version', 'size', 'layersPerPallet', 'traysPerLayer'])
+        if not sameConstants:
+          return False
+        if stored.get('mtime') != key['mtime'] and stored.get('sha1') != self.__fileKey(filePath)['sha1']:
+          return False
+
+        self.__setDataset(cache)
+    except (OSError, KeyError, ValueError) as e:
+      logging.warning(f"No se pudo leer el caché {cachePath}: {e}")
+      return False
+    return True
+
+  def __saveCache(self, filePath:str, cachePath:str) -> None:
+    """Guarda el dataset limpio en formato columnar .npz
+
+    Args:
+        filePath (str): Ruta al archivo csv
+        cachePath (str): Ruta al archivo .npz
+    """
+    key = self.__fileKey(filePath)
+    arrays = {f'key_{k}': np.array(v) for k, v in key.items()}
+    arrays.update(self.__datasetArrays())
+    try:
+      os.makedirs(os.path.dirname(cachePath), exist_ok=True)
+      self.__writeArrays(cachePath, arrays)
+    except OSError as e:                                            #Carpeta de solo lectura, disco lleno, etc.: se sigue sin caché
+      logging.warning(f"No se pudo guardar el caché {cachePath}: {e}")
+
+  @staticmethod
+  def __frameArrays(df:pd.DataFrame, prefix:str='') -> dict:
+    """Columnas de un DataFrame de líneas de pedido como arrays para .npz (destinos como códigos y categorías)
+
+    Args:
+        df (pd.DataFrame): Líneas de pedido. Columnas: Fecha (index), Destino, SKU, Cantidad
+        prefix (str, optional): Prefijo de las claves. Defaults to ''.
+
+    Returns:
+        dict: Claves fecha, destCodes, destCategories, sku y cantidad con el prefijo
+    """
+    destCodes, destCategories = pd.factorize(df['Destino'])
+    return {f'{prefix}fecha': df.index.values, f'{prefix}destCodes': destCodes, f'{prefix}destCategories': np.asarray(destCategories, dtype=str),
+            f'{prefix}sku': df['SKU'].to_numpy(), f'{prefix}cantidad': df['Cantidad'].to_numpy()}
+
+  @staticmethod
+  def __arraysFrame(arrays, prefix:str='') -> pd.DataFrame:
+    """Inversa de __frameArrays
+
+    Args:
+        arrays (dict | np.lib.npyio.NpzFile): Arrays guardados
+        prefix (str, optional): Prefijo de las claves. Defaults to ''.
+
+    Returns:
+        pd.DataFrame: Líneas de pedido. Columnas: Fecha (index), Destino, SKU, Cantidad
+    """
+    destCategories = arrays[f'{prefix}destCategories']
+    destino = pd.Series(destCategories.astype(object)).reindex(arrays[f'{prefix}destCodes']).to_numpy()    #Código -1 queda como NaN
+    return pd.DataFrame({'Destino': destino, 'SKU': arrays[f'{prefix}sku'], 'Cantidad': arrays[f'{prefix}cantidad']},
+                        index=pd.DatetimeIndex(arrays[f'{prefix}fecha'], name='Fecha'))
+
+  def __datasetArrays(self) -> dict:
+    """Dataset limpio (fileDF, destinos, SKUs y días) como arrays para .npz
+
+    Returns:
+        dict: Arrays del dataset
+    """
+    arrays = self.__frameArrays(self.fileDF)
+    arrays.update({'destinations': self.destinations.to_numpy(dtype=str), 'destinationsIndex': self.destinations.index.to_numpy(),
+                   'skus': np.asarray(self.skus), 'days': self.days.to_numpy()})
+    return arrays
+
+  def __setDataset(self, arrays) -> None:
+    """Carga fileDF, destinos, SKUs y días desde los arrays de __datasetArrays
+
+    Args:
+        arrays (dict | np.lib.npyio.NpzFile): Arrays guardados
+    """
+    self.fileDF = self.__arraysFrame(arrays)
+    self.destinations = pd.Series(arrays['destinations'].astype(object), index=arrays['destinationsIndex'])
+    self.skus = arrays['skus']
+    self.days = pd.Series(arrays['days']).dropna()
+
+  @staticmethod
+  def __writeArrays(path:str, arrays:dict) -> None:
+    """Escribe arrays en un .npz con reemplazo atómico para no dejar archivos a medio escribir
+
+    Args:
+        path (str): Ruta al archivo .npz
+        arrays (dict): Arrays a guardar
+    """
+    tmpPath = path + '.tmp'
+    try:
+      with open(tmpPath, 'wb') as f:
+        np.savez(f, **arrays)
+      os.replace(tmpPath, path)
+    except OSError:
+      if os.path.exists(tmpPath):                                   #No deja el temporal a medio escribir
+        os.remove(tmpPath)
+      raise
+
+  def stateArrays(self) -> dict:
+    """Estado persistente: dataset limpio con las líneas agregadas por appendOrders y datasets de robot de getRobotDataset
+
+    Returns:
+        dict: Arrays para saveState
+    """
+    arrays = self.__datasetArrays()
+    arrays['robotTops'] = np.array(sorted(self.robotCache), dtype=np.int64)
+    for topNumber in sorted(self.robotCache):
+      arrays.update(self.__frameArrays(self.robotCache[topNumber], prefix=f'robot{topNumber}_'))
+    return arrays
+
+  def restoreState(self, arrays) -> None:
+    """Restaura el estado guardado por stateArrays
+
+    Args:
+        arrays (dict | np.lib.npyio.NpzFile): Arrays guardados
+    """
+    self.__setDataset(arrays)
+    self.clearPartitionCache()
+    self.robotCache = {}
+    for topNumber in arrays['robotTops'].tolist():
+      robotDF = self.__arraysFrame(arrays, prefix=f'robot{topNumber}_')
+      robotDF.index.name = None                                     #Mismo índice que datasetForRobot
+      self.robotCache[topNumber] = robotDF
+
+  def saveState(self, statePath:str) -> None:
+    """Guarda el estado del modo incremental en un .npz para retomarlo en otro proceso (p. ej. la corrida del día siguiente).
+    A diferencia del caché del CSV incluye las líneas agregadas con appendOrders
+
+    Args:
+        statePath (str): Ruta al archivo .npz
+    """
+    self.__writeArrays(statePath, self.stateArrays())
+
+  @classmethod
+  def loadState(cls, statePath:str):
+    """Crea una instancia con el estado guardado por saveState, sin leer el CSV
+
+    Args:
+        statePath (str): Ruta al archivo .npz
+
+    Returns:
+        DataAnalysis: Instancia con el dataset, los datasets de robot (y las métricas por día en Simulation) restaurados
+    """
+    instance = cls()
+    with np.load(statePath, allow_pickle=False) as state:
+      instance.restoreState(state)
+    return instance
+
+  def appendOrders(self, orders) -> pd.DataFrame:
+    """Agrega líneas de pedido nuevas (p. ej. el día de hoy) al dataset limpio sin releer el historial. Actualiza destinos,
+    SKUs y días, y recalcula en los datasets de robot guardados por getRobotDataset solo los días afectados
+
+    Args:
+        orders (str | pd.DataFrame): Ruta a un CSV con el formato del export o DataFrame con sus columnas Destino, SKU,
+            BG Enviada y Fecha Comercial
+
+    Returns:
+        pd.DataFrame: Todas las líneas limpias de los días afectados. Columnas: Fecha (index), Destino, SKU, Cantidad
+    """
+    if isinstance(orders, str):
+      rawDF = pd.read_csv(orders, **csvReadOptions)
+    else:
+      #Mismos tipos que pd.read_csv: Destino y Fecha conservan los NaN y las fechas ya parseadas no se vuelven a leer
+      numericTypes = {col: dtype for col, dtype in csvReadOptions['dtype'].items() if col not in ('Destino', 'Fecha Comercial')}
+      rawDF = orders[csvReadOptions['usecols']].astype(numericTypes)
+      destino = rawDF['Destino']
+      rawDF['Destino'] = destino.where(destino.isna(), destino.astype(str))
+      if not pd.api.types.is_datetime64_any_dtype(rawDF['Fecha Comercial']):
+        rawDF['Fecha Comercial'] = pd.to_datetime(rawDF['Fecha Comercial'], dayfirst=True)
+
+    #Destinos nuevos (antes de filtrar cantidades), conservando el orden de aparición
+    knownDestinations = set(self.destinations)
+    newDestinations = [dest for dest in pd.unique(rawDF['Destino'].dropna()) if dest not in knownDestinations]
+    if newDestinations:
+      start = int(self.destinations.index.max()) + 1 if len(self.destinations) else 0
+      self.destinations = pd.concat([self.destinations, pd.Series(newDestinations, index=range(start, start + len(newDestinations)))])
+
+    newDF = self.__cleanOrders(rawDF)
+    self.fileDF = pd.concat([self.fileDF, newDF])
+    self.skus = pd.unique(np.concatenate([np.asarray(self.skus, dtype=np.int64), newDF['SKU'].to_numpy(dtype=np.int64)]))
+    self.days = pd.Series(np.unique(np.concatenate([self.days.to_numpy(dtype='datetime64[ns]'), newDF.index.values]))).dropna()
+    self.clearPartitionCache()
+
+    #Líneas de los días afectados. Si todos los días son nuevos alcanza con las líneas agregadas
+    newDays = pd.DatetimeIndex(newDF.index[newDF.index.notna()]).normalize().unique()
+    previousIndex = self.fileDF.index[:len(self.fileDF) - len(newDF)]
+    previousDays = pd.DatetimeIndex(previousIndex[previousIndex.notna()]).normalize()
+    if len(previousDays) == 0 or newDays.min() > previousDays.max():
+      affectedDF = newDF[newDF.index.notna()]
+    else:
+      affectedDF = self.fileDF[pd.DatetimeIndex(self.fileDF.index).normalize().isin(newDays)]
+
+    for topNumber, robotDF in self.robotCache.items():
+      keep = ~pd.DatetimeIndex(robotDF.index).normalize().isin(newDays)
+      robotDF = pd.concat([robotDF[keep], self.robotDataset(affectedDF, topNumber)])
+      if not robotDF.index.is_monotonic_increasing:
+        robotDF = robotDF.sort_index(kind='stable')
+      self.robotCache[topNumber] = robotDF
+
+    return affectedDF
+
+  def getRobotDataset(self, topNumber:int) -> pd.DataFrame:
+    """Dataset de robot guardado por topNumber. Se calcula con datasetForRobot la primera vez y appendOrders lo mantiene
+    actualizado. No modificar el DataFrame devuelto
+
+    Args:
+        topNumber (int): Cantidad de SKUs a guardar por día
+
+    Returns:
+        pd.DataFrame: Dataset filtrado. Columnas: Fecha (index), Destino, SKU, Cantidad
+    """
+    if topNumber not in self.robotCache:
+      self.robotCache[topNumber] = self.datasetForRobot(topNumber)
+    return self.robotCache[topNumber]
+
+  def __dayPartition(self, df:pd.DataFrame) -> tuple:
+    """Índice de partición por día del DataFrame. Ordena las filas por fecha (de forma estable) y guarda
+    el inicio y fin de cada día. Se construye una vez por DataFrame y se guarda por identidad
+
+    Args:
+        df (pd.DataFrame): DataFrame con índice de fechas
+
+    Returns:
+        tuple: DataFrame ordenado por fecha y diccionario fecha normalizada (ns) -> (inicio, fin)
+    """
+    cache = self.partitionCache
+    cached = cache.get(id(df))
+    if cached is not None and cached[0] is df:                      #Se guarda la referencia para no confundir objetos con el mismo id
+      return cached[1]
+
+    nat = np.iinfo(np.int64).min
+    keys = pd.DatetimeIndex(df.index).normalize().values.astype('datetime64[ns]').view(np.int64)
+    sortedDF = df
+    if np.any(keys[1:] < keys[:-1]):
+      order = np.argsort(keys, kind='stable')                       #Orden estable, se mantiene el orden de filas dentro del día
+      sortedDF = df.iloc[order]
+      keys = keys[order]
+    days, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+    bounds = {int(day): (int(start), int(start + count)) for day, start, count in zip(days, starts, counts) if day != nat}
+
+    if len(cache) >= partitionCacheSize:
+      del cache[next(iter(cache))]                                  #Descarta el más antiguo
+    cache[id(df)] = (df, (sortedDF, bounds))
+    return sortedDF, bounds
+
+  def clearPartitionCache(self) -> None:
+    """Descarta los índices de partición por día. Usar si se modifica un DataFrame ya particionado
+    """
+    self.partitionCache = {}
+
   def filterByDate(self, date:np.datetime64, df:pd.DataFrame=pd.DataFrame()) -> pd.DataFrame:
-    """Filtra dataset por día
+    """Filtra dataset por día. Usa el índice de partición por día y devuelve un slice posicional de las filas del día
 
     Args:
         date (np.datetime64): Fecha seleccionada
@@ -60,6 +455,13 @@ class DataAnalysis:
     Returns:
         pd.DataFrame: Dataset filtrado por día
     """
+    source = self.fileDF if df.empty else df
+    timestamp = pd.Timestamp(date)
+    if timestamp == timestamp.normalize():                          #Fecha sin hora, se usa la partición
+      sortedDF, bounds = self.__dayPartition(source)
+      start, end = bounds.get(timestamp.value, (0, 0))
+      return sortedDF.iloc[start:end]
+
     dia = pd.Timestamp(date).day
     mes = pd.Timestamp(date).month
     anio = pd.Timestamp(date).year
@@ -100,76 +502,74 @@ class DataAnalysis:
 
     return outputDataset
 
-  def getTopSKUs(self, dataset:pd.DataFrame, qty:int) -> pd.DataFrame:
-    """Filtra dataset y obtiene el top n de SKUs acorde a su cantidad
+  def __datedLines(self) -> pd.DataFrame:
+    """Líneas de pedido con fecha válida y columna de día normalizado, base de las estadísticas vectorizadas
+
+    Returns:
+        pd.DataFrame: Columnas: Dia, Destino, SKU, Cantidad
+    """
+    df = self.fileDF[self.fileDF.index.notna()]
+    return pd.DataFrame({'Dia': df.index.normalize(), 'Destino': df['Destino'].to_numpy(), 'SKU': df['SKU'].to_numpy(),
+                         'Cantidad': df['Cantidad'].to_numpy()})
+
+  def __rankWithinDay(self, daySkuDF:pd.DataFrame, layersCol:str) -> pd.DataFrame:
+    """Ordena SKUs por capas enteras descendente dentro de cada día (empates por SKU ascendente) y agrega ranking
 
     Args:
-        dataset (pd.DataFrame): Dataset con columnas de 'Fecha', 'Destino', 'SKU' y 'Cantidad'
-        qty (int): Cantidad de SKUs a guardar por cada cliente por día
+        daySkuDF (pd.DataFrame): Una fila por día y SKU, ordenado por Dia y SKU. Columnas: Dia, SKU, Cantidad, layersCol
+        layersCol (str): Nombre de la columna de capas enteras
 
     Returns:
-        pd.DataFrame: Dataset filtrado
+        pd.DataFrame: DataFrame ordenado con columna Rank (desde 0)
     """
-    outputDF = pd.DataFrame(columns=['Fecha', 'SKU', 'Cantidad', 'CapasEnteras'])  #Dataset una fila por sku por dia
-    topDF = pd.DataFrame(columns=['Fecha', 'CapasEnteras', 'SumaCapasDia', '%Top', 'Bandejas', 'CantSKU'])     #Dataset con una fila por dia pero con datos agregados solo para n SKUs
-    #dailyDF = pd.DataFrame(columns=['Fecha', 'SKU', 'Cantidad', 'CapasEnteras'])
-    for date in self.days:
-      dailyDF = pd.DataFrame(columns=['Fecha', 'SKU', 'Cantidad', 'CapasEnteras'])
-      dayDF = self.filterByDate(date).set_index('Destino')
-      self.lp = dayDF
-      for client in self.destinations:
-        if client in dayDF.index:
-          if isinstance(dayDF.loc[client], pd.DataFrame):  #Si ese día para ese cliente hay un único SKU
-            day_client_df = dayDF.loc[client].groupby(['SKU']).sum()
-          else:
-            day_client_df = dayDF.loc[client].to_frame().T
-            day_client_df = day_client_df.reset_index()
-            #day_client_df = day_client_df.drop(labels=['index'])
-            self.arr = day_client_df
-          day_client_df['Fecha'] = date
-          self.tre = day_client_df
-          if isinstance(dayDF.loc[client], pd.DataFrame):
-            day_client_df['CapasEnteras'] = (day_client_df['Cantidad']/traysPerLayer).apply(math.trunc)
-            day_client_df = day_client_df.reset_index()
-            try:
-              day_client_df = day_client_df.drop(labels=['level_0', 'index'])
-            except Exception as e:
-              pass
-            day_client_df = day_client_df.set_index(['Fecha'])
-            
-          else:
-            self.rr = day_client_df
-            day_client_df['CapasEnteras'] = math.trunc(day_client_df['Cantidad'].sum()/traysPerLayer)
-            day_client_df = day_client_df.reset_index()
-            try:
-              day_client_df = day_client_df.drop(labels=['level_0', 'index'])
-            except Exception as e:
-              pass
-            day_client_df = day_client_df.set_index(['Fecha'])
-          
-          if isinstance(dayDF.loc[client], pd.DataFrame):
-            dailyDF = pd.concat([dailyDF, day_client_df])
+    rankedDF = daySkuDF.sort_values(by=['Dia', layersCol], ascending=[True, False], kind='stable')
+    rankedDF['Rank'] = rankedDF.groupby('Dia').cumcount()
+    return rankedDF
 
-      if len(dailyDF) > 0:
-        dailyDF = dailyDF.groupby(['SKU']).sum()
-      self.drd = dailyDF
-      self.drd_date = date
-      dailyDF = dailyDF.sort_values(by=['CapasEnteras'], ascending=False)
+  def __topSummary(self, rankedDF:pd.DataFrame, qty:int, layersCol:str, totalCol:str) -> pd.DataFrame:
+    """Resumen por día de las capas del top qty de SKUs respecto al total
 
-      x = dailyDF.iloc[0:qty]['CapasEnteras'].sum()/dailyDF['CapasEnteras'].sum() if dailyDF['CapasEnteras'].sum() > 0 else 0
+    Args:
+        rankedDF (pd.DataFrame): Salida de __rankWithinDay
+        qty (int): Cantidad de SKUs del top
+        layersCol (str): Nombre de la columna de capas enteras
+        totalCol (str): Nombre de la columna de suma de capas del día
 
-      d = {'Fecha':[date], 'CapasEnteras':[dailyDF.iloc[0:qty]['CapasEnteras'].sum()], \
-           'SumaCapasDia':[dailyDF['CapasEnteras'].sum()], '%Top':[x],\
-           'Bandejas':[dailyDF['Cantidad'].sum()], 'CantSKU':[dailyDF['Cantidad'].count()]}
+    Returns:
+        pd.DataFrame: Una fila por día de self.days. Columnas: Fecha, layersCol, totalCol, %Top, Bandejas, CantSKU
+    """
+    days = pd.DatetimeIndex(self.days)
+    grouped = rankedDF.groupby('Dia')
+    topLayers = rankedDF[rankedDF['Rank'] < qty].groupby('Dia')[layersCol].sum().reindex(days, fill_value=0)
+    totalLayers = grouped[layersCol].sum().reindex(days, fill_value=0)
+    ratio = (topLayers/totalLayers.where(totalLayers > 0)).fillna(0.0)
+    return pd.DataFrame({'Fecha': days, layersCol: topLayers.to_numpy(), totalCol: totalLayers.to_numpy(), '%Top': ratio.to_numpy(),
+                         'Bandejas': grouped['Cantidad'].sum().reindex(days, fill_value=0).to_numpy(),
+                         'CantSKU': grouped['Cantidad'].count().reindex(days, fill_value=0).to_numpy()})
 
-      auxDF = pd.DataFrame(data = d)
+  def getTopSKUs(self, dataset:pd.DataFrame, qty:int) -> pd.DataFrame:
+    """Filtra dataset y obtiene el top n de SKUs acorde a su cantidad. Las capas enteras se truncan por cliente
+    y solo se consideran los clientes con más de una línea en el día
+
+    Args:
+        dataset (pd.DataFrame): Dataset con columnas de 'Fecha', 'Destino', 'SKU' y 'Cantidad'
+        qty (int): Cantidad de SKUs a guardar por cada cliente por día
 
-      topDF = pd.concat([topDF, auxDF])
+    Returns:
+        pd.DataFrame: Dataset filtrado
+    """
+    lines = self.__datedLines()
+    lines = lines[lines['Destino'].isin(self.destinations)]
+    lines = lines[lines.groupby(['Dia', 'Destino'])['SKU'].transform('size') > 1]     #Clientes con una sola línea en el día no se consideran
 
-      outputDF = pd.concat([outputDF, dailyDF])
+    clientDF = lines.groupby(['Dia', 'Destino', 'SKU'], as_index=False)['Cantidad'].sum()
+    clientDF['CapasEnteras'] = clientDF['Cantidad'] // traysPerLayer                     #Capas enteras por cliente
+    daySkuDF = clientDF.groupby(['Dia', 'SKU'], as_index=False)[['Cantidad', 'CapasEnteras']].sum()
+    rankedDF = self.__rankWithinDay(daySkuDF, 'CapasEnteras')
 
-    #outputDF = outputDF.set_index(['Fecha'])
-    #topDF = outputDF.set_index(['Fecha'])
+    outputDF = pd.DataFrame({'Fecha': rankedDF['Dia'].to_numpy(), 'SKU': rankedDF['SKU'].to_numpy(), 'Cantidad': rankedDF['Cantidad'].to_numpy(),
+                             'CapasEnteras': rankedDF['CapasEnteras'].to_numpy()}, index=rankedDF['SKU'].to_numpy())   #Dataset una fila por sku por dia
+    topDF = self.__topSummary(rankedDF, qty, 'CapasEnteras', 'SumaCapasDia')          #Dataset con una fila por dia pero con datos agregados solo para n SKUs
 
     return outputDF, topDF
 
@@ -182,11 +582,9 @@ class DataAnalysis:
     Returns:
         pd.DataFrame: Dataset modificado
     """
-    outputDF = pd.DataFrame(columns=['Fecha', 'Capas enteras', 'Pallets'])
-    for i in range(len(self.days)):
-      date = self.days[i]
-      dayDF = self.filterByDate(date)
-      outputDF.loc[i] = [date, math.trunc(dayDF['Cantidad'].sum()/traysPerLayer), math.trunc(dayDF['Cantidad'].sum()/(traysPerLayer*layersPerPallet))]
+    trays = self.__datedLines().groupby('Dia')['Cantidad'].sum().reindex(pd.DatetimeIndex(self.days), fill_value=0)
+    outputDF = pd.DataFrame({'Fecha': trays.index, 'Capas enteras': (trays // traysPerLayer).to_numpy(),
+                             'Pallets': (trays // (traysPerLayer*layersPerPallet)).to_numpy()})
 
     return outputDF
 
@@ -200,84 +598,94 @@ class DataAnalysis:
     Returns:
         pd.DataFrame: Dataset filtrado
     """
-    outputDF = pd.DataFrame(columns=['Fecha', 'SKU', 'Cantidad', 'Capas enteras', 'Pallets'])
-    topNDF = pd.DataFrame(columns=['Fecha', 'Capas enteras', 'Suma dia', '%Top', 'Bandejas', 'CantSKU'])
-
-    for i in range(len(self.days)):
-      date = self.days[i]
-      dayDF = self.filterByDate(date)
-      dailyDF = dayDF.drop(labels=['Destino'], axis=1)
-      dailyDF = dailyDF.groupby(['SKU']).sum()
-      dailyDF['Fecha'] = date
-      dailyDF['Capas enteras'] = (dailyDF['Cantidad']/traysPerLayer).apply(math.trunc)
-      dailyDF['Pallets'] = (dailyDF['Cantidad']/(traysPerLayer*layersPerPallet)).apply(math.trunc)
-      dailyDF = dailyDF.reset_index()
-      dailyDF = dailyDF.sort_values(by=['Capas enteras'], ascending=False)
-      self.tre = dailyDF
-      
-      outputDF = pd.concat([outputDF, dailyDF])
+    daySkuDF = self.__datedLines().groupby(['Dia', 'SKU'], as_index=False)['Cantidad'].sum()
+    daySkuDF['Capas enteras'] = daySkuDF['Cantidad'] // traysPerLayer
+    daySkuDF['Pallets'] = daySkuDF['Cantidad'] // (traysPerLayer*layersPerPallet)
+    rankedDF = self.__rankWithinDay(daySkuDF, 'Capas enteras')
 
-      x = dailyDF.iloc[0:skuQty]['Capas enteras'].sum()/dailyDF['Capas enteras'].sum() if dailyDF['Capas enteras'].sum() > 0 else 0
+    outputDF = rankedDF.rename(columns={'Dia': 'Fecha'}).set_index(['Fecha'])[['SKU', 'Cantidad', 'Capas enteras', 'Pallets']]
+    topNDF = self.__topSummary(rankedDF, skuQty, 'Capas enteras', 'Suma dia').set_index(['Fecha'])
 
-      d = {'Fecha':[date], 'Capas enteras':[dailyDF.iloc[0:skuQty]['Capas enteras'].sum()], \
-           'Suma dia':[dailyDF['Capas enteras'].sum()], '%Top':[x],\
-           'Bandejas':[dailyDF['Cantidad'].sum()], 'CantSKU':[dailyDF['Cantidad'].count()]}
+    return outputDF, topNDF
 
-      
-      auxDF = pd.DataFrame(data = d)
-      
-      topNDF = pd.concat([topNDF, auxDF])
+  def topCurve(self, maxNumber:int) -> pd.DataFrame:
+    """Curva de %Top para todo N de 1 a maxNumber en una sola pasada de suma acumulada.
+    La columna N coincide con el %Top de dailySKUStats(dataset, N)
 
-    outputDF = outputDF.set_index(['Fecha'])
-    topNDF = topNDF.set_index(['Fecha'])
+    Args:
+        maxNumber (int): Máximo N de SKUs a evaluar
 
-    return outputDF, topNDF
+    Returns:
+        pd.DataFrame: Una fila por día. Columnas: Fecha (index), 1..maxNumber
+    """
+    daySkuDF = self.__datedLines().groupby(['Dia', 'SKU'], as_index=False)['Cantidad'].sum()
+    daySkuDF['Capas enteras'] = daySkuDF['Cantidad'] // traysPerLayer
+    rankedDF = self.__rankWithinDay(daySkuDF, 'Capas enteras')
+    rankedDF['Acumuladas'] = rankedDF.groupby('Dia')['Capas enteras'].cumsum()
+    totals = rankedDF.groupby('Dia')['Capas enteras'].sum()
+
+    days = pd.DatetimeIndex(self.days)
+    curve = rankedDF[rankedDF['Rank'] < maxNumber].pivot(index='Dia', columns='Rank', values='Acumuladas')
+    curve = curve.reindex(index=days, columns=range(maxNumber)).ffill(axis=1).fillna(0)   #Días con menos SKUs quedan con el total
+    curve = curve.div(totals.reindex(days).where(lambda x: x > 0), axis=0).fillna(0.0)
+    curve.columns = range(1, maxNumber + 1)
+    curve.index.name = 'Fecha'
+
+    return curve
 
   @timer
   def datasetForRobot(self, topNumber:int) -> pd.DataFrame:
-    """Genera dataset para paletizado de robot. Filtra por día para quedarse solo con los SKU en el top 20 de cantidades
+    """Genera dataset para paletizado de robot. Filtra por día para quedarse solo con los SKU en el top N de cantidades.
+    Se calcula para todos los días a la vez: un groupby de capas enteras por (día, SKU), ranking dentro de cada día
+    y un único filtro de las líneas de pedido. Los empates en capas enteras se resuelven por SKU ascendente
+
     Args:
         topNumber (int): Cantidad de SKUs a guardar por día
 
     Returns:
-        pd.DataFrame: Dataset filtrado
+        pd.DataFrame: Dataset filtrado. Columnas: Fecha (index), Destino, SKU, Cantidad
     """
-    outputDF = pd.DataFrame(columns=['Destino', 'SKU', 'Cantidad'])
-    for date in self.days:
-      dailyTopSkus = pd.DataFrame(columns=['Fecha', 'SKU'])
-      auxDF = pd.DataFrame(columns=['SKU', 'CapasEnteras'])
-      dayDF = self.filterByDate(date)                                       #Comienza con columnas de Fecha (index), Destino, SKU y Cantidad. Se elimina la columna de Fecha
-      dayDF = dayDF.dropna()                                      #Nuevo
-      dayDF = dayDF.drop_duplicates(subset=['Destino', 'SKU'])    #Nuevo
-      dayDF_noDest = dayDF.drop(labels=['Destino'], axis=1)                 #Se elimina la columna de Destino
-      dayDF_noDest = dayDF_noDest.groupby(['SKU']).sum(numeric_only=True)   #Se suma Cantidad y quedan solo SKU y Cantidad
-      dayDF_noDest = dayDF_noDest.reset_index()                             #Tenía index SKU y se resetea
-
-      auxDF['SKU'] = dayDF_noDest['SKU']                                    #Se copia la columna de SKU
-      auxDF['CapasEnteras'] = (dayDF_noDest['Cantidad']/traysPerLayer).apply(math.trunc)  #Se le asigna la cantidad de capas enteras haciendo división entera de cantidad
-      auxDF = auxDF.sort_values(by=['CapasEnteras'], ascending=False)       #Se ordena por cantidad de capas enteras
+    return self.robotDataset(self.fileDF, topNumber)
 
-      dailyTopSkus = auxDF[0:topNumber].copy()                              #Se hace el slice del dataset por los 20 SKU de más cantidad de capas. Tiene columna de SKU y CapasEnteras
-      dailyTopSkus['Fecha'] = date                                          #Al nuevo dataset para el día se asigna la Fecha (la misma para todas las filas porque es solo el día)
-      dailyTopSkus = dailyTopSkus.drop(labels=['Fecha'], axis=1)
-      dailyTopSkus = dailyTopSkus.set_index(['SKU'])
+  def robotDataset(self, ordersDF:pd.DataFrame, topNumber:int) -> pd.DataFrame:
+    """Dataset para robot de las líneas de pedido dadas. El ranking es dentro de cada día, así que aplicado a un único
+    día (p. ej. de streamDays) da las mismas filas que datasetForRobot para ese día
 
-      #Hay que eliminar líneas de SKU duplicadas por día y por cliente
-
-
-      dailyDF = pd.merge(dayDF, dailyTopSkus, how='inner', on=['SKU'])      #Intersección de tablas, se obtiene el dataset del día filtrado por los SKU del dataset top 20. Ya viene con 
-                                                                            # la columna de fecha de la tabla de top 20.
-      dailyDF['Fecha'] = date                                               #Se agrega columna de fecha 
-      dailyDF = dailyDF.drop(labels=['CapasEnteras'], axis=1)               #Se elimina la de capas enteras que solo servía para filtar el top 20
-      dailyDF = dailyDF.set_index(['Fecha'])                                #Se asigna fecha al índice
+    Args:
+        ordersDF (pd.DataFrame): Líneas de pedido limpias. Columnas: Fecha (index), Destino, SKU, Cantidad
+        topNumber (int): Cantidad de SKUs a guardar por día
 
-      outputDF = pd.concat([outputDF, dailyDF])                             #Se concatena con todos los días para formar el dataset deseado
+    Returns:
+        pd.DataFrame: Dataset filtrado. Columnas: Fecha (index), Destino, SKU, Cantidad
+    """
+    df = ordersDF.dropna()
+    df = df[df.index.notna()]
+    lines = pd.DataFrame({'Dia': df.index.normalize(), 'Destino': df['Destino'].to_numpy(), 'SKU': df['SKU'].to_numpy(),
+                          'Cantidad': df['Cantidad'].to_numpy(), 'Pos': np.arange(len(df))})
+    lines = lines.drop_duplicates(subset=['Dia', 'Destino', 'SKU'])                #Una línea por SKU por cliente por día
+
+    #Capas enteras por (día, SKU) y ranking dentro de cada día
+    daySkuDF = lines.groupby(['Dia', 'SKU'], as_index=False)['Cantidad'].sum()     #Queda ordenado por día y SKU
+    daySkuDF['CapasEnteras'] = daySkuDF['Cantidad'] // traysPerLayer
+    daySkuDF = daySkuDF.sort_values(by=['Dia', 'CapasEnteras'], ascending=[True, False], kind='stable')
+    daySkuDF['Rank'] = daySkuDF.groupby('Dia').cumcount()
+    topDF = daySkuDF.loc[daySkuDF['Rank'] < topNumber, ['Dia', 'SKU']]
+
+    #Se filtran las líneas de pedido de los SKU top de cada día
+    outputDF = lines.merge(topDF, how='inner', on=['Dia', 'SKU'])
+    #Orden: por día, SKU en orden de aparición y luego orden de las líneas
+    outputDF['PrimeraPos'] = outputDF.groupby(['Dia', 'SKU'])['Pos'].transform('min')
+    outputDF = outputDF.sort_values(by=['Dia', 'PrimeraPos', 'Pos'], kind='stable')
+    outputDF = outputDF.set_index('Dia')[['Destino', 'SKU', 'Cantidad']]
+    outputDF.index.name = None
 
     return outputDF
 
   @timer
   def bestCasePalletizing(self, robotDataset:pd.DataFrame):
-    """Calcula el mejor caso de que porcentaje de movimientos se podrían hacer con el robot considerando pallets completos de "base"
+    """Calcula el mejor caso de que porcentaje de movimientos se podrían hacer con el robot considerando pallets completos de "base".
+    Por cliente y día las capas base son las de los total_layers // layersPerPallet SKUs con más capas, calculado con
+    un ordenamiento agrupado y ranking acumulado para todos los días a la vez
 
     Args:
         robotDataset (pd.DataFrame): Dataset filtrado para robot con top 20 SKU
@@ -285,38 +693,30 @@ class DataAnalysis:
     Returns:
         float: Porcentaje de mejora de movimientos
     """
-    movements_client_DF = pd.DataFrame(columns=['Fecha', 'Destino', 'Movimientos', 'CapasTotales'])
-    movements_day_DF = pd.DataFrame(columns=['Fecha', 'Movimientos', 'CapasTotales'])
-    for date in self.days:                                                  #Iteración por día
-      dailyDF = pd.DataFrame(columns=['Fecha', 'SKU', 'Cantidad', 'CapasEnteras'])
-      dayDF = self.filterByDate(date, df=robotDataset).set_index(['Destino'])   #Dataframe del día con Destino, SKU y Cantidad
-      for client in self.destinations:                                      #Iteración por destino  
-        if client in dayDF.index:                                           #No todos los días tienen envíos a todos los destinos
-          if isinstance(dayDF.loc[client], pd.DataFrame):                   #Si ese día para ese cliente hay un único SKU va a devolver una Series no DataFrame
-            day_client_df = dayDF.loc[client].groupby(['SKU']).sum()        #Se agrupa por SKU (aunque no debería haber repetidos)
-          else:
-            day_client_df = dayDF.loc[client].to_frame().T                  #Si hay solo un SKU se convierte la Series devuelta a DataFrame por compatibilidad
-            day_client_df = day_client_df.set_index(['SKU'])                #Cambio de índice para asimilar al caso de DF
-          
-          day_client_df['Fecha'] = date                                     #Columnas de fecha y CapasEnteras
-          day_client_df['CapasEnteras'] = (day_client_df['Cantidad']/traysPerLayer).apply(math.trunc)
-          #print("Aham")                                                     #Aham
-          total_layers = 0
-          base_layers = 0
-          total_layers = day_client_df['CapasEnteras'].sum()                #Capas (Movimientos) totales por día por cliente
-          total_pallets = math.trunc(total_layers/layersPerPallet)          #Pallets derivados de esas capas
-          ordered_dcdf = day_client_df.sort_values(by=['CapasEnteras'], ascending=False)[0:total_pallets].copy()  #Pedazo de DF con los que consideramos "base"
-          base_layers = ordered_dcdf['CapasEnteras'].sum()
-          client_min_movements = total_layers - base_layers
-
-          d1 = {'Fecha':[date], 'Destino':[client], 'Movimientos':[client_min_movements], 'CapasTotales':[total_layers]}
-          auxDF1 = pd.DataFrame(data = d1)
-          movements_client_DF = pd.concat([movements_client_DF, auxDF1])
-
-      singleDayDF = movements_client_DF[movements_client_DF['Fecha']==date]
-      d2 = {'Fecha':[date], 'Movimientos':[singleDayDF['Movimientos'].sum()], 'CapasTotales':singleDayDF['CapasTotales'].sum()}
-      auxDF2 = pd.DataFrame(data = d2)
-      movements_day_DF = pd.concat([movements_day_DF, auxDF2])
+    days = pd.DatetimeIndex(self.days)
+    df = robotDataset[robotDataset.index.notna()]
+    destinationOrder = {dest: pos for pos, dest in enumerate(self.destinations)}
+    lines = pd.DataFrame({'Fecha': pd.DatetimeIndex(df.index).normalize(), 'Destino': df['Destino'].to_numpy(),
+                          'SKU': df['SKU'].to_numpy(), 'Cantidad': df['Cantidad'].to_numpy(dtype=np.int64)})
+    lines = lines[lines['Destino'].isin(destinationOrder) & lines['Fecha'].isin(days)]
+
+    #Capas enteras por cliente, día y SKU, ordenadas de mayor a menor dentro de cada (día, cliente)
+    skuDF = lines.groupby(['Fecha', 'Destino', 'SKU'], as_index=False)['Cantidad'].sum()
+    skuDF['CapasEnteras'] = skuDF['Cantidad'] // traysPerLayer
+    skuDF = skuDF.sort_values(by=['Fecha', 'Destino', 'CapasEnteras'], ascending=[True, True, False], kind='stable')
+    skuDF['Rank'] = skuDF.groupby(['Fecha', 'Destino']).cumcount()
+    totalLayers = skuDF.groupby(['Fecha', 'Destino'])['CapasEnteras'].transform('sum')     #Capas (Movimientos) totales por día por cliente
+    skuDF['Base'] = skuDF['CapasEnteras'].where(skuDF['Rank'] < totalLayers // layersPerPallet, 0)   #SKUs que consideramos "base"
+
+    movements_client_DF = skuDF.groupby(['Fecha', 'Destino'], as_index=False).agg(Base=('Base', 'sum'), CapasTotales=('CapasEnteras', 'sum'))
+    movements_client_DF['Movimientos'] = movements_client_DF['CapasTotales'] - movements_client_DF['Base']
+    movements_client_DF['Orden'] = movements_client_DF['Destino'].map(destinationOrder)
+    movements_client_DF = movements_client_DF.sort_values(by=['Fecha', 'Orden'], kind='stable')
+    movements_client_DF = movements_client_DF[['Fecha', 'Destino', 'Movimientos', 'CapasTotales']].reset_index(drop=True)
+
+    dayTotals = movements_client_DF.groupby('Fecha')[['Movimientos', 'CapasTotales']].sum().reindex(days, fill_value=0)
+    movements_day_DF = pd.DataFrame({'Fecha': days, 'Movimientos': dayTotals['Movimientos'].to_numpy(),
+                                     'CapasTotales': dayTotals['CapasTotales'].to_numpy()})
 
     movements_client_DF = movements_client_DF[movements_client_DF['CapasTotales'] > 0]
     x = movements_client_DF['Movimientos']/movements_client_DF['CapasTotales'] if len(movements_client_DF['CapasTotales']) > 1 else 0
@@ -325,6 +725,8 @@ class DataAnalysis:
     return movements_day_DF, movements_client_DF 
 
 class Capa:
+  __slots__ = ('SKU', 'layerNumber')
+
   def __init__(self, SKU:int, layer:int) -> None:
     """Inicialización de clase asignando SKU y numero de capa
 
@@ -336,22 +738,31 @@ class Capa:
     self.layerNumber = layer
 
 class PalletEntrada:
+  """Pallet de entrada de un único SKU. Solo guarda la cantidad de capas, los objetos Capa se generan al consultarlos
+  """
+  __slots__ = ('id', 'currentLayers', 'empty', 'product')
   id_obj = itertools.count()
 
   def __init__(self, SKU:int) -> None:
-    """Inicialización de clase creando lista de objetos Capa
+    """Inicialización de clase con pallet completo
 
     Args:
         SKU (int): SKU del cual serán todas las capas
     """
     #Inicialización de propiedades
     self.id = next(PalletEntrada.id_obj)
-    self.layers = []
-    self.currentLayers = 15
+    self.currentLayers = layersPerPallet
     self.empty = False
     self.product = SKU
-    #Creación de capas dentro de lista
-    self.layers += [Capa(SKU, i) for i in range(self.currentLayers)]
+
+  @property
+  def layers(self) -> List[Capa]:
+    """Detalle de capas del pallet, generado a partir del contador
+
+    Returns:
+        List[Capa]: Capas restantes, de abajo hacia arriba
+    """
+    return [Capa(self.product, i) for i in range(self.currentLayers)]
 
   def __isEmpty(self) -> bool:
     """Retorna si el pallet tiene 0 filas o no
@@ -370,32 +781,54 @@ class PalletEntrada:
     Returns:
         Capa: Objeto capa retirado de pallet
     """
+    self.subtractLayers(1)
+    return Capa(self.product, self.currentLayers)
+
+  def subtractLayers(self, layers:int) -> None:
+    """Retira varias capas del pallet
+
+    Args:
+        layers (int): Cantidad de capas a retirar
+
+    Raises:
+        ValueError: Si el pallet no tiene suficientes capas
+    """
     #Verifica que pallet tenga capas
-    if not self.empty:
-      removedLayer = self.layers[-1]      #Extrae capa
-      del self.layers[-1]                 #Elimina elemento de lista
-      self.currentLayers -= 1             #Decrementa contador de capas
-      self.empty = self.__isEmpty()       #Actualiza estado de variable empty
-    else:
+    if self.empty or layers > self.currentLayers:
       raise ValueError('No se pueden retirar capas porque el pallet ya esta vacío')
-    return removedLayer
+    self.currentLayers -= layers          #Decrementa contador de capas
+    self.empty = self.__isEmpty()         #Actualiza estado de variable empty
     
 class PalletSalida:
+  """Pallet de salida para un destino. Guarda las capas como segmentos [SKU, cantidad] en orden de carga,
+  los objetos Capa se generan al consultarlos
+  """
+  __slots__ = ('id', 'segments', 'currentLayers', 'complete', 'destination')
   #ID incremental
   id_obj = itertools.count()
 
   def __init__(self, destination:str) -> None:
-    """Inicialización de clase creando lista vacia para capas con destino asignado
+    """Inicialización de clase creando lista vacia de segmentos con destino asignado
 
     Args:
         destination (str): Destino del pallet
     """
     #Inicialización de propiedades
     self.id = next(PalletSalida.id_obj)
-    self.layers = []
+    self.segments = []
     self.currentLayers = 0
     self.complete = False
     self.destination = destination
+
+  @property
+  def layers(self) -> List[Capa]:
+    """Detalle de capas del pallet, generado a partir de los segmentos
+
+    Returns:
+        List[Capa]: Capas del pallet con su numero de capa (desde 1)
+    """
+    skus = [sku for sku, count in self.segments for _ in range(count)]
+    return [Capa(sku, i + 1) for i, sku in enumerate(skus)]
     
   def __isComplete(self) -> bool:
     """Retorna si el pallet tiene 15 filas o no
@@ -403,7 +836,7 @@ class PalletSalida:
     Returns:
         bool: Pallet completo
     """
-    return self.currentLayers == 15
+    return self.currentLayers == layersPerPallet
   
   def addLayer(self, newLayer:Capa) -> None:
     """Agrega capa a pallet de salida
@@ -411,14 +844,27 @@ class PalletSalida:
     Args:
         layer (Capa): Capa retirada de pallet de entrada
     """
+    self.addLayers(newLayer.SKU, 1)
+
+  def addLayers(self, SKU:int, layers:int) -> None:
+    """Agrega varias capas de un SKU al pallet de salida
+
+    Args:
+        SKU (int): SKU de las capas
+        layers (int): Cantidad de capas
+
+    Raises:
+        ValueError: Si las capas no entran en el pallet
+    """
     #Verifica que el pallet tenga lugar
-    if not self.complete:
-      newLayer.layerNumber = self.currentLayers + 1   #Actualiza numero de capa
-      self.layers.append(newLayer)                    #Agrega capa a la lista
-      self.currentLayers += 1                         #Incrementa contador de capas
-      self.complete = self.__isComplete()               #Actualiza el estado de la variable complete
-    else:
+    if self.complete or self.currentLayers + layers > layersPerPallet:
       raise ValueError('No se pueden agregar capas porque el pallet ya esta completo')
+    if self.segments and self.segments[-1][0] == SKU:
+      self.segments[-1][1] += layers                  #Mismo SKU que la última capa, se extiende el segmento
+    else:
+      self.segments.append([SKU, layers])
+    self.currentLayers += layers                      #Incrementa contador de capas
+    self.complete = self.__isComplete()               #Actualiza el estado de la variable complete
 
   def layerListToDF(self) -> pd.DataFrame:
     """Convierte lista de capas a pandas DataFrame con columnas Capa y SKU
@@ -426,12 +872,8 @@ class PalletSalida:
     Returns:
         pd.DataFrame: DataFrame de filas de pallet
     """
-    df = pd.DataFrame(columns=['Capa', 'SKU'])          #Definición de DF vacío
-    for layer in self.layers:                           #Iteración en lista de capas
-      a = {'Capa': layer.layerNumber, 'SKU': layer.SKU} #Genera fila
-      df = pd.concat([df, pd.DataFrame(data=a)])        #Concatena cada fila al DF
-
-    return df
+    skus = [sku for sku, count in self.segments for _ in range(count)]
+    return pd.DataFrame({'Capa': np.arange(1, len(skus) + 1), 'SKU': skus})
 
   def __skuTotals(self) -> pd.Series:
     """Retorna cantidades de cada SKU en el pallet
@@ -443,6 +885,467 @@ class PalletSalida:
 
     return layers_df.groupby(['SKU']).count()
 
+class OrderBook:
+  """Libro de pedidos del día. Guarda las capas pendientes de cada par (Destino, SKU) en una matriz de enteros
+  para que la simulación lea y descuente demanda en O(1) sin reescribir el DataFrame del día
+  """
+
+  def __init__(self, dayDataset:pd.DataFrame) -> None:
+    """Inicialización de clase a partir del dataset del día
+
+    Args:
+        dayDataset (pd.DataFrame): Dataset del día para simulación. Columnas: Destino, SKU, Cantidad
+    """
+    df = dayDataset.dropna(subset=['Destino', 'SKU'])
+    destCodes, self.destinations = pd.factorize(df['Destino'])           #Códigos enteros por destino en orden de aparición
+    skuCodes, self.skus = pd.factorize(df['SKU'])                        #Códigos enteros por SKU en orden de aparición
+    self.destCode = {dest: code for code, dest in enumerate(self.destinations)}
+    self.skuCode = {sku: code for code, sku in enumerate(self.skus)}
+
+    #Matriz de demanda. Si hay filas repetidas para un mismo par se suman
+    self.demand = np.zeros((len(self.destinations), len(self.skus)), dtype=np.int64)
+    np.add.at(self.demand, (destCodes, skuCodes), df['Cantidad'].to_numpy(dtype=np.int64))
+    self.destTotals = self.demand.sum(axis=1)                            #Capas pendientes por destino
+    self.skuTotals = self.demand.sum(axis=0)                             #Capas pendientes por SKU
+    self.total = int(self.destTotals.sum())                              #Capas pendientes totales
+    self.modified = False
+
+    #Primera fila de cada par para conservar el orden del dataset al materializar
+    pairCodes = destCodes * len(self.skus) + skuCodes
+    _, firstRows = np.unique(pairCodes, return_index=True)
+    firstRows.sort()
+    self.rowDest = destCodes[firstRows]
+    self.rowSku = skuCodes[firstRows]
+    self.rowIndex = df.index[firstRows]
+    self.indexName = df.index.name
+
+    #Índice invertido SKU -> destinos con capas pendientes, en el orden del dataset (dict conserva el orden de inserción)
+    self.skuDestinations = [dict() for _ in range(len(self.skus))]
+    for d, s in zip(self.rowDest, self.rowSku):
+      if self.demand[d, s] > 0:
+        self.skuDestinations[s][self.destinations[d]] = None
+
+  def layers(self, destination:str, SKU:int) -> int:
+    """Capas pendientes del SKU para el destino
+
+    Args:
+        destination (str): Destino
+        SKU (int): SKU
+
+    Returns:
+        int: Cantidad de capas pendientes
+    """
+    d = self.destCode.get(destination)
+    s = self.skuCode.get(SKU)
+    if d is None or s is None:
+      return 0
+    return int(self.demand[d, s])
+
+  def destinationLayers(self, destination:str) -> int:
+    """Capas pendientes para el destino sumando todos los SKU
+
+    Args:
+        destination (str): Destino
+
+    Returns:
+        int: Cantidad de capas pendientes
+    """
+    d = self.destCode.get(destination)
+    return 0 if d is None else int(self.destTotals[d])
+
+  def skuLayers(self, SKU:int) -> int:
+    """Capas pendientes del SKU sumando todos los destinos
+
+    Args:
+        SKU (int): SKU
+
+    Returns:
+        int: Cantidad de capas pendientes
+    """
+    s = self.skuCode.get(SKU)
+    return 0 if s is None else int(self.skuTotals[s])
+
+  def skuDestinationCount(self, SKU:int) -> int:
+    """Cantidad de destinos que todavía requieren capas del SKU
+
+    Args:
+        SKU (int): SKU
+
+    Returns:
+        int: Cantidad de destinos abiertos
+    """
+    s = self.skuCode.get(SKU)
+    return 0 if s is None else len(self.skuDestinations[s])
+
+  def destinationsForSku(self, SKU:int) -> List[str]:
+    """Destinos que todavía requieren capas del SKU, en el orden del dataset.
+    Se lee del índice invertido, sin recorrer la matriz de demanda
+
+    Args:
+        SKU (int): SKU seleccionado
+
+    Returns:
+        List[str]: Lista de destinos para ese SKU
+    """
+    s = self.skuCode.get(SKU)
+    if s is None:
+      return []
+    return list(self.skuDestinations[s])
+
+  def subtract(self, destination:str, SKU:int, layers:int=1) -> None:
+    """Descuenta capas de la demanda de un par (Destino, SKU)
+
+    Args:
+        destination (str): Destino
+        SKU (int): SKU
+        layers (int, optional): Capas a descontar. Defaults to 1.
+
+    Raises:
+        ValueError: Si el par no tiene suficientes capas pendientes
+    """
+    d = self.destCode.get(destination)
+    s = self.skuCode.get(SKU)
+    if d is None or s is None or self.demand[d, s] < layers:
+      raise ValueError(f'No hay {layers} capas pendientes del SKU {SKU} para el destino {destination}')
+    self.demand[d, s] -= layers
+    self.destTotals[d] -= layers
+    self.skuTotals[s] -= layers
+    self.total -= layers
+    self.modified = True
+    if self.demand[d, s] == 0:                                    #El par quedó sin demanda, se quita del índice invertido
+      del self.skuDestinations[s][destination]
+
+  def toDataFrame(self) -> pd.DataFrame:
+    """Materializa la demanda pendiente como DataFrame para reportes
+
+    Returns:
+        pd.DataFrame: Dataset con pares con capas pendientes. Columnas: Destino, SKU, Cantidad
+    """
+    quantities = self.demand[self.rowDest, self.rowSku]
+    keep = quantities > 0
+    df = pd.DataFrame({'Destino': self.destinations[self.rowDest[keep]], 'SKU': self.skus[self.rowSku[keep]], 'Cantidad': quantities[keep]},
+                      index=self.rowIndex[keep])
+    df.index.name = self.indexName
+    return df
+
+class ExitPalletRegistry:
+  """Registro de pallets de salida abiertos indexado por destino. Permite encontrar pallets para un conjunto de destinos,
+  detectar pallets para cerrar y retirarlos sin recorrer todos los pallets abiertos
+  """
+
+  def __init__(self) -> None:
+    """Inicialización de clase con registro vacío
+    """
+    self.openPallets = {}             #id -> PalletSalida, en orden de creación
+    self.byDestination = {}           #destino -> {id: PalletSalida} abiertos
+    self.completeOpen = {}            #id -> PalletSalida completos que siguen abiertos
+    self.retirePending = {}           #id -> PalletSalida marcados para cerrar
+    self.exhaustedDestinations = set()    #Destinos sin demanda desde el último cierre
+
+  def __len__(self) -> int:
+    return len(self.openPallets)
+
+  def __iter__(self):
+    return iter(list(self.openPallets.values()))
+
+  def add(self, pallet:PalletSalida) -> PalletSalida:
+    """Registra un pallet de salida abierto
+
+    Args:
+        pallet (PalletSalida): Pallet a registrar
+
+    Returns:
+        PalletSalida: El mismo pallet
+    """
+    self.openPallets[pallet.id] = pallet
+    self.byDestination.setdefault(pallet.destination, {})[pallet.id] = pallet
+    if pallet.complete:
+      self.completeOpen[pallet.id] = pallet
+    return pallet
+
+  def newest(self) -> PalletSalida:
+    """Último pallet abierto que sigue en el registro
+
+    Returns:
+        PalletSalida: Pallet más reciente
+    """
+    return next(reversed(self.openPallets.values()))
+
+  def candidates(self, destinations:List[str]) -> List[PalletSalida]:
+    """Pallets abiertos no completos de los destinos dados, en orden de creación
+
+    Args:
+        destinations (List[str]): Destinos buscados
+
+    Returns:
+        List[PalletSalida]: Pallets candidatos
+    """
+    pallets = [pallet for dest in destinations for pallet in self.byDestination.get(dest, {}).values() if not pallet.complete]
+    pallets.sort(key=lambda pallet: pallet.id)
+    return pallets
+
+  def palletUpdated(self, pallet:PalletSalida, destinationLayers:int) -> None:
+    """Actualiza el registro luego de cargar capas en un pallet
+
+    Args:
+        pallet (PalletSalida): Pallet cargado
+        destinationLayers (int): Capas que le quedan al destino del pallet
+    """
+    if pallet.complete and pallet.id in self.openPallets:
+      self.completeOpen[pallet.id] = pallet
+    if destinationLayers == 0:
+      self.exhaustedDestinations.add(pallet.destination)
+
+  def markComplete(self) -> None:
+    """Marca para cerrar todos los pallets completos abiertos
+    """
+    self.retirePending.update(self.completeOpen)
+
+  def markExhausted(self) -> None:
+    """Marca para cerrar los pallets de destinos que se quedaron sin capas por asignar
+    """
+    for dest in self.exhaustedDestinations:
+      self.retirePending.update(self.byDestination.get(dest, {}))
+    self.exhaustedDestinations = set()
+
+  def retire(self) -> List[PalletSalida]:
+    """Quita del registro los pallets marcados para cerrar
+
+    Returns:
+        List[PalletSalida]: Pallets cerrados, del más reciente al más antiguo
+    """
+    retired = sorted(self.retirePending.values(), key=lambda pallet: pallet.id, reverse=True)
+    for pallet in retired:
+      del self.openPallets[pallet.id]
+      del self.byDestination[pallet.destination][pallet.id]
+      self.completeOpen.pop(pallet.id, None)
+    self.retirePending = {}
+    return retired
+
+class EntryPalletSelector:
+  """Estado de asignación de pallets de entrada en arrays. Elige el SKU de cada posición liberada en O(log n):
+  al azar con un árbol de Fenwick sobre los SKUs con pallets disponibles (mismo orden y sorteo que DataFrame.sample),
+  o por prioridad con un heap de claves perezosas (mayor demanda pendiente o más destinos abiertos)
+  """
+
+  def __init__(self, skuAllocation:pd.DataFrame, orderBook:OrderBook, policy:str='random', rng:np.random.Generator=None) -> None:
+    """Inicialización de clase a partir de la asignación de SKUs del día
+
+    Args:
+        skuAllocation (pd.DataFrame): Asignación de SKUs. Columnas: SKU (index), PalletsParciales
+        orderBook (OrderBook): Libro de pedidos de la simulación
+        policy (str, optional): Política de elección, una de entryPolicies. Defaults to 'random'.
+        rng (np.random.Generator, optional): Generador para la política aleatoria. Defaults to None (RNG global de NumPy).
+
+    Raises:
+        ValueError: Si la política no existe
+    """
+    if policy not in entryPolicies:
+      raise ValueError(f"Política de pallets de entrada desconocida: {policy}. Opciones: {', '.join(entryPolicies)}")
+    self.policy = policy
+    self.rng = rng
+    self.orderBook = orderBook
+    self.skus = skuAllocation.index.to_numpy()
+    self.position = {sku: i for i, sku in enumerate(self.skus.tolist())}
+    self.partials = skuAllocation['PalletsParciales'].to_numpy(dtype=np.int64).copy()   #Pallets parciales restantes por SKU
+    self.remaining = int(self.partials.sum())
+
+    available = self.partials > 0
+    if policy == 'random':
+      #Árbol de Fenwick con 1 en cada SKU disponible
+      self.tree = np.zeros(len(self.skus) + 1, dtype=np.int64)
+      self.inTree = np.zeros(len(self.skus), dtype=bool)
+      for i in np.flatnonzero(available).tolist():
+        self.__treeAdd(i, 1)
+    else:
+      self.heap = [(-self.__priority(i), i) for i in np.flatnonzero(available).tolist()]
+      heapq.heapify(self.heap)
+
+  def __treeAdd(self, i:int, delta:int) -> None:
+    self.inTree[i] = delta > 0
+    i += 1
+    while i < len(self.tree):
+      self.tree[i] += delta
+      i += i & -i
+
+  def __treeFind(self, k:int) -> int:
+    """Posición del k-ésimo SKU disponible (desde 0) en el orden de la asignación
+    """
+    position = 0
+    step = 1 << (len(self.tree) - 1).bit_length()
+    while step:
+      if position + step < len(self.tree) and self.tree[position + step] <= k:
+        position += step
+        k -= self.tree[position]
+      step >>= 1
+    return position
+
+  def __priority(self, i:int) -> int:
+    if self.policy == 'demand':
+      return self.orderBook.skuLayers(self.skus[i])
+    return self.orderBook.skuDestinationCount(self.skus[i])
+
+  def release(self, SKU:int) -> int:
+    """Descuenta un pallet del SKU de una posición que se libera
+
+    Args:
+        SKU (int): SKU del pallet
+
+    Returns:
+        int: Posición del SKU en la asignación
+    """
+    i = self.position[SKU]
+    self.partials[i] -= 1
+    self.remaining -= 1
+    if self.policy == 'random' and self.partials[i] <= 0 and self.inTree[i]:
+      self.__treeAdd(i, -1)
+    return i
+
+  def useful(self, i:int) -> bool:
+    """Indica si al SKU le quedan pallets y destinos con demanda
+
+    Args:
+        i (int): Posición del SKU en la asignación
+
+    Returns:
+        bool: True si un nuevo pallet del SKU puede recibir destinos
+    """
+    return self.partials[i] > 0 and self.orderBook.skuDestinationCount(self.skus[i]) > 0
+
+  def choose(self, active:set, assigned:set) -> int:
+    """Elige el SKU para una posición. Se evitan los SKUs activos en la iteración anterior y los ya asignados;
+    si no hay otro se permite repetir uno activo
+
+    Args:
+        active (set): Posiciones de SKUs de la iteración anterior
+        assigned (set): Posiciones de SKUs ya asignados en este cambio
+
+    Returns:
+        int: Posición del SKU elegido, None si no hay SKUs disponibles
+    """
+    if self.policy == 'random':
+      return self.__chooseRandom(active, assigned)
+    return self.__choosePriority(active, assigned)
+
+  def __chooseRandom(self, active:set, assigned:set) -> int:
+    excluded = [i for i in active | assigned if self.inTree[i]]
+    for i in excluded:
+      self.__treeAdd(i, -1)
+    available = self.__treeCount()
+    if available == 0:                                          #Filtro menos estricto, se permiten los activos
+      for i in excluded:
+        if i not in assigned:
+          self.__treeAdd(i, 1)
+      available = self.__treeCount()
+
+    chosen = None
+    if available > 0:
+      randomState = self.rng if self.rng is not None else np.random
+      chosen = self.__treeFind(int(randomState.choice(available, size=1, replace=False)[0]))
+    for i in excluded:
+      if not self.inTree[i]:
+        self.__treeAdd(i, 1)
+    return chosen
+
+  def __treeCount(self) -> int:
+    count = 0
+    i = len(self.tree) - 1
+    while i > 0:
+      count += self.tree[i]
+      i -= i & -i
+    return int(count)
+
+  def __choosePriority(self, active:set, assigned:set) -> int:
+    chosen = None
+    aside = []
+    activeAside = []
+    while self.heap:
+      key, i = heapq.heappop(self.heap)
+      if self.partials[i] <= 0:                                 #Sin pallets restantes, se descarta
+        continue
+      priority = self.__priority(i)
+      if priority == 0:                                         #Sin demanda pendiente, la prioridad ya no vuelve a subir
+        continue
+      if -key != priority:                                      #Clave desactualizada, la prioridad solo disminuye
+        heapq.heappush(self.heap, (-priority, i))
+        continue
+      if i in assigned:
+        aside.append((key, i))
+      elif i in active:
+        activeAside.append((key, i))
+      else:
+        chosen = i
+        aside.append((key, i))
+        break
+
+    if chosen is None and activeAside:
+      chosen = activeAside[0][1]                                #El activo de mayor prioridad
+    for entry in aside + activeAside:
+      heapq.heappush(self.heap, entry)
+    return chosen
+
+class SimulationRecorder:
+  """Registro columnar de la simulación. Guarda cada paso en arrays de NumPy que duplican su capacidad al llenarse
+  y solo arma el DataFrame cuando se consulta
+  """
+  columns = ['RemLayers', 'ExitPallets', 'CompPallets', 'LayerTransfers', 'BatchTransfers', 'PalletChanges']
+
+  def __init__(self, stride:int=1, capacity:int=1024) -> None:
+    """Inicialización de clase con arrays vacíos
+
+    Args:
+        stride (int, optional): Se guarda un paso cada stride pasos. Defaults to 1.
+        capacity (int, optional): Capacidad inicial de los arrays. Defaults to 1024.
+    """
+    if stride < 1:
+      raise ValueError('El paso de muestreo debe ser al menos 1')
+    self.stride = stride
+    self.steps = 0                                                #Pasos registrados (incluye los no muestreados)
+    self.size = 0                                                 #Filas guardadas
+    self.maxExitPallets = 0                                       #Máximo de pallets de salida abiertos en todos los pasos
+    self.stepIndex = np.empty(capacity, dtype=np.int64)
+    self.data = np.empty((capacity, len(self.columns)), dtype=np.int64)
+    self.cachedDF = None
+
+  def record(self, remLayers:int, exitPallets:int, compPallets:int, layerTransfers:int, batchTransfers:int, palletChanges:int) -> None:
+    """Registra un paso de la simulación
+
+    Args:
+        remLayers (int): Capas restantes
+        exitPallets (int): Pallets de salida abiertos
+        compPallets (int): Pallets de salida completados
+        layerTransfers (int): Capas transferidas
+        batchTransfers (int): Movimientos del robot
+        palletChanges (int): Cambios de pallets de entrada
+    """
+    if exitPallets > self.maxExitPallets:
+      self.maxExitPallets = exitPallets
+    step = self.steps
+    self.steps += 1
+    if step % self.stride != 0:
+      return
+
+    if self.size == len(self.stepIndex):                          #Arrays llenos, se duplica la capacidad
+      self.stepIndex = np.resize(self.stepIndex, 2*self.size)
+      self.data = np.resize(self.data, (2*self.size, len(self.columns)))
+    self.stepIndex[self.size] = step
+    self.data[self.size] = (remLayers, exitPallets, compPallets, layerTransfers, batchTransfers, palletChanges)
+    self.size += 1
+    self.cachedDF = None
+
+  def toDataFrame(self) -> pd.DataFrame:
+    """Arma el DataFrame de registro con los pasos guardados
+
+    Returns:
+        pd.DataFrame: Registro indexado por paso. Columnas: RemLayers, ExitPallets, CompPallets, LayerTransfers, BatchTransfers, PalletChanges
+    """
+    if self.cachedDF is None:
+      self.cachedDF = pd.DataFrame(self.data[:self.size].copy(), columns=self.columns, index=self.stepIndex[:self.size].copy())
+    return self.cachedDF
+
+  def __len__(self) -> int:
+    return self.size
+
 class Simulation(DataAnalysis):
   """Clase hija de DataAnalysis. Utiliza las funciones de esta para generar 
   simulación de paletizado
@@ -450,7 +1353,9 @@ class Simulation(DataAnalysis):
   Args:
       DataAnalysis (class): Clase padre de funciones de estadísticas
   """
-  dayDataset = pd.DataFrame(columns=['Destino', 'SKU', 'Cantidad'])
+  _dayDataset = pd.DataFrame(columns=['Destino', 'SKU', 'Cantidad'])
+  orderBook: OrderBook
+  orderBook = None
   skuAllocation = pd.DataFrame(columns=['PalletsParciales'], index=['SKU'])
   dayDestinations = []
 
@@ -458,17 +1363,12 @@ class Simulation(DataAnalysis):
   entryPallets: List[PalletEntrada]
   entryPallets = []
 
-  #Lista de pallets de salida
-  exitPallets: List[PalletSalida]
-  exitPallets = []
+  #Registro de pallets de salida abiertos
+  exitRegistry: ExitPalletRegistry
 
   completedExitPallets: List[PalletSalida]
   completedExitPallets = []
 
-  #Lista de indices para eliminar pallets de salida luego de una iteración completa
-  deleteExitPallets: List[int]
-  deleteExitPallets = []
-  
   #Métricas de simulación
   remainingLayers = 0
   numExitPallets = 0
@@ -478,17 +1378,74 @@ class Simulation(DataAnalysis):
   totalPallets = 0
   totalLayers = 0
   palletChanges = 0
-  simRecordIndex = 0
-  simulationRecord = pd.DataFrame(columns=['RemLayers', 'ExitPallets', 'CompPallets', 'LayerTransfers', 'BatchTransfers', 'PalletChanges'])
-
-
-  def __init__(self, filePath: str) -> None:
+  loadedEntryPallets = 0
+  entryPalletPlan = None
+  recordStride = 1
+  rng: np.random.Generator
+  rng = None
+  entrySelector: EntryPalletSelector
+  entrySelector = None
+  simulationDay = None
+  trace: MovementTrace
+  trace = None
+  recorder: SimulationRecorder
+
+
+  def __init__(self, filePath: str=None, recordStride:int=1, useCache:bool=True, cacheDir:str=None, trace:MovementTrace=None) -> None:
     """Inicialización de clase Simulation con su respectiva clase padre
 
     Args:
-        filePath (str): Ruta al archivo .csv con datos
+        filePath (str, optional): Ruta al archivo .csv con datos. Si es None se inicia con un dataset vacío. Defaults to None.
+        recordStride (int, optional): Se registra un paso de simulación cada recordStride pasos. Defaults to 1.
+        useCache (bool, optional): Usar caché binario del dataset limpio. Defaults to True.
+        cacheDir (str, optional): Carpeta del caché. Defaults to None (defaultCacheDir()).
+        trace (MovementTrace, optional): Traza donde se agregan los movimientos y los eventos de pallets (aperturas, retiros y cambios) de todos los días simulados. Defaults to None.
+    """
+    super().__init__(filePath, useCache=useCache, cacheDir=cacheDir)
+    self.recordStride = recordStride
+    self.trace = trace
+    self.dayMetrics = pd.DataFrame()                                #Métricas por día del modo incremental
+    self.resetSimulation()                                          #Variables de simulación propias de la instancia
+
+  @property
+  def exitPallets(self) -> List[PalletSalida]:
+    """Pallets de salida abiertos en orden de creación
+
+    Returns:
+        List[PalletSalida]: Lista de pallets abiertos
+    """
+    return list(self.exitRegistry)
+
+  @exitPallets.setter
+  def exitPallets(self, pallets:List[PalletSalida]) -> None:
+    self.exitRegistry = ExitPalletRegistry()
+    for pallet in pallets:
+      self.exitRegistry.add(pallet)
+
+  @property
+  def simulationRecord(self) -> pd.DataFrame:
+    """Registro de la simulación como DataFrame. Se arma a partir del SimulationRecorder al consultarlo
+
+    Returns:
+        pd.DataFrame: Columnas: RemLayers, ExitPallets, CompPallets, LayerTransfers, BatchTransfers, PalletChanges
+    """
+    return self.recorder.toDataFrame()
+
+  @property
+  def dayDataset(self) -> pd.DataFrame:
+    """Dataset del día. Una vez que la simulación descuenta capas se materializa a partir del libro de pedidos
+
+    Returns:
+        pd.DataFrame: Dataset del día. Columnas: Destino, SKU, Cantidad
     """
-    super().__init__(filePath)
+    if self.orderBook is not None and self.orderBook.modified:
+      return self.orderBook.toDataFrame()
+    return self._dayDataset
+
+  @dayDataset.setter
+  def dayDataset(self, df:pd.DataFrame) -> None:
+    self._dayDataset = df
+    self.orderBook = OrderBook(df)                                #Libro de pedidos usado por la simulación
     
   def getSimulationDataset(self, skus:int) -> pd.DataFrame:
     """Genera dataset filtrado por Top N SKUs cada día
@@ -511,11 +1468,20 @@ class Simulation(DataAnalysis):
     Returns:
         pd.DataFrame: Dataset para ese único día. Columnas: Destino, SKU, Cantidad
     """
-    self.dayDataset = self.filterByDate(date=dia, df=workingDF)
-    newVals = (self.dayDataset['Cantidad']/traysPerLayer).apply(math.trunc)   #Conversión de bandejas a capas completas
-    auxDF = self.dayDataset.copy()
+    dayDF = self.filterByDate(date=dia, df=workingDF)
+    newVals = (dayDF['Cantidad']/traysPerLayer).apply(math.trunc)   #Conversión de bandejas a capas completas
+    auxDF = dayDF.copy()
     auxDF[auxDF.columns[2]] = newVals
-    self.dayDataset = auxDF
+    self.setDayDataset(auxDF)
+    self.simulationDay = pd.Timestamp(dia)                          #Etiqueta del día para la instrumentación
+
+  def setDayDataset(self, dayDataset:pd.DataFrame) -> None:
+    """Asigna un dataset del día ya convertido a capas. Permite repetir la simulación de un día sin volver a filtrar
+
+    Args:
+        dayDataset (pd.DataFrame): Dataset del día. Columnas: Destino, SKU, Cantidad (capas)
+    """
+    self.dayDataset = dayDataset
     self.dayDestinations = pd.unique(self.dayDataset['Destino']).tolist()    #Lista de destinos 
   
   def __getSkuAllocation(self) -> pd.DataFrame:
@@ -527,135 +1493,126 @@ class Simulation(DataAnalysis):
     Returns:
         pd.DataFrame: DataFrame. Columnas: SKU (index), PalletsParciales
     """
-    outputDF = pd.DataFrame(columns=['SKU', 'PalletsParciales', 'Asignados'])   #Estructura de DataFrame de retorno
+    outputDF = pd.DataFrame(columns=['SKU', 'PalletsParciales'])   #Estructura de DataFrame de retorno
     df = self.dayDataset.drop(labels=['Destino'], axis=1)               #Elimina columna de Destino
     df2 = df.groupby(by=['SKU'], as_index=False).sum()                  #Agrupa por SKU y suma cantidades
     df2 = df2.sort_values(by=['Cantidad'], ascending=False)             #Reordenado por Cantidad descendiente
 
     outputDF['SKU'] = df2['SKU']                                        #Asigna columna SKU y de pallets
     outputDF['PalletsParciales'] = (df2['Cantidad']/layersPerPallet).apply(math.ceil)
-    outputDF['Asignados'] = False                                       #Columna para indicar si este SKU ya no se debe utilizar
     outputDF = outputDF.set_index(['SKU'])                              #SKU como índice
 
     self.skuAllocation = outputDF
 
-  def __transferLayer(self, originPalletIndex:int, destinationPalletIndex:int) -> None:
-    """Transfiere capa entre pallets. Decrementa cuenta de capas para el SKU al destino correspondiente
+  def getSkuAllocation(self) -> pd.DataFrame:
+    """Calcula la asignación de SKUs del dataset del día actual para reutilizarla en varias simulaciones del mismo día
 
-    Args:
-        originPalletIndex (int): Indice en lista de clase de pallet de suministro al que se le retira la capa
-        destinationPalletIndex (int): Indice en lista de clase de pallet de pedido al que se le coloca la capa
-        dayDF (pd.DataFrame): DataFrame de pedidos del día. Columnas: Destino, SKU, Cantidad
+    Returns:
+        pd.DataFrame: DataFrame. Columnas: SKU (index), PalletsParciales
+    """
+    self.__getSkuAllocation()
+    return self.skuAllocation.copy()
 
+  @timer
+  def __transferLayers(self, entryPallet:PalletEntrada, exitPallet:PalletSalida, layers:int) -> None:
+    """Transfiere un lote de capas entre pallets en una sola operación. Decrementa una vez la demanda del SKU
+    para el destino correspondiente
+
+    Args:
+        entryPallet (PalletEntrada): Pallet de suministro al que se le retiran las capas
+        exitPallet (PalletSalida): Pallet de pedido al que se le colocan las capas
+        layers (int): Cantidad de capas a transferir
     """
-    layer = self.entryPallets[originPalletIndex].subtractLayer()                #Saca capa de pallet de entrada
-    self.exitPallets[destinationPalletIndex].addLayer(layer)                   #Coloca en pallet de salida
+    entryPallet.subtractLayers(layers)                            #Saca capas de pallet de entrada
+    exitPallet.addLayers(entryPallet.product, layers)             #Coloca en pallet de salida
 
-    outputDF = self.dayDataset.copy()                             #Copia DF de pedidos
-    outputDF = outputDF.reset_index()                             #Resetea index
-    x = outputDF[(outputDF['SKU'] == self.entryPallets[originPalletIndex].product) & (outputDF['Destino'] == self.exitPallets[destinationPalletIndex].destination)]
-    valueIndex = x.index[0]                                       #Obtiene indice de este valor en filas de DF
-    newValue = x['Cantidad'].values[0] - 1                        #Resta 1 al valor de Cantidad
-    if newValue > 0:
-      outputDF.at[valueIndex, 'Cantidad'] = newValue              #Resta 1 al valor de Cantidad
-    else:
-      outputDF = outputDF.drop(labels=[valueIndex], axis=0)
-    outputDF = outputDF.set_index(['index'])                      #Recupera el índice original
-    self.dayDataset = outputDF                                    #Copia DF modificado a variable de clase
-    self.transferedLayers += 1                                    #Incrementa cuenta de capas transferidas para registro
+    self.orderBook.subtract(exitPallet.destination, entryPallet.product, layers)   #Resta las capas a la demanda del par
+    self.exitRegistry.palletUpdated(exitPallet, self.orderBook.destinationLayers(exitPallet.destination))
+    self.transferedLayers += layers                               #Incrementa cuenta de capas transferidas para registro
+    instrumentation.count('capasTransferidas', layers)
+    if self.trace is not None:                                    #Traza de movimientos (paso actual del registro)
+      self.trace.append(self.simulationDay, self.recorder.steps - 1, entryPallet.id, entryPallet.product, exitPallet.id,
+                        exitPallet.destination, layers)
 
-  def __changeEntryPallets(self) -> None:
-    """Intercambio de pallet de entrada cuando se terminan las capas o no se puede usar más.
-    La función se debe ejecutar una vez que se realizó toda una iteración por los pallets de entrada y se asignaron todas
-    las capas posibles
+  def __traceEvent(self, kind:int, entryPallet:PalletEntrada=None, exitPallet:PalletSalida=None) -> None:
+    """Agrega a la traza un evento sin capas en el paso actual del registro
 
     Args:
-        entryPallets (List[PalletEntrada]): Lista con objetos de tipo PalletEntrada
-        skuAllocation (pd.DataFrame): DataFrame de asignación de SKUs a pallets. Columnas: SKU (index), PalletsParciales, Asignados
-
-    Returns:
-        Tuple[List[PalletEntrada], pd.DataFrame]: Lista actualizada con pallets intercambiados, DataFrame actualizado de asignación
+        kind (int): traceOpen, traceRetire o traceChange
+        entryPallet (PalletEntrada, optional): Pallet de entrada cargado. Defaults to None.
+        exitPallet (PalletSalida, optional): Pallet de salida abierto o retirado. Defaults to None.
     """
-    nonConsecutivePallets = True
-    deleteEntryPallets = []
-    activeSKU = []
-    assignedSKU = []
+    if self.trace is None:
+      return
+    self.trace.append(self.simulationDay, self.recorder.steps - 1,
+                      entryPallet.id if entryPallet is not None else -1, entryPallet.product if entryPallet is not None else -1,
+                      exitPallet.id if exitPallet is not None else -1, exitPallet.destination if exitPallet is not None else None, 0, kind)
 
-    for o in range(len(self.entryPallets)):
-      pallet = self.entryPallets[o]
-      activeSKU += [pallet.product]               #Obtiene primero lista de productos activos
-      self.skuAllocation.at[pallet.product, 'PalletsParciales'] = self.skuAllocation.at[pallet.product, 'PalletsParciales'] - 1    #Resta uno de los pallets asignados a ese SKU
+  def __openExitPallet(self, destination:str) -> PalletSalida:
+    """Abre un pallet de salida en el registro
 
-    #Ahora tiene la lista de asignación actualizada con los pallets ya usados la iteración pasada restados
+    Args:
+        destination (str): Destino del pallet
 
-    auxDF = self.skuAllocation.loc[(self.skuAllocation['PalletsParciales'] > 0)]    #DataFrame solo con los que se pueden usar
-    
-    for i in range(len(self.entryPallets)):                     #Itera para cada pallet en la lista de entrada
-      pallet = self.entryPallets[i]
+    Returns:
+        PalletSalida: Pallet abierto
+    """
+    pallet = self.exitRegistry.add(PalletSalida(destination))
+    self.__traceEvent(traceOpen, exitPallet=pallet)
+    return pallet
 
-      remainingPallets = self.skuAllocation.loc[pallet.product]['PalletsParciales']
+  def __retireExitPallets(self, pallets:List[PalletSalida]) -> None:
+    """Guarda pallets de salida cerrados en la lista de completados
 
-      #Nuevo algoritmo de cambio de pallets
-      if nonConsecutivePallets:                                       
-        
-        #Filtrado por los SKU que se usaron la iteración pasada y los que se asignen esta
-        deleteSkuList = activeSKU + assignedSKU
-        deleteSkuList = list(set(deleteSkuList) & set(auxDF.index.to_list()))                        
-        usablePalletsDF = auxDF.drop(index=deleteSkuList, axis=0)       #Elimina de la lista los que se están usando ahora y los que se asignaron en esta pasada
-        
-        #No hay resultados con este filtro. Se hace uno menos estricto
-        if usablePalletsDF.empty:                                       #Puede que no haya otros pallets para usar y la vista filtrada da vacío
-          lastUsablePalletsDF = auxDF.drop(index=assignedSKU, axis=0)   #Filtra el DF anterior pero dejando los que se usaron hasta ahora
-          
-          #Tampoco hay resultados con este. Se elimina el pallet
-          if lastUsablePalletsDF.empty:                                 #Si en este caso tampoco hay pallets se elimina el pallet de entrada
-            deleteEntryPallets += [i]
-            continue
-          
-          #Hay resultados, se asigna el pallet
-          else:
-            randomProduct = lastUsablePalletsDF.sample(n=1).index.values[0]   #Selecciona produco al azar
-            pallet = PalletEntrada(randomProduct)                             #Genera pallet de entrada
-            assignedSKU += [randomProduct]                                    #Agrega SKU asignado a la lista para filtrar los demás
-        
-        #Luego de filtrar hay productos disponibles para elegir
-        else:
-          randomProduct = usablePalletsDF.sample(n=1).index.values[0]   #Selecciona produco al azar
-          pallet = PalletEntrada(randomProduct)                         #Genera pallet de entrada
-          assignedSKU += [randomProduct]                                #Agrega SKU asignado a la lista para filtrar los demás
+    Args:
+        pallets (List[PalletSalida]): Pallets ya quitados del registro
+    """
+    self.completedExitPallets += pallets
+    for pallet in pallets:
+      self.__traceEvent(traceRetire, exitPallet=pallet)
 
-      #Viejo algoritmo de cambio de pallets  
+  @timer
+  def __changeEntryPallets(self) -> None:
+    """Intercambio de pallet de entrada cuando se terminan las capas o no se puede usar más.
+    La función se debe ejecutar una vez que se realizó toda una iteración por los pallets de entrada y se asignaron todas
+    las capas posibles. Los pallets con capas cuyo SKU todavía tiene destinos abiertos se mantienen en su posición.
+    Con las políticas por prioridad, una posición cuyo pallet se vació recibe otro pallet del mismo SKU mientras tenga
+    demanda y pallets restantes, sin contarlo como cambio. El resto de las posiciones recibe el SKU que elige el
+    EntryPalletSelector según la política de la corrida ('random' evita además los SKUs de la iteración anterior).
+    Si no quedan SKUs la posición se elimina
+    """
+    selector = self.entrySelector
+    newPallets = []
+    freed = []                                                  #Posición en la asignación del SKU de cada posición liberada
+    for pallet in self.entryPallets:
+      if not pallet.empty and self.orderBook.skuDestinationCount(pallet.product) > 0:
+        newPallets += [pallet]                                  #Pallet todavía útil, se mantiene
       else:
-        if pallet.empty:                                          #Si un pallet está vacío
+        freed += [selector.release(pallet.product)]             #Resta uno de los pallets asignados al SKU
+    assignedSKU = {selector.position[pallet.product] for pallet in newPallets}
 
-          if remainingPallets > 1:                               #Se evalúa si todavía faltan usar pallets
-            #Acá se cambia de lógica, en lugar se seguir ingresando pallets del mismo producto, se pasa a otro que no esté en uso
-            self.skuAllocation.at[pallet.product, 'PalletsParciales'] = self.skuAllocation.at[pallet.product, 'PalletsParciales'] - 1    #Resta uno de los pallets asignados a ese SKU
-            pallet = PalletEntrada(pallet.product)                #Crea nuevo pallet del mismo producto en esa posición
-          
-          else:                                                   #Ya se usaron todos los pallets de ese producto
-            if len(self.skuAllocation[self.skuAllocation['Asignados']==False].index) == 0:
-              break
-            auxProd = self.skuAllocation[self.skuAllocation['Asignados']==False].index.values[0] #Se seleccionan todos los SKUs no asignados y se elige el primero
-            pallet = PalletEntrada(auxProd)                   #Se crea nuevo pallet con el primer SKU no asignado
-            self.skuAllocation.at[auxProd, 'Asignados'] = True    #El nuevo producto queda como asignado
-        
-        else:                                                     #El pallet no está vacío
-          if remainingPallets == 1:                               #Si es el último de la asignación y le quedan capas se cambia
-            if len(self.skuAllocation[self.skuAllocation['Asignados']==False].index) == 0:
-              deleteEntryPallets += [i]
-              break
-            auxProd = self.skuAllocation[self.skuAllocation['Asignados']==False].index.values[0] #Se seleccionan todos los SKUs no asignados y se elige el primero
-            pallet = PalletEntrada(auxProd)                   #Se crea nuevo pallet con el primer SKU no asignado
-            self.skuAllocation.at[auxProd, 'Asignados'] = True    #El nuevo producto queda como asignado
-
-      self.entryPallets[i] = pallet                             #Modifica valor de variable de clase
+    if selector.policy == 'random':
+      activeSKU = set(freed) | assignedSKU                      #SKUs de la iteración anterior
+    else:
+      activeSKU = set()
+      for i in freed:
+        if i not in assignedSKU and selector.useful(i):         #Mismo SKU en la misma posición, no es un cambio
+          assignedSKU.add(i)
+          newPallets += [PalletEntrada(selector.skus[i])]
+      freed = [i for i in freed if i not in assignedSKU]
+
+    for _ in freed:                                             #Itera para cada posición liberada
+      chosen = selector.choose(activeSKU, assignedSKU)
+      if chosen is None:                                        #No hay pallets para usar, se elimina la posición
+        continue
+      assignedSKU.add(chosen)                                   #Agrega SKU asignado para filtrar los demás
+      newPallets += [PalletEntrada(selector.skus[chosen])]      #Genera pallet de entrada
       self.palletChanges += 1                                   #Registro para métrica de simulación
-      #print(self.palletChanges)
-    
-    for m in sorted(deleteEntryPallets, reverse=True):  #Reordena lista para borrar comenzando por los indices altos
-      del self.entryPallets[m]
+      self.__traceEvent(traceChange, entryPallet=newPallets[-1])
 
+    self.entryPallets = newPallets
+
+  @timer
   def __getDestinationsForSku(self, SKU:int) -> List[str]:
     """Encuentra destinos que requieren capas del SKU dado
 
@@ -665,42 +1622,27 @@ class Simulation(DataAnalysis):
     Returns:
         List[str]: Lista de destinos para ese SKU
     """
-    df = self.dayDataset
-    query_str = f"SKU=={SKU} & Cantidad>=1"
-    auxDF = df.query(query_str)
-    #destinos_series = df[(df['SKU']==SKU) & (df['Cantidad'] >= 1)]['Destino'].drop_duplicates().dropna()  #Filtrado por filas con el SKU seleccionado sin duplicados ni NA
-    destinos_series = auxDF['Destino'].drop_duplicates().dropna()  #Filtrado por filas con el SKU seleccionado sin duplicados ni NA
-    return destinos_series.to_list()                                            #Convertido a lista para retornar
-
-  def __layerTransferProcess(self, entryPalletIndex:int, exitPalletIndex:int) -> None:
-    """Transferencia de múltiples capas calculando cuantas puede recibir el pallet y utilizando listas de pallets
-
-    Args:
-        entryPalletIndex (int): Indice de pallet de entrada a utilizar de la lista
-        exitPalletIndex (int): Indice de pallet de salida a utilizar de la lista (ya existente)
-    """
-    currentDestination = self.exitPallets[exitPalletIndex].destination    #Define el destino del pallet de salida actual
-    destinationDF = self.dayDataset.set_index(['Destino'])
-    destinationDF = destinationDF.loc[currentDestination]               #Filtra dataset del día por destino actual
-    currentSKU = self.entryPallets[entryPalletIndex].product              #Define producto del pallet actual
-    if isinstance(destinationDF, pd.Series):
-      destinationDF = destinationDF.to_frame().T
-    currentLayers = destinationDF[destinationDF['SKU'] == currentSKU].iloc[0]['Cantidad']  #Cuantas capas precisa el destino actual
-    availableLayers = len(self.entryPallets[entryPalletIndex].layers)           #Cuantas capas tiene el pallet de entrada para dar
-    palletSpace = layersPerPallet-len(self.exitPallets[exitPalletIndex].layers) #Cuantas capas puede aceptar el pallet
+    return self.orderBook.destinationsForSku(SKU)
+
+  @timer
+  def __layerTransferProcess(self, entryPallet:PalletEntrada, exitPallet:PalletSalida) -> None:
+    """Transferencia de múltiples capas calculando cuantas puede recibir el pallet
+
+    Args:
+        entryPallet (PalletEntrada): Pallet de entrada a utilizar
+        exitPallet (PalletSalida): Pallet de salida a utilizar (ya existente)
+    """
+    currentDestination = exitPallet.destination                           #Define el destino del pallet de salida actual
+    currentSKU = entryPallet.product                                      #Define producto del pallet actual
+    currentLayers = self.orderBook.layers(currentDestination, currentSKU) #Cuantas capas precisa el destino actual
+    availableLayers = entryPallet.currentLayers                           #Cuantas capas tiene el pallet de entrada para dar
+    palletSpace = layersPerPallet-exitPallet.currentLayers                #Cuantas capas puede aceptar el pallet
     
     layersQty = min([currentLayers, availableLayers, palletSpace])
 
     if layersQty > 0:                                           #Verificar que no se intenten transferir capas nulas
-
-      self.batchTransfers += 1                                #Registro para estadísticas de simulación
-
-      for k in range(layersQty):
-        self.__transferLayer(entryPalletIndex, exitPalletIndex) #Transfiere las capas
-
-    else:
-      pass
-      #print("Que pija")
+      self.batchTransfers += 1                                  #Registro para estadísticas de simulación
+      self.__transferLayers(entryPallet, exitPallet, layersQty)   #Transfiere las capas en un solo movimiento
   
   def __checkRemainingLayers(self) -> int:
     """Verifica si todavía quedan capas para paletizar
@@ -708,97 +1650,32 @@ class Simulation(DataAnalysis):
     Returns:
         int: Cantidad de capas que faltan paletizar
     """
-    self.remainingLayers = self.dayDataset['Cantidad'].sum()
+    self.remainingLayers = self.orderBook.total
     return self.remainingLayers
   
-  def exitPalletDefinition(self) -> pd.DataFrame:
-    """Define armado de pallets de salida que usen hasta cierta cantidad de productos cada uno.
-    Para cada destino define como serán los pallets de salida.
+  @timer
+  def exitPalletDefinition(self, splitSkus:bool=False) -> pd.DataFrame:
+    """Define armado de pallets de salida para cada destino. Primero arma pallets exactos de 15 capas
+    (subset-sum) y luego ubica el resto con first-fit-decreasing
+
+    Args:
+        splitSkus (bool, optional): Permite repartir un SKU entre varios pallets para llegar a la cota ceil(total/15). Defaults to False.
 
     Returns:
         pd.DataFrame: DataFrame con pallets definidos. Columnas: Destino, Pallet, SKU, Cantidad
     """
-    palletAssignmentDF = pd.DataFrame(columns=['Destino', 'Pallet', 'SKU', 'Cantidad'])
-
-    for destination in self.dayDestinations:                                      #Comienza iterando para cada destino
-      destinationDF: pd.DataFrame
-      destinationDF = self.dayDataset[self.dayDataset['Destino']==destination]    #Obtiene capas de cada SKU necesarias
-      new_index = list(range(len(destinationDF['Cantidad'])))
-      destinationDF.loc[:,'Ind'] = new_index
-      destinationDF = destinationDF.set_index(['Ind'])
-      destinationDF = destinationDF.sort_values(by=['Cantidad'], ascending=False) #Ordenado por cantidad de capas en forma descendente
-      remainingSkus = destinationDF['SKU'].count()                                 #Cantidad de SKUs por destino
-            
-      currentPallet = 1
-      currentLayer = 0
-
-      while remainingSkus > 0:                                          #Loop secundario por destino hasta asignar todos los SKU a un pallet
-        
-        startNewPallet = False
-        #Comienza por el primero de la lista
-        currentSKU = destinationDF.iloc[0]['SKU']                                 #SKU actual
-
-        #Asigna las capas de este primer destino
-        layersAvailable = destinationDF.iloc[0]['Cantidad']                       #Cantidad de capas que se precisan de ese SKU
-        rowData = {'Destino':[destination], 'Pallet':[currentPallet], 'SKU':[currentSKU], 'Cantidad':[layersAvailable]}   #Fila para agregar al DF de asignación
-        palletAssignmentDF = pd.concat([palletAssignmentDF, pd.DataFrame(rowData)])   #Agrega fila a DF de asignación
-        currentLayer += layersAvailable                                           #Incrementa cantidad de capas en el pallet actual
-        layersMissing = layersPerPallet - currentLayer                            #Cantidad de capas que faltan para completar pallet
-
-        #Elimina el SKU del destinationDF
-        destinationDF = destinationDF.drop(index=destinationDF.index.values[0])   #Elimina primer elemento de la lista
-        
-        #Recorre la lista buscando segundo SKU que complemente
-        for i in range(len(destinationDF['Cantidad'])):                           
-          if (destinationDF.loc[destinationDF.index.values[i], 'Cantidad'] == layersMissing):           #El SKU actual tiene las capas que se precisan?
-            currentSKU = destinationDF.iloc[i]['SKU']                                 #SKU actual
-            rowData = {'Destino':[destination], 'Pallet':[currentPallet], 'SKU':[currentSKU], 'Cantidad':[layersMissing]}   #Fila para agregar al DF de asignación
-            palletAssignmentDF = pd.concat([palletAssignmentDF, pd.DataFrame(rowData)])                               #Agrega fila a DF de asignación
-            destinationDF = destinationDF.drop(index=destinationDF.index.values[i])                                   #Elimina actual elemento de la lista
-            currentPallet += 1                                                                                        #Incrementa cantidad de capas en el pallet actual
-            currentLayer = 0                                                                                          #Resetea valor de capa actual
-            startNewPallet = True
-            break                                                                                     #Debe comenzar con un nuevo pallet
-
-        if startNewPallet:                                                        #Se completó pallet en la iteración anterior, debe comenzarse con otra
-          continue
-        
-        #No se pudo armar pallet con solo 2 SKUs
-        else:                                                                     #No se completó pallet, se debe recorrer la lista para completar con más de 1 SKU         
-          rowDropList = []
-          for j in range(len(destinationDF['Cantidad'])):
-            currentSKU = destinationDF.loc[destinationDF.index.values[i], 'SKU']  #SKU actual
-            layersMissing = layersPerPallet - currentLayer                        #Cantidad de capas que faltan para completar pallet            
-            layersAvailable = destinationDF.iloc[j]['Cantidad']                   #Cantidad de capas que se precisan de ese SKU
-            if (layersPerPallet >= currentLayer + layersAvailable):               #Verifica si esas capas entran en el pallet actual
-                                                                    
-              currentSKU = destinationDF.iloc[j]['SKU']                                 #SKU actual
-              rowData = {'Destino':[destination], 'Pallet':[currentPallet], 'SKU':[currentSKU], 'Cantidad':[layersAvailable]}   #Fila para agregar al DF de asignación
-              palletAssignmentDF = pd.concat([palletAssignmentDF, pd.DataFrame(rowData)])                               #Agrega fila a DF de asignación
-              rowDropList += [j]
-              
-              currentLayer += layersAvailable                                                                           #Incrementa cantidad de capas en el pallet actual
-
-              if currentLayer == layersPerPallet:   #Si se completó el pallet
-                currentPallet += 1
-                currentLayer = 0
-                startNewPallet = True
-                break
-          
-          #Elimina elementos usados al final de la iteración
-          if len(rowDropList) > 0:
-            orderedDroplist = sorted(rowDropList, reverse=True)
-            for k in (orderedDroplist):
-              destinationDF = destinationDF.drop(index=destinationDF.index.values[k])      #Elimina actual elemento de la lista
-            rowDropList = []
+    return packing.packDay(self.dayDataset, layersPerPallet, splitSkus=splitSkus, destinations=self.dayDestinations)
 
-        if not startNewPallet:            #Llega el final de la segunda vuelta y si no terminó el pallet igual resetea para armar otro
-          currentPallet += 1
-          currentLayer = 0 
+  def exitPalletSummary(self, palletAssignmentDF:pd.DataFrame) -> pd.DataFrame:
+    """Compara pallets armados por destino contra la cota inferior ceil(total/15)
 
-        remainingSkus = destinationDF['SKU'].count()      #Actualiza valor de SKUs sin asignar
+    Args:
+        palletAssignmentDF (pd.DataFrame): Salida de exitPalletDefinition
 
-    return palletAssignmentDF
+    Returns:
+        pd.DataFrame: Columnas: Destino (index), Capas, Pallets, CotaInferior, Exceso
+    """
+    return packing.packingSummary(palletAssignmentDF, layersPerPallet)
 
   def getPartialDF(self, inputDF) -> pd.DataFrame:
     """Convierte a DataFrame si la entrada es una Series luego de filtrar un DF y se retorna solo una fila como Series
@@ -820,8 +1697,10 @@ class Simulation(DataAnalysis):
       raise TypeError("No es ni un pd.Series ni pd.DataFrame")
     return outputDF
 
+  @timer
   def entryPalletSelection(self, exitPalletsDF:pd.DataFrame, numPalletsEntry:int) -> List[pd.DataFrame]:
-    """Selección de pallets de entrada a partir de pallets de salida esperados
+    """Selección de pallets de entrada a partir de pallets de salida esperados. Agrupa pallets de salida cuyos SKUs
+    entran en numPalletsEntry posiciones de entrada usando la matriz de incidencia pallets × SKUs
 
     Args:
         exitPalletsDF (pd.DataFrame): DataFrame con asignación de capas y SKUs a pallets de salida por destino. Columnas: Destino, Pallet, SKU, Cantidad
@@ -830,108 +1709,22 @@ class Simulation(DataAnalysis):
     Returns:
         List[pd.DataFrame]: DataFrames con los pallets de entrada y de salida vinculados por variable de Grupo
     """
-
-    palletsEntrada = pd.DataFrame(columns=['Grupo', 'SKU', 'CantidadPallets'])                  #DF con pallets de entrada
-    palletsSalida = pd.DataFrame(columns=['Grupo', 'Destino', 'Pallet', 'SKU', 'Cantidad'])     #DF con pallets de salida referenciados a los de entrada por grupo
-    exitPalletAssignmentDF = exitPalletsDF.copy()
-    newInd = list(range(exitPalletAssignmentDF.shape[0]))
-    exitPalletAssignmentDF = exitPalletAssignmentDF.assign(Ind = newInd)
-    exitPalletAssignmentDF = exitPalletAssignmentDF.set_index(['Ind'])
-
-
-    remainingPallets = exitPalletAssignmentDF.shape[0]
-    group = 1
-
-    while remainingPallets > 0:
-
-      #Aca crear while para todos los pallets
-      currentDestination = exitPalletAssignmentDF.iloc[0]['Destino']                  #Nombre del primer destino de la lista
-      currentPalletNumber  = exitPalletAssignmentDF[exitPalletAssignmentDF['Destino']==currentDestination].iloc[0]['Pallet']      #Número de pallet del 1ro en la lista
-      #Lista de SKUs del primer pallet en la lista
-
-      auxDF = exitPalletAssignmentDF[exitPalletAssignmentDF['Destino']==currentDestination]
-      currentPalletSkus = auxDF[auxDF['Pallet']==currentPalletNumber]['SKU']
-
-      exitDestinations = exitPalletAssignmentDF['Destino'].unique().tolist()      #Listado de destinos distintos para el día
-      otherDestinations = exitDestinations.copy()
-      otherDestinations.remove(currentDestination)             #Listado de destintos sin el actual
-      
-      skusComplete = False
-
-      if len(currentPalletSkus) < numPalletsEntry:  #Comienza por verificar si con los SKUs que se precisan para el pallet seleccionado se cubren todos los de entrada necesarios
-        for dest in otherDestinations:              #No hay suficientes SKU entonces busca otro pallet de otro destino
-          destPallets = exitPalletAssignmentDF[exitPalletAssignmentDF['Destino']==dest]['Pallet']   #Lista de pallets en destino
-          
-          for palNum in destPallets:            #Busca en todos los pallets del destino si alguno comparte SKUs con el ya elegido antes
-            auxDF = exitPalletAssignmentDF[exitPalletAssignmentDF['Destino']==dest]
-            destSkuList = auxDF[auxDF['Pallet']==palNum]['SKU']                        #Lista de SKUs de cada pallet
-            intersection = len(set(destSkuList) & set(currentPalletSkus))              #Cantidad de elementos iguales entre ambas listas
-            
-            if (intersection > 0):                                                                  #Tienen al menos uno en común
-              currentPalletSkus = list(set(destSkuList) | set(currentPalletSkus))                   #Añade nuevos SKU a la lista
-
-              if ((len(currentPalletSkus) + len(destSkuList) - intersection) == numPalletsEntry):   #Verifica si ya se completaron los SKUs requeridos
-                skusComplete = True
-
-            if skusComplete:        #Condición para cortar loop de pallets dentro de destino
-              break
-          
-          if skusComplete:          #Condición para cortar loop de destinos
-            break
-      
-      else:                         #Si los SKUs del pallet elegido son más de los deseados igual se mantiene esa cantidad
-        numPalletsEntry = len(currentPalletSkus)  #Se modifica para este pallet
-
-      dfPalletDropList = []
-
-      #Ya se cuenta con una lista de SKUs para entrada. Se deben definir los pallets de salida que se pueden armar con ellos.
-      for dest in exitDestinations:
-        destPallets = exitPalletAssignmentDF[exitPalletAssignmentDF['Destino']==dest]['Pallet'].unique()   #Lista de pallets en destino
-        
-        for pal in destPallets:
-          auxDF = exitPalletAssignmentDF[exitPalletAssignmentDF['Destino']==dest]
-          destSkuList = auxDF[auxDF['Pallet']==pal]['SKU']                                        #SKUs para este pallet y destino
-          
-          if set(destSkuList).issubset(set(currentPalletSkus)):                                   #Si el pallet puede ser armado por los SKU elegidos
-            partialDF = auxDF[auxDF['Pallet']==pal].copy()                                        #Copia porción de DF que importa
-            drop_indexes = auxDF[auxDF['Pallet']==pal].index.values.tolist()                      #Obtiene indices para poder eliminarlos de DF original
-            partialDF = partialDF.assign(Grupo=group)                                       #Agrega columna de grupo a copia de DF
-            partialDF['Cantidad'] = partialDF['Cantidad'].astype('int64')
-            palletsSalida = pd.concat([palletsSalida, partialDF])                                 #Concatena para armar DF de salida
-            palletsSalida = palletsSalida.convert_dtypes(convert_integer=True)
-            dfPalletDropList += drop_indexes                                                    #Agrega índices a lista para eliminarlos
-
-      #Se definen a partir de los SKU los pallets de entrada
-      for sku in currentPalletSkus:
-        auxDF2 = palletsSalida[palletsSalida['Grupo']==group]
-        qty = auxDF2.groupby(by=['SKU'], as_index=False).sum(numeric_only=True)
-        palQty = (qty['Cantidad']/layersPerPallet).apply(math.ceil)
-        data = {'Grupo':[group], 'SKU':[sku], 'CantidadPallets':[palQty]}
-        auxDF = pd.DataFrame(data)
-        palletsEntrada = pd.concat([palletsEntrada, auxDF])
-
-      if len(dfPalletDropList) > 0:                   #Verifica si debe eliminar pallets de salida
-        for m in sorted(dfPalletDropList, reverse=True):    #Reordena lista para borrar comenzando por los indices altos
-          exitPalletAssignmentDF.drop(index=m, axis=0)      #Lo elimina del DF en uso                        
-        dfPalletDropList = []                         #Una vez eliminados se vacía la lista
-
-      group += 1                                              #Pasa al siguiente grupo
-      remainingPallets = exitPalletAssignmentDF.shape[0]      #Actualiza cantidad de pallets restantes
-
-    return palletsEntrada, palletsSalida
+    return packing.groupExitPallets(exitPalletsDF, numPalletsEntry, layersPerPallet)
   
-  def unlimitedExitSimulation(self, startingPallets:int) -> None:
+  @timer
+  def unlimitedExitSimulation(self, startingPallets:int, entryPolicy:str='random') -> None:
     """Simulación de paletizado simple. Se limitan pallets de entrada y se asignan las capas de cada uno hasta completarlo
     y abriendo los pallets de salida necesarios para eso
 
     Args:
         startingPallets (int): Cantidad de pallets de entrada (SKU distintos)
+        entryPolicy (str, optional): Política de reemplazo de pallets de entrada, una de entryPolicies. Defaults to 'random'.
     """
+    self.entrySelector = EntryPalletSelector(self.skuAllocation, self.orderBook, entryPolicy, self.rng)
     #Lista de pallets de entrada
     startPallets = startingPallets if len(self.skuAllocation.index.values) >= startingPallets else len(self.skuAllocation.index.values)
     for i in range(startPallets):
       self.entryPallets += [PalletEntrada(self.skuAllocation.index[i])]
-      self.skuAllocation.at[self.skuAllocation.index[i], 'Asignados'] = True
 
     self.remainingLayers = self.__checkRemainingLayers()
     self.totalPallets = self.skuAllocation['PalletsParciales'].sum()
@@ -939,12 +1732,10 @@ class Simulation(DataAnalysis):
     #-----------------~~~~~~~~~~~~~~~~~~~~-----------------
     #Loop principal. Idealmente el umbral tiene que ser 0.
     #-----------------~~~~~~~~~~~~~~~~~~~~-----------------
-    while (self.remainingLayers > 0) and (self.skuAllocation['PalletsParciales'].sum() > 0):
-      self.dayDataset = self.dayDataset[self.dayDataset['Cantidad']>0]
+    while (self.remainingLayers > 0) and (self.entrySelector.remaining > 0):
       #----Algoritmo principal----
       if len(self.entryPallets) == 0:
-        print("SHIT")
-        print(f"Capas {self.remainingLayers}/{self.totalLayers}")
+        logging.warning(f"Sin pallets de entrada con capas pendientes. Capas {self.remainingLayers}/{self.totalLayers}")
         break
       for i in range(len(self.entryPallets)):                          #Comienza iterando por cada pallet de entrada
         if self.entryPallets[i].empty:                          #Si el pallet está vacío debe cambiarlo y pasar al siguiente pallet de entrada
@@ -957,73 +1748,53 @@ class Simulation(DataAnalysis):
           continue                                              #Si no existen destinos continúa con el siguiente pallet de entrada
         
         #Comienza loop secundario para que solo cambie de pallet de entrada cuando lo termina o no hay destinos
-        while ((not self.entryPallets[i].empty) and (len(possibleDestinations) > 0)):
+        entryPallet = self.entryPallets[i]
+        registry = self.exitRegistry
+        while ((not entryPallet.empty) and (len(possibleDestinations) > 0)):
           
           remainingLayers = self.__checkRemainingLayers()             #Valores para registro de simulación
-          self.numExitPallets = len(self.exitPallets)                 #Valores para registro de simulación
+          self.numExitPallets = len(registry)                         #Valores para registro de simulación
           self.numCompletedPallets = len(self.completedExitPallets)   #Valores para registro de simulación
 
           #Registro de simulación
-          tempData = {'RemLayers': [self.remainingLayers], 'ExitPallets': [self.numExitPallets], 'CompPallets':[self.numCompletedPallets],\
-                       'LayerTransfers': [self.transferedLayers], 'BatchTransfers': [self.batchTransfers], 'PalletChanges':[self.palletChanges]}
-          tempDF = pd.DataFrame(data=tempData, index=[self.simRecordIndex])
-          self.simRecordIndex += 1
-          self.simulationRecord = pd.concat([self.simulationRecord, tempDF])
-
-          if len(self.exitPallets) > 0:
-            palletFound = False
-
-            #Itera por cada pallet de salida
-            for j in range(len(self.exitPallets)):
-              palletFound = False
-              #Verifica si el destino del pallet es de los buscados y si el pallet tiene lugar libre              
-              if ((self.exitPallets[j].destination in possibleDestinations) and (not self.exitPallets[j].complete)): 
-                palletFound = True                                #Encontró un pallet para asignar capas
-
-              else:
-                if self.exitPallets[j].complete:                  #Si el pallet de destino está completo
-                  if not (j in self.deleteExitPallets):           #Y si no está para borrar ya
-                    self.deleteExitPallets += [j]                 #Agrega indice de pallet a la lista para eliminar
-
-              #Operación cuando hay pallet para transferir capas
-              if palletFound:
-                self.__layerTransferProcess(i, j)                 #Transferencia de capas entre pallets
+          self.recorder.record(self.remainingLayers, self.numExitPallets, self.numCompletedPallets,
+                               self.transferedLayers, self.batchTransfers, self.palletChanges)
+
+          if len(registry) > 0:
+            registry.markComplete()                               #Los pallets ya completos se cierran al final del paso
+            newestPallet = registry.newest()
+            palletFound = False                                   #Indica si el último pallet abierto recibió capas
+
+            #Itera por los pallets abiertos de los destinos posibles, en orden de creación
+            for exitPallet in registry.candidates(possibleDestinations):
+              #Verifica si el destino del pallet sigue necesitando el SKU
+              found = self.orderBook.layers(exitPallet.destination, currentSKU) > 0
+              if found:
+                self.__layerTransferProcess(entryPallet, exitPallet)   #Transferencia de capas entre pallets
                 possibleDestinations = self.__getDestinationsForSku(currentSKU)  #Obtiene lista de destinos posibles para el SKU
+              if exitPallet is newestPallet:
+                palletFound = found
           
             if len(possibleDestinations) == 0:                      #Verifica si existen destinos posibles
               continue                                              #Si no existen destinos continúa con el siguiente pallet de entrada
         
-            #Si iterando por los pallets de salida no se encontró ninguno para transferir capas
+            #Si el último pallet de salida no recibió capas
             if not palletFound:
-              self.exitPallets += [PalletSalida(possibleDestinations[0])]   #Se crea un pallet de salida con el primer destino
-              
-              self.__layerTransferProcess(i, -1)                  #Transferencia de capas entre pallets. 
-                                                                  #Indice -1 para destino referencia pallet recién creado
+              newPallet = self.__openExitPallet(possibleDestinations[0])   #Se crea un pallet de salida con el primer destino
+              self.__layerTransferProcess(entryPallet, newPallet)  #Transferencia de capas entre pallets
               possibleDestinations = self.__getDestinationsForSku(currentSKU)  #Obtiene lista de destinos posibles para el SKU
           
           else:                                                   #No existen pallets de salida todavía
             if len(possibleDestinations) == 0:                    #Verifica si existen destinos posibles
               continue                                            #Si no existen destinos continúa con el siguiente pallet de entrada
         
-            self.exitPallets += [PalletSalida(possibleDestinations[0])]   #Se crea un pallet de salida con el primer destino
-              
-            self.__layerTransferProcess(i, -1)                    #Transferencia de capas entre pallets. 
-                                                                  #Indice -1 para destino referencia pallet recién creado
+            newPallet = self.__openExitPallet(possibleDestinations[0])   #Se crea un pallet de salida con el primer destino
+            self.__layerTransferProcess(entryPallet, newPallet)    #Transferencia de capas entre pallets
             possibleDestinations = self.__getDestinationsForSku(currentSKU)  #Obtiene lista de destinos posibles para el SKU
           
           #Iteración por pallets de salida existentes terminada
-          
-          for p in range(len(self.exitPallets)):                       #Verifica si hay pallets para cerrar porque no quedan productos
-            currentDest = self.exitPallets[p].destination       #Destino de cada pallet de salida para verificar
-            if len(self.dayDataset[self.dayDataset['Destino']==currentDest]) == 0:   #No quedan capas por asignar a ese destino
-              if not (p in self.deleteExitPallets):             #Y si no está para borrar ya
-                    self.deleteExitPallets += [p]               #Agrega indice de pallet a la lista para eliminar
-
-          if len(self.deleteExitPallets) > 0:                   #Verifica si debe eliminar pallets de salida
-            for m in sorted(self.deleteExitPallets, reverse=True):  #Reordena lista para borrar comenzando por los indices altos
-              self.completedExitPallets += [self.exitPallets[m]]#Guarda pallet en lista de completados
-              del self.exitPallets[m]                           #Lo elimina de lista de en uso
-            self.deleteExitPallets = []                         #Una vez eliminados se vacía la lista
+          registry.markExhausted()                                #Pallets de destinos sin capas por asignar
+          self.__retireExitPallets(registry.retire())             #Guarda pallets cerrados en lista de completados
 
           #Vuelve a evaluar si continua con el mismo pallet de entrada o cambia
           possibleDestinations = self.__getDestinationsForSku(currentSKU)  #Obtiene lista de destinos posibles para el SKU
@@ -1034,132 +1805,259 @@ class Simulation(DataAnalysis):
 
       self.remainingLayers = self.__checkRemainingLayers()
 
-    self.aa = self.simulationRecord['ExitPallets'].max()
+    self.skuAllocation['PalletsParciales'] = self.entrySelector.partials    #Pallets parciales sin usar por SKU
+    self.aa = self.recorder.maxExitPallets                        #Máximo de pallets de salida abiertos
     #self.simulationRecord.plot(grid=True, style='.-')
     #plt.show()
 
-  def __multilayerTransfer(self, entryPalletIndex:int, exitPalletIndex:int, layerQuantity:int) -> int:
-    """Transferencia de múltiples capas entre pallets especificando cantidades
+  def __endSimulationBatch(self) -> None:
+    """Cierra la tanda actual: todos los pallets de salida de la tanda están completos y se guardan en la lista de
+    completados, liberando las posiciones de salida. Los pallets de entrada quedan en sus posiciones
+    """
+    self.__retireExitPallets(list(self.exitRegistry))           #Se guardan los pallets completados
+    self.exitRegistry = ExitPalletRegistry()                     #Se vacían las posiciones de salida
+
+  def __loadEntryPallet(self, SKU:int, positions:dict, storage:dict, maxProdsEntry:int) -> PalletEntrada:
+    """Devuelve el pallet de entrada del SKU en su posición, colocándolo si no está. Si no hay posiciones libres
+    se retira el pallet colocado hace más tiempo; si le quedan capas vuelve al depósito y se reutiliza más adelante
 
     Args:
-        entryPalletIndex (int): Indice de pallet de entrada a utilizar de la lista
-        exitPalletIndex (int): Indice de pallet de salida a utilizar de la lista (ya existente)
-        layerQuantity (int): Cantidad de capas a transferir
-    
+        SKU (int): Producto buscado
+        positions (dict): Posiciones de entrada. SKU -> PalletEntrada, en orden de colocación
+        storage (dict): Pallets de entrada retirados con capas. SKU -> PalletEntrada
+        maxProdsEntry (int): Cantidad de posiciones de entrada
+
     Returns:
-        int: Cantidad de capas transferidas
+        PalletEntrada: Pallet de entrada con capas
     """
-    availableLayers = len(self.entryPallets[entryPalletIndex].layers)           #Cuantas capas tiene el pallet de entrada para dar
-    layersQty = min([layerQuantity, availableLayers])                           #Cantidad de capas a transferir finalmente
+    pallet = positions.get(SKU)
+    if pallet is not None:
+      return pallet
+
+    if len(positions) >= maxProdsEntry:
+      oldestSku = next(iter(positions))
+      storage[oldestSku] = positions.pop(oldestSku)             #Solo quedan en posiciones pallets con capas
+    changed = self.loadedEntryPallets >= maxProdsEntry           #Las primeras cargas ocupan posiciones vacías
+    if changed:
+      self.palletChanges += 1
+    self.loadedEntryPallets += 1
+
+    pallet = storage.pop(SKU, None)
+    positions[SKU] = pallet if pallet is not None else PalletEntrada(SKU)
+    if changed:
+      self.__traceEvent(traceChange, entryPallet=positions[SKU])
+    return positions[SKU]
 
-    if layersQty > 0:                                           #Verificar que no se intenten transferir capas nulas
+  @timer
+  def limitedPositionSimulation(self, maxProdsEntry:int, maxExitPallets:int=None) -> None:
+    """Simulación de paletizado donde se predefinen los pallets de destino por tandas limitadas
+    Los pallets de salida se agrupan por SKUs (entryPalletSelection) y cada grupo se paletiza en tandas de a lo sumo
+    maxExitPallets pallets de salida, intercambiando los pallets de entrada hasta que los de salida estén completos.
+    La demanda se guarda en arrays enteros ordenados por (grupo, tanda, SKU), así que cada tanda es una única pasada
+    por sus pares (pallet de salida, SKU)
 
-      self.batchTransfers += 1                                  #Registro para estadísticas de simulación
+    Args:
+        maxProdsEntry (int): Cantidad de posiciones de pallets de entrada
+        maxExitPallets (int, optional): Cantidad de posiciones de pallets de salida. Defaults to None (todos los pallets del grupo).
+    """
+    if maxProdsEntry < 1 or (maxExitPallets is not None and maxExitPallets < 1):
+      raise ValueError("La cantidad de posiciones de entrada y salida debe ser al menos 1")
 
-      for k in range(layersQty):
-        self.__transferLayer(entryPalletIndex, exitPalletIndex) #Transfiere las capas
+    exitPalletAssignment = self.exitPalletDefinition()
+    # palEntr: 'Grupo', 'SKU', 'CantidadPallets'
+    # palSal: 'Grupo', 'Destino', 'Pallet', 'SKU', 'Cantidad'
+    palEntr, palSal = self.entryPalletSelection(exitPalletAssignment, maxProdsEntry)
+    self.entryPalletPlan = palEntr                                #Pallets de entrada previstos por grupo
+    self.remainingLayers = self.__checkRemainingLayers()
+    if palSal.empty:                                              #Día sin capas: métricas en cero, igual que la simulación simple
+      self.aa = self.recorder.maxExitPallets
+      return
+
+    #Arrays enteros de demanda por par (pallet de salida, SKU)
+    palletCodes, palletIndex = pd.factorize(pd.MultiIndex.from_frame(palSal[['Destino', 'Pallet']]))
+    groups = palSal['Grupo'].to_numpy(dtype=np.int64)
+    skus = palSal['SKU'].to_numpy(dtype=np.int64)
+    demand = palSal['Cantidad'].to_numpy(dtype=np.int64)
+    destinations = palletIndex.get_level_values(0)
+    if maxExitPallets is not None:
+      firstCode = pd.Series(palletCodes).groupby(groups).transform('min').to_numpy()
+      batches = (palletCodes - firstCode)//maxExitPallets        #Los pallets de un grupo tienen códigos consecutivos
+    else:
+      batches = np.zeros(len(palSal), dtype=np.int64)
 
-    return layersQty
+    order = np.lexsort((skus, batches, groups))                   #Orden por grupo, tanda y SKU
+    newBatch = np.flatnonzero(np.diff(groups[order]) | np.diff(batches[order])) + 1
+    bounds = np.concatenate(([0], newBatch, [len(order)]))
 
-  def __endSimulationBatch(self, entryPallets:pd.DataFrame, exitPallets:pd.DataFrame, group:int) -> List[pd.DataFrame]:
-    """Cambia los pallets de entrada y salida. Para pallets de entrada si quedan en el grupo pone esos, sino cambia de grupo.
+    positions = {}                                                #Posiciones de entrada. SKU -> PalletEntrada
+    storage = {}                                                  #Pallets de entrada retirados con capas
+    self.loadedEntryPallets = 0
 
-    Args:
-        entryPallets (pd.DataFrame): DataFrame de pallets de entrada. Columnas: 'Grupo', 'SKU', 'CantidadPallets'
-        exitPallets (pd.DataFrame): DataFrame de pallets de salida. Columnas: 'Grupo', 'Destino', 'Pallet', 'SKU', 'Cantidad'
-        group (int): Grupo actual
+    #Loop principal por tandas de pallets de salida
+    for start, end in zip(bounds[:-1], bounds[1:]):
+      rows = order[start:end]
+      exitPallets = {code: self.__openExitPallet(destinations[code]) for code in np.unique(palletCodes[rows]).tolist()}
 
-    Returns:
-        List[pd.DataFrame]: _description_
-    """
-    groupEntryPallets = entryPallets[entryPallets['Grupo']==self.group]    #Filtrado de pallets de entrada por grupo
-    remPalletsGroup = groupEntryPallets['Cantidad'].sum()                  #Cantidad de pallets que quedan para el grupo   
-    totalGroups = pd.unique(palEntr['Grupo'])
+      for code, SKU, layersLeft in zip(palletCodes[rows].tolist(), skus[rows].tolist(), demand[rows].tolist()):
+        while layersLeft > 0:
+          entryPallet = self.__loadEntryPallet(SKU, positions, storage, maxProdsEntry)
 
-    if remPalletsGroup > 0:           #no quedan pallets del grupo, se cambia al siguiente
-      self.entryPallets = []          #Hay que vaciar la lista de pallets de entrada para colocar los nuevos
-      self.group += 1
-    else: 
-      self.entryPallets = []          #Hay que vaciar la lista de pallets de entrada para colocar los nuevos
-      for m in len(self.exitPallets): #Se guardan los pallets completados
-        self.completedExitPallets += [self.exitPallets[m]]
-      self.exitPallets = []          #Se vacía la lista de pallets de salida
+          #Registro de simulación
+          self.numExitPallets = len(self.exitRegistry)
+          self.numCompletedPallets = len(self.completedExitPallets)
+          self.recorder.record(self.remainingLayers, self.numExitPallets, self.numCompletedPallets,
+                               self.transferedLayers, self.batchTransfers, self.palletChanges)
+
+          layers = min(layersLeft, entryPallet.currentLayers)
+          self.batchTransfers += 1
+          self.__transferLayers(entryPallet, exitPallets[code], layers)   #Transfiere las capas en un solo movimiento
+          layersLeft -= layers
+          self.remainingLayers -= layers
+          if entryPallet.empty:
+            del positions[SKU]                                    #Se libera la posición del pallet vacío
+
+      self.entryPallets = list(positions.values())
+      self.__endSimulationBatch()
 
+    self.remainingLayers = self.__checkRemainingLayers()
+    self.aa = self.recorder.maxExitPallets                        #Máximo de pallets de salida abiertos
 
-  def limitedPositionSimulation(self, maxProdsEntry:int) -> None:
-    """Simulación de paletizado donde se predefinen los pallets de destino por tandas limitadas
-    Se paletiza por tandas intercambiando los pallets de entrada hasta que todos los de salida estén completos
+  def daySimulation(self, startingPallets:int, rng:np.random.Generator=None, skuAllocation:pd.DataFrame=None, limited:bool=False, maxExitPallets:int=None,
+                    entryPolicy:str='random'):
+    """Simulación de paletizado para un día
 
     Args:
-        maxProdsEntry (int): Cantidad de pallets de entrada
+        startingPallets (int): Cantidad de pallets de entrada que se utilizarán
+        rng (np.random.Generator, optional): Generador para la elección aleatoria de pallets de entrada. Defaults to None (RNG global de NumPy).
+        skuAllocation (pd.DataFrame, optional): Asignación de SKUs ya calculada con getSkuAllocation para este dataset. Defaults to None.
+        limited (bool, optional): Usa la simulación de posiciones limitadas por tandas. Defaults to False.
+        maxExitPallets (int, optional): Posiciones de salida de la simulación limitada. Defaults to None (sin límite por grupo).
+        entryPolicy (str, optional): Política de reemplazo de pallets de entrada de la simulación simple ('random',
+            'demand' o 'destinations'). Defaults to 'random'.
     """
-    exitPalletAssignment = self.exitPalletDefinition()
-    # palEntr: 'Grupo', 'SKU', 'CantidadPallets'
-    # palSal: 'Grupo', 'Destino', 'Pallet', 'SKU', 'Cantidad'
-    palEntr, palSal = self.entryPalletSelection(exitPalletAssignment, maxProdsEntry)
+    self.rng = rng
+    self.totalLayers = self.orderBook.total
 
-    palletGroups = pd.unique(palEntr['Grupo'])        #Array de grupos
-    self.group = 1
-    self.remainingLayers = palSal['Cantidad'].sum()
+    instrumentation.beginDay()                                    #Abre el resumen del día, lo anterior cuenta como preparación
+    with phase('Simulation.daySimulation'):
+      if limited:
+        self.limitedPositionSimulation(startingPallets, maxExitPallets=maxExitPallets)
+      else:
+        #DataFrame de SKUs y cantidades
+        with phase('Simulation.skuAllocation'):
+          if skuAllocation is not None:
+            self.skuAllocation = skuAllocation.copy()             #La simulación modifica la tabla, se trabaja sobre una copia
+          else:
+            self.__getSkuAllocation()
 
-    #Loop principal por grupos de pallets de salida
-    while (self.remainingLayers > 0):
+        #Simulación simple
+        self.unlimitedExitSimulation(startingPallets=startingPallets, entryPolicy=entryPolicy)
 
-      groupEntryPallets = palEntr[palEntr['Grupo']==self.group]                        #Filtrado de pallets de entrada por grupo
-      entryPalsQty = maxProdsEntry if groupEntryPallets.shape[0] >= maxProdsEntry else groupEntryPallets.shape[0]     #Verifica cuantos puede crear
-      
-      for entryPalsIndx in range(entryPalsQty):                                   #Loop de creación de pallets de entrada
-        self.entryPallets += [PalletEntrada(groupEntryPallets.iloc[entryPalsIndx]['SKU'])]    #Creación de cada pallet
-        palEntr.iat[entryPalsIndx, 2] -= 1                                        #Se le resta uno a la cantidad de pallets de ese SKU para ese grupo
+    instrumentation.endDay(self.simulationDay)                    #Cierra el resumen del día (si la instrumentación está habilitada)
 
-      groupExitPallets = palSal[palSal['Grupo']==self.group]
-      exitPalsQty = groupExitPallets.shape[0]                                     #Cantidad de pallets de salida para ese grupo
-      
-      for exitPalsIndx in range(exitPalsQty):                                                #Loop de creación de pallets de salida y asignación de capas
-        self.exitPallets += [PalletSalida(groupExitPallets.iloc[exitPalsIndx]['Destino'])]   #Creación de cada pallet
+  def streamSimulation(self, filePath:str, topNumber:int, startingPallets:int, chunkSize:int=streamChunkSize,
+                       rng:np.random.Generator=None, **simulationArgs) -> Iterator[dict]:
+    """Simula cada día a medida que streamDays lo completa, sin cargar el archivo entero en memoria
 
-      #Comienza loop de asignación de capas
-      for i in range(len(self.entryPallets)):                   #Recorre para cada pallet de entrada
-        if self.entryPallets[i].empty:
-          continue
+    Args:
+        filePath (str): Ruta al archivo csv, ordenado por fecha
+        topNumber (int): Cantidad de SKUs por día para el dataset de robot
+        startingPallets (int): Cantidad de pallets de entrada
+        chunkSize (int, optional): Filas leídas por bloque. Defaults to streamChunkSize.
+        rng (np.random.Generator, optional): Generador compartido por todos los días. Defaults to None.
+        **simulationArgs: Argumentos adicionales de daySimulation (limited, maxExitPallets, entryPolicy)
+
+    Yields:
+        Iterator[dict]: Fecha y métricas de getDayMetrics por día
+    """
+    for day, dayDF in self.streamDays(filePath, chunkSize):
+      self.resetSimulation()
+      self.getSimulationDayDataset(day, self.robotDataset(dayDF, topNumber))
+      self.daySimulation(startingPallets, rng=rng, **simulationArgs)
+      yield {'Fecha': day, **self.getDayMetrics()}
+    self.clearPartitionCache()                                      #No se retienen los días ya simulados
+
+  def simulateNewDay(self, orders, topNumber:int, startingPallets:int, rng:np.random.Generator=None, **simulationArgs) -> pd.DataFrame:
+    """Modo incremental: agrega las líneas de pedido de un día nuevo, simula solo los días afectados y actualiza dayMetrics.
+    El dataset de robot sale de getRobotDataset, así que queda guardado y actualizado para las corridas siguientes.
+    dayMetrics puede inicializarse con métricas de corridas anteriores (p. ej. salida de parallel_sim.simulateDays).
+    Para una corrida diaria en un proceso nuevo, partir de loadState y terminar con saveState
 
-        currentSKU = self.entryPallets[i].product               #Define producto del pallet actual
+    Args:
+        orders (str | pd.DataFrame): Líneas de pedido nuevas, ver appendOrders
+        topNumber (int): Cantidad de SKUs por día para el dataset de robot
+        startingPallets (int): Cantidad de pallets de entrada
+        rng (np.random.Generator, optional): Generador para la simulación. Defaults to None.
+        **simulationArgs: Argumentos adicionales de daySimulation (limited, maxExitPallets, entryPolicy)
 
-        for j in range(len(self.exitPallets)):                  #Recorre para cada pallet de salida
-          palletDestination = self.exitPallets[j].destination   #Destino de pallet de salida
+    Returns:
+        pd.DataFrame: Métricas de los días simulados. Columnas: Fecha (index) y métricas de getDayMetrics
+    """
+    affectedDF = self.appendOrders(orders)
+    robotDF = self.getRobotDataset(topNumber)                       #appendOrders ya actualizó los días afectados
 
-          #no se si se puede asumir que en cada grupo no va a haber destinos repetidos
-          #supongo que hay solo un pallet por destino en un grupo
-          query_str = f"Destino=={palletDestination} & SKU=={currentSKU} & Cantidad >= 1"
-          palletProducts = groupExitPallets.query(query_str)
-          #Devuelve DF con columnas SKU y Cantidad
-          
-          if not palletProducts.empty:                          #Si dio algún resultado el filtro
-            layersToTransfer = palletProducts['Cantidad']
-            rowIndex = layersToTransfer.index.values[0]
-            transferedLayers = self.__multilayerTransfer(i, j, layersToTransfer)   #Transferencia de capas
-            palSal.at[rowIndex, 'Cantidad'] -= transferedLayers
-        #Terminó iteración por pallets de salida
-      #Terminó de pasar por todos los pallets de entrada
+    rows = []
+    for day in pd.DatetimeIndex(affectedDF.index).normalize().unique().sort_values():
+      self.resetSimulation()
+      self.getSimulationDayDataset(day, robotDF)
+      self.daySimulation(startingPallets, rng=rng, **simulationArgs)
+      rows += [{'Fecha': day, **self.getDayMetrics()}]
+    self.resetSimulation()
 
-      self.remainingLayers = palSal['Cantidad'].sum()
+    newMetrics = pd.DataFrame(rows).set_index('Fecha') if rows else pd.DataFrame()
+    previous = self.dayMetrics[~self.dayMetrics.index.isin(newMetrics.index)]
+    self.dayMetrics = pd.concat([previous, newMetrics]).sort_index(kind='stable') if len(previous) else newMetrics
+    return newMetrics
 
-          
+  def stateArrays(self) -> dict:
+    """Estado persistente de DataAnalysis más las métricas por día del modo incremental
 
-  @timer
-  def daySimulation(self, startingPallets:int):
-    """Simulación de paletizado para un día
+    Returns:
+        dict: Arrays para saveState
+    """
+    arrays = super().stateArrays()
+    metrics = self.dayMetrics
+    arrays['metricsFecha'] = metrics.index.to_numpy(dtype='datetime64[ns]')
+    arrays['metricsColumns'] = np.asarray(metrics.columns, dtype=str)
+    arrays.update({f'metrics_{col}': metrics[col].to_numpy() for col in metrics.columns})
+    return arrays
+
+  def restoreState(self, arrays) -> None:
+    """Restaura el estado guardado por stateArrays, incluidas las métricas por día
 
     Args:
-        dayDataset (pd.DataFrame): Dataset de capas por cliente para el día dado. Columnas: Destino (index), SKU, Cantidad
-        startingPallets (int): Cantidad de pallets de entrada que se utilizarán
+        arrays (dict | np.lib.npyio.NpzFile): Arrays guardados
     """
-    #DataFrame de SKUs y cantidades
-    self.__getSkuAllocation()
-    self.totalLayers = self.dayDataset['Cantidad'].sum()
+    super().restoreState(arrays)
+    columns = arrays['metricsColumns'].tolist()
+    if columns:
+      self.dayMetrics = pd.DataFrame({col: arrays[f'metrics_{col}'] for col in columns},
+                                     index=pd.DatetimeIndex(arrays['metricsFecha'], name='Fecha'))
+    else:
+      self.dayMetrics = pd.DataFrame()
 
-    #Simulación simple
-    self.unlimitedExitSimulation(startingPallets=startingPallets)
+  def aggregateMetrics(self) -> pd.Series:
+    """Estadísticas agregadas de todos los días en dayMetrics
+
+    Returns:
+        pd.Series: Dias, BatchTransfers, TransferedLayers, RemainingLayers, TotalLayers, MaxExitPallets, MeanExitPallets, PalletChanges
+    """
+    metrics = self.dayMetrics
+    if metrics.empty:
+      return pd.Series({'Dias': 0}, dtype=np.float64)
+    return pd.Series({'Dias': len(metrics), 'BatchTransfers': metrics['BatchTransfers'].sum(), 'TransferedLayers': metrics['TransferedLayers'].sum(),
+                      'RemainingLayers': metrics['RemainingLayers'].sum(), 'TotalLayers': metrics['TotalLayers'].sum(),
+                      'MaxExitPallets': metrics['MaxExitPallets'].max(), 'MeanExitPallets': metrics['MaxExitPallets'].mean(),
+                      'PalletChanges': metrics['PalletChanges'].sum()})
+
+  def getDayMetrics(self) -> dict:
+    """Métricas resumidas de la última simulación del día
+
+    Returns:
+        dict: BatchTransfers, TransferedLayers, RemainingLayers, TotalLayers, MaxExitPallets, PalletChanges
+    """
+    return {'BatchTransfers': self.batchTransfers, 'TransferedLayers': self.transferedLayers, 'RemainingLayers': int(self.remainingLayers),
+            'TotalLayers': int(self.totalLayers), 'MaxExitPallets': int(self.recorder.maxExitPallets), 'PalletChanges': self.palletChanges}
 
   def resetSimulation(self):
     """Reinicia todas las variables de clase para poder correr una nueva simulación
@@ -1170,12 +2068,9 @@ class Simulation(DataAnalysis):
     #Lista de pallets de entrada
     self.entryPallets = []
 
-    #Lista de pallets de salida
-    self.exitPallets = []
+    #Registro de pallets de salida
+    self.exitRegistry = ExitPalletRegistry()
     self.completedExitPallets = []
-
-    #Lista de indices para eliminar pallets de salida luego de una iteración completa
-    self.deleteExitPallets = []
     
     #Métricas de simulación
     self.remainingLayers = 0
@@ -1184,75 +2079,8 @@ class Simulation(DataAnalysis):
     self.transferedLayers = 0
     self.batchTransfers = 0
     self.totalPallets = 0
+    self.totalLayers = 0
     self.palletChanges = 0
-    self.simRecordIndex = 0
-    self.simulationRecord = pd.DataFrame(columns=['RemLayers', 'ExitPallets', 'CompPallets', 'LayerTransfers', 'BatchTransfers', 'PalletChanges'])
-
-if __name__ == '__main__':
-
-  timestamp = datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-  logging.info(f"Comenzando simulación - {timestamp}")
-
-  sim = Simulation("BD  Pedidos  CEDIS MAR-ABR-MAY- 2023.csv")
-  dataset_completo = sim.getSimulationDataset(20)
-  dias = sim.days
-  makeGraph = False
-  iters = 15
-  openPosDF = pd.DataFrame(columns=dias, index=list(range(iters)))
-
-  
-  
-  movements_day_DF = pd.DataFrame(columns=['Fecha', 'Movimientos', 'CapasTotales'])
-  dayStatsDF = pd.DataFrame(columns=['Fecha', 'CapasTotales', 'MovConPiso', 'MovEnGrupo', 'Transferencias'])
-  #movements_day_DF, _ = sim.bestCasePalletizing(dataset_completo)
-  batchMovements = []
-  layerTransfers = []
-
-  for dia in dias:
-    openPosList = []
-    
-    sim.getSimulationDayDataset(dia, dataset_completo)
-
-    exitPalletAssignment = sim.exitPalletDefinition(2)
-    palEntr, palSal = sim.entryPalletSelection(exitPalletAssignment, 6)
-
-    sim.daySimulation(10)
-    batchMovements += [sim.batchTransfers]
-    layerTransfers += [sim.transferedLayers]
-    logging.info(f"{dia} - Remaining layers {sim.remainingLayers}/{sim.totalLayers}")
-    if sim.remainingLayers > 0:
-      logging.warning(f"No se asignaron todas las capas el día {dia}")
-    sim.resetSimulation()
-    """
-    for i in range(iters):
-      sim.getSimulationDayDataset(dia, dataset_completo)
-      #sim.exitPalletDefinition(3)
-      sim.daySimulation(20)
-      print(f"{20} Posiciones de entrada - {sim.aa} Posiciones de salida max")
-      openPosList += [sim.aa]     
-      sim.resetSimulation()
-    openPosDF[dia] = openPosList
-    """
-  print("FIN!")
-
-  dayStatsDF['Fecha'] = movements_day_DF['Fecha']
-  dayStatsDF['CapasTotales'] = movements_day_DF['CapasTotales']
-  dayStatsDF['MovConPiso'] = movements_day_DF['Movimientos']
-  dayStatsDF['MovEnGrupo'] = batchMovements
-  dayStatsDF['Transferencias'] = layerTransfers
-  logging.info(f"Capas totales: Min={dayStatsDF.loc[:, 'CapasTotales'].min()} - Mean={dayStatsDF.loc[:, 'CapasTotales'].mean()} - Max={dayStatsDF.loc[:, 'CapasTotales'].max()}")
-  logging.info(f"Movimientos dejando piso: Min={dayStatsDF.loc[:, 'MovConPiso'].min()} - Mean={dayStatsDF.loc[:, 'MovConPiso'].mean()} - Max={dayStatsDF.loc[:, 'MovConPiso'].max()}")
-  logging.info(f"Porcentaje pisos: Min={movements_day_DF.loc[:, 'Ratio'].min()} - Mean={movements_day_DF.loc[:, 'Ratio'].mean()} - Max={movements_day_DF.loc[:, 'Ratio'].max()}")
-  logging.info(f"Movimientos multi capa: Min={dayStatsDF.loc[:, 'MovEnGrupo'].min()} - Mean={dayStatsDF.loc[:, 'MovEnGrupo'].mean()} - Max={dayStatsDF.loc[:, 'MovEnGrupo'].max()}")
-  logging.info(f"Transferencias: Min={dayStatsDF.loc[:, 'Transferencias'].min()} - Mean={dayStatsDF.loc[:, 'Transferencias'].mean()} - Max={dayStatsDF.loc[:, 'Transferencias'].max()}")
-
-  dayStatsDF.set_index(['Fecha'], inplace=True) 
-
-  timestamp = datetime.datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-  logging.info(f"Comenzando simulación - {timestamp}") 
-
-  if makeGraph:
-    dayStatsDF.plot(grid=True, style='.-')
-    plt.show()
- 
-
+    self.loadedEntryPallets = 0
+    self.entryPalletPlan = None
+    self.recorder = SimulationRecorder(self.recordStride)
@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from palletizing_sim import DataAnalysis, Simulation
+
+#Instancia de simulación reutilizada por cada proceso
+_workerSimulation = None
+
+def getWorkerSimulation() -> Simulation:
+  """Devuelve la simulación del proceso actual, creándola sin leer ningún CSV la primera vez
+
+  Returns:
+      Simulation: Simulación con dataset vacío
+  """
+  global _workerSimulation
+  if _workerSimulation is None:
+    _workerSimulation = Simulation()
+  return _workerSimulation
+
+def simulateDay(task:tuple) -> dict:
+  """Simula un único día. Pensada para ejecutarse en un proceso del pool, recibe solo el slice del día
+
+  Args:
+      task (tuple): (día, slice del dataset de robot para ese día, cantidad de pallets de entrada, semilla o None)
+
+  Returns:
+      dict: Fecha y métricas de Simulation.getDayMetrics
+  """
+  day, dayDF, startingPallets, seed = task
+  rng = np.random.default_rng(seed) if seed is not None else None
+
+  sim = getWorkerSimulation()
+  sim.getSimulationDayDataset(day, dayDF)
+  sim.daySimulation(startingPallets, rng=rng)
+  metrics = {'Fecha': day, **sim.getDayMetrics()}
+  sim.resetSimulation()
+  return metrics
+
+def daySeeds(seed:int, days:int) -> List[int]:
+  """Semillas independientes por día derivadas de una semilla base
+
+  Args:
+      seed (int): Semilla base
+      days (int): Cantidad de días
+
+  Returns:
+      List[int]: Una semilla de 32 bits por día
+  """
+  return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(days)]
+
+def simulateDays(analysis:DataAnalysis, robotDataset:pd.DataFrame, startingPallets:int, workers:int=None, chunkSize:int=1, seed:int=None) -> pd.DataFrame:
+  """Simula todos los días en paralelo con un pool de procesos. Los días no comparten estado, así que cada proceso
+  recibe solo el slice de su día y devuelve métricas resumidas
+
+  Args:
+      analysis (DataAnalysis): Objeto con los días a simular (analysis.days)
+      robotDataset (pd.DataFrame): Dataset de robot. Columnas: Fecha (index), Destino, SKU, Cantidad
+      startingPallets (int): Cantidad de pallets de entrada
+      workers (int, optional): Cantidad de procesos. 1 simula en el proceso actual. Defaults to None (os.cpu_count()).
+      chunkSize (int, optional): Días enviados juntos a cada proceso. Defaults to 1.
+      seed (int, optional): Semilla base para resultados reproducibles. Defaults to None.
+
+  Returns:
+      pd.DataFrame: Una fila por día en orden de fecha. Columnas: Fecha (index), BatchTransfers, TransferedLayers,
+      RemainingLayers, TotalLayers, MaxExitPallets, PalletChanges
+  """
+  days = list(analysis.days)
+  seeds = daySeeds(seed, len(days)) if seed is not None else [None]*len(days)
+  tasks = [(day, analysis.filterByDate(day, robotDataset), startingPallets, daySeed) for day, daySeed in zip(days, seeds)]
+
+  workers = workers if workers is not None else (os.cpu_count() or 1)
+  if workers == 1 or len(tasks) <= 1:
+    results = [simulateDay(task) for task in tasks]
+  else:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+      results = list(pool.map(simulateDay, tasks, chunksize=chunkSize))   #map conserva el orden de los días
+
+  columns = ['Fecha', 'BatchTransfers', 'TransferedLayers', 'RemainingLayers', 'TotalLayers', 'MaxExitPallets', 'PalletChanges']
+  return pd.DataFrame(results, columns=columns).set_index('Fecha')
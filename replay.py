@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+
+from movement_trace import MovementTrace, loadDestinations, loadTrace, traceChange, traceMove, traceOpen, traceRetire
+from palletizing_sim import layersPerPallet
+
+def _asTrace(trace) -> np.ndarray:
+  if isinstance(trace, str):
+    return loadTrace(trace)
+  return trace.toArray() if isinstance(trace, MovementTrace) else trace
+
+def _dates(days, name:str=None) -> pd.DatetimeIndex:
+  """Días de la traza (datetime64[D]) como fechas en ns, igual que el resto de los DataFrames"""
+  return pd.DatetimeIndex(np.asarray(days, dtype='datetime64[ns]'), name=name)
+
+def _moves(trace) -> np.ndarray:
+  """Solo los movimientos de capas de la traza"""
+  trace = _asTrace(trace)
+  return trace[trace['kind'] == traceMove]
+
+def _destinationNames(trace, codes:np.ndarray) -> np.ndarray:
+  """Nombres de destino de los códigos de la traza. Un array sin tabla de destinos conserva los códigos"""
+  if isinstance(trace, str):
+    return loadDestinations(trace)[codes]
+  if isinstance(trace, MovementTrace):
+    return np.array(trace.destinations, dtype=object)[codes]
+  return np.asarray(codes)
+
+def replayRecord(trace, totalLayers:pd.Series=None) -> pd.DataFrame:
+  """Reconstruye simulationRecord para cada día sin volver a simular. Cada fila es el estado al comienzo del paso, como en
+  SimulationRecorder: cuenta los eventos registrados en pasos anteriores (los de paso -1 ocurren antes del primer registro).
+  ExitPallets son las aperturas menos los retiros, CompPallets los retiros y PalletChanges los cambios de pallets de entrada.
+  Incluye todos los pasos aunque la simulación haya usado recordStride > 1
+
+  Args:
+      trace (MovementTrace | np.ndarray | str): Traza, array de MovementTrace.toArray (sin nombres de destino) o ruta al archivo
+      totalLayers (pd.Series, optional): Capas totales por día (index Fecha), p. ej. TotalLayers de getDayMetrics.
+          Defaults to None (capas movidas en el día).
+
+  Returns:
+      pd.DataFrame: Index (Fecha, Paso). Columnas: RemLayers, ExitPallets, CompPallets, LayerTransfers, BatchTransfers, PalletChanges
+  """
+  trace = _asTrace(trace)
+  days, dayCodes = np.unique(trace['day'], return_inverse=True)
+  eventRows = trace['step'].astype(np.int64) + 1                   #Primera fila del día en la que se refleja cada evento
+  layers = trace['layers'].astype(np.int64)
+  kinds = trace['kind']
+
+  #Filas (día, paso) contiguas: la fila global de cada paso es offset del día + paso
+  sizes = np.zeros(len(days), dtype=np.int64)
+  np.maximum.at(sizes, dayCodes, eventRows)
+  offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+  rows = int(sizes.sum())
+  rowDay = np.repeat(np.arange(len(days)), sizes)
+  rowStep = np.arange(rows) - offsets[rowDay]
+
+  def countThrough(kind, weights=None):
+    """Acumulado por día de los eventos del tipo dado que se reflejan hasta cada fila"""
+    selected = (kinds == kind) & (eventRows < sizes[dayCodes])      #Eventos posteriores al último paso no cambian filas
+    perRow = np.bincount(offsets[dayCodes[selected]] + eventRows[selected], weights=None if weights is None else weights[selected],
+                         minlength=rows)
+    cumulative = np.cumsum(perRow)
+    return (cumulative - (cumulative - perRow)[offsets][rowDay]).astype(np.int64)
+
+  layerTransfers = countThrough(traceMove, layers)
+  isMove = kinds == traceMove
+  if totalLayers is None:
+    dayTotals = np.bincount(dayCodes[isMove], weights=layers[isMove], minlength=len(days)).astype(np.int64)
+  else:
+    dayTotals = pd.Series(totalLayers).reindex(_dates(days)).fillna(0).to_numpy(dtype=np.int64)
+  retired = countThrough(traceRetire)
+
+  return pd.DataFrame({'RemLayers': dayTotals[rowDay] - layerTransfers, 'ExitPallets': countThrough(traceOpen) - retired,
+                       'CompPallets': retired, 'LayerTransfers': layerTransfers, 'BatchTransfers': countThrough(traceMove),
+                       'PalletChanges': countThrough(traceChange)},
+                      index=pd.MultiIndex.from_arrays([_dates(days[rowDay]), rowStep], names=['Fecha', 'Paso']))
+
+def palletCompositions(trace) -> pd.DataFrame:
+  """Composición capa por capa de todos los pallets de salida (equivalente a layerListToDF de cada pallet)
+
+  Args:
+      trace (MovementTrace | np.ndarray | str): Traza, array de MovementTrace.toArray (sin nombres de destino) o ruta al archivo
+
+  Returns:
+      pd.DataFrame: Columnas: Fecha, Pallet, Destino, Capa (desde 1), SKU
+  """
+  moves = _moves(trace)
+  order = np.argsort(moves['exitPallet'], kind='stable')            #Movimientos de cada pallet en orden de carga
+  ordered = moves[order]
+  repeats = ordered['layers'].astype(np.int64)
+  pallets = np.repeat(ordered['exitPallet'], repeats)
+  starts = np.flatnonzero(np.concatenate(([True], pallets[1:] != pallets[:-1]))) if len(pallets) else np.zeros(0, dtype=np.int64)
+  layerNumber = np.arange(len(pallets)) - np.repeat(starts, np.diff(np.concatenate((starts, [len(pallets)]))))
+  return pd.DataFrame({'Fecha': _dates(np.repeat(ordered['day'], repeats)), 'Pallet': pallets,
+                       'Destino': _destinationNames(trace, np.repeat(ordered['destination'], repeats)),
+                       'Capa': layerNumber + 1, 'SKU': np.repeat(ordered['sku'], repeats)})
+
+def destinationStats(trace) -> pd.DataFrame:
+  """Movimientos, capas y pallets de salida por día y destino
+
+  Args:
+      trace (MovementTrace | np.ndarray | str): Traza, array de MovementTrace.toArray (sin nombres de destino) o ruta al archivo
+
+  Returns:
+      pd.DataFrame: Index (Fecha, Destino). Columnas: Movimientos, Capas, Pallets, CapasPorMovimiento
+  """
+  moves = _moves(trace)
+  movesDF = pd.DataFrame({'Fecha': _dates(moves['day']), 'Destino': _destinationNames(trace, moves['destination']),
+                          'Pallet': moves['exitPallet'], 'Capas': moves['layers'].astype(np.int64)})
+  statsDF = movesDF.groupby(['Fecha', 'Destino']).agg(Movimientos=('Capas', 'size'), Capas=('Capas', 'sum'), Pallets=('Pallet', 'nunique'))
+  statsDF['CapasPorMovimiento'] = statsDF['Capas']/statsDF['Movimientos']
+  return statsDF
+
+def batchHistogram(trace) -> pd.DataFrame:
+  """Histograma de capas por movimiento para cada día
+
+  Args:
+      trace (MovementTrace | np.ndarray | str): Traza, array de MovementTrace.toArray (sin nombres de destino) o ruta al archivo
+
+  Returns:
+      pd.DataFrame: Index Fecha. Columnas: capas por movimiento (1..layersPerPallet), valores: cantidad de movimientos
+  """
+  moves = _moves(trace)
+  days, dayCodes = np.unique(moves['day'], return_inverse=True)
+  counts = np.zeros((len(days), layersPerPallet + 1), dtype=np.int64)
+  np.add.at(counts, (dayCodes, np.minimum(moves['layers'], layersPerPallet)), 1)
+  return pd.DataFrame(counts[:, 1:], index=_dates(days, name='Fecha'), columns=range(1, layersPerPallet + 1))
+
+def summaryStats(trace) -> pd.DataFrame:
+  """Estadísticas resumidas por día, comparables con getDayMetrics
+
+  Args:
+      trace (MovementTrace | np.ndarray | str): Traza, array de MovementTrace.toArray (sin nombres de destino) o ruta al archivo
+
+  Returns:
+      pd.DataFrame: Index Fecha. Columnas: BatchTransfers, TransferedLayers, ExitPallets, EntryPallets, Destinos, LayersPerBatch,
+      MaxExitPallets, PalletChanges
+  """
+  trace = _asTrace(trace)
+  moves = _moves(trace)
+  movesDF = pd.DataFrame({'Fecha': _dates(moves['day']), 'Capas': moves['layers'].astype(np.int64), 'Salida': moves['exitPallet'],
+                          'Entrada': moves['entryPallet'], 'Destino': moves['destination']})
+  statsDF = movesDF.groupby('Fecha').agg(BatchTransfers=('Capas', 'size'), TransferedLayers=('Capas', 'sum'), ExitPallets=('Salida', 'nunique'),
+                                         EntryPallets=('Entrada', 'nunique'), Destinos=('Destino', 'nunique'))
+  statsDF['LayersPerBatch'] = statsDF['TransferedLayers']/statsDF['BatchTransfers']
+  statsDF['MaxExitPallets'] = replayRecord(trace)['ExitPallets'].groupby(level='Fecha').max()
+  changes = pd.Series(_dates(trace['day'][trace['kind'] == traceChange])).value_counts()
+  statsDF['PalletChanges'] = changes.reindex(statsDF.index).fillna(0).astype(np.int64)
+  return statsDF
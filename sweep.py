@@ -0,0 +1,121 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from palletizing_sim import Simulation, entryPolicies
+from parallel_sim import getWorkerSimulation
+
+def sweepDay(task:tuple) -> List[dict]:
+  """Simula un día para un topNumber con todas las cantidades de pallets de entrada del grid.
+  El dataset del día en capas y la asignación de SKUs se calculan una sola vez y se reutilizan en cada corrida
+
+  Args:
+      task (tuple): (día, topNumber, slice del dataset de robot para ese día, lista de startingPallets, semilla o None,
+                     simulación limitada, posiciones de salida, política de pallets de entrada)
+
+  Returns:
+      List[dict]: Una fila por startingPallets con TopNumber, StartingPallets, Fecha y métricas de Simulation.getDayMetrics
+  """
+  day, topNumber, dayDF, startingPalletsGrid, seed, limited, maxExitPallets, entryPolicy = task
+  sim = getWorkerSimulation()
+  sim.getSimulationDayDataset(day, dayDF)
+  preparedDF = sim.dayDataset                                      #Dataset del día en capas, sin modificar
+  skuAllocation = sim.getSkuAllocation()
+  sim.resetSimulation()
+
+  rows = []
+  for startingPallets in startingPalletsGrid:
+    rng = np.random.default_rng([seed, topNumber, startingPallets, day.value]) if seed is not None else None
+    sim.setDayDataset(preparedDF)
+    sim.daySimulation(startingPallets, rng=rng, skuAllocation=skuAllocation, limited=limited, maxExitPallets=maxExitPallets,
+                      entryPolicy=entryPolicy)
+    rows += [{'TopNumber': topNumber, 'StartingPallets': startingPallets, 'Fecha': day, **sim.getDayMetrics()}]
+    sim.resetSimulation()
+  return rows
+
+def runSweep(sim:Simulation, topNumbers:List[int], startingPalletsGrid:List[int], workers:int=None, seed:int=None,
+             limited:bool=False, maxExitPallets:int=None, entryPolicy:str='random') -> pd.DataFrame:
+  """Barrido de parámetros topNumber × startingPallets. Los datos se cargan una vez, el dataset de robot se calcula
+  una vez por topNumber y cada tarea del pool es un (día, topNumber) que corre todo el grid de startingPallets
+
+  Args:
+      sim (Simulation): Simulación con el CSV ya cargado
+      topNumbers (List[int]): Valores de topNumber para datasetForRobot
+      startingPalletsGrid (List[int]): Valores de cantidad de pallets de entrada
+      workers (int, optional): Cantidad de procesos. 1 corre en el proceso actual. Defaults to None (os.cpu_count()).
+      seed (int, optional): Semilla base. Cada (topNumber, startingPallets, día) usa su propio generador. Defaults to None.
+      limited (bool, optional): Usa la simulación de posiciones limitadas. startingPallets son las posiciones de entrada. Defaults to False.
+      maxExitPallets (int, optional): Posiciones de salida de la simulación limitada. Defaults to None.
+      entryPolicy (str, optional): Política de reemplazo de pallets de entrada de la simulación simple. Defaults to 'random'.
+
+  Returns:
+      pd.DataFrame: Tabla con una fila por (TopNumber, StartingPallets, Fecha) y métricas por día
+  """
+  robotDatasets = {topNumber: sim.datasetForRobot(topNumber) for topNumber in topNumbers}   #Memoizado por topNumber
+  tasks = [(day, topNumber, sim.filterByDate(day, robotDatasets[topNumber]), list(startingPalletsGrid), seed, limited, maxExitPallets, entryPolicy)
+           for topNumber in topNumbers for day in sim.days]
+
+  workers = workers if workers is not None else (os.cpu_count() or 1)
+  if workers == 1 or len(tasks) <= 1:
+    results = [sweepDay(task) for task in tasks]
+  else:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+      results = list(pool.map(sweepDay, tasks))
+
+  resultsDF = pd.DataFrame([row for taskRows in results for row in taskRows])
+  return resultsDF.sort_values(by=['TopNumber', 'StartingPallets', 'Fecha'], kind='stable').reset_index(drop=True)
+
+def summarizeSweep(resultsDF:pd.DataFrame) -> pd.DataFrame:
+  """Resume el barrido por combinación de parámetros
+
+  Args:
+      resultsDF (pd.DataFrame): Salida de runSweep
+
+  Returns:
+      pd.DataFrame: Una fila por (TopNumber, StartingPallets) con máximo y media de posiciones de salida,
+      movimientos totales, cambios de pallets y capas sin asignar
+  """
+  return resultsDF.groupby(['TopNumber', 'StartingPallets']).agg(MaxExitPallets=('MaxExitPallets', 'max'),
+                                                                  MeanExitPallets=('MaxExitPallets', 'mean'),
+                                                                  BatchTransfers=('BatchTransfers', 'sum'),
+                                                                  TransferedLayers=('TransferedLayers', 'sum'),
+                                                                  PalletChanges=('PalletChanges', 'sum'),
+                                                                  RemainingLayers=('RemainingLayers', 'sum'))
+
+def buildParser() -> argparse.ArgumentParser:
+  """Parser de argumentos del barrido
+
+  Returns:
+      argparse.ArgumentParser: Parser
+  """
+  parser = argparse.ArgumentParser(description='Barrido de parámetros topNumber × startingPallets')
+  parser.add_argument('csv', help='Archivo CSV de pedidos')
+  parser.add_argument('--top', type=int, nargs='+', required=True, help='Valores de topNumber')
+  parser.add_argument('--pallets', type=int, nargs='+', required=True, help='Valores de pallets de entrada')
+  parser.add_argument('--workers', type=int, default=None, help='Cantidad de procesos (por defecto todos los núcleos)')
+  parser.add_argument('--seed', type=int, default=None, help='Semilla base')
+  parser.add_argument('--limited', action='store_true', help='Simulación de posiciones limitadas por tandas')
+  parser.add_argument('--policy', choices=entryPolicies, default='random', help='Política de reemplazo de pallets de entrada')
+  parser.add_argument('--exit-positions', type=int, default=None, help='Posiciones de salida de la simulación limitada')
+  parser.add_argument('--output', default=None, help='CSV de salida con una fila por combinación y día')
+  parser.add_argument('--summary', default=None, help='CSV de salida con el resumen por combinación')
+  return parser
+
+def main(argv:List[str]=None) -> None:
+  args = buildParser().parse_args(argv)
+  sim = Simulation(args.csv)
+  resultsDF = runSweep(sim, args.top, args.pallets, workers=args.workers, seed=args.seed,
+                       limited=args.limited, maxExitPallets=args.exit_positions, entryPolicy=args.policy)
+  summaryDF = summarizeSweep(resultsDF)
+  if args.output:
+    resultsDF.to_csv(args.output, index=False)
+  if args.summary:
+    summaryDF.to_csv(args.summary)
+  print(summaryDF.to_string())
+
+if __name__ == '__main__':
+  main()
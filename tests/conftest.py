@@ -0,0 +1,15 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import generateOrders
+
+@pytest.fixture(scope='session')
+def ordersCSV(tmp_path_factory):
+  """CSV de pedidos sintético chico (3 días, 40 SKUs), el mismo para toda la sesión"""
+  filePath = str(tmp_path_factory.mktemp('orders') / 'orders.csv')
+  generateOrders(filePath, days=3, destinations=12, skus=40, linesPerDay=300, seed=7)
+  return filePath
@@ -0,0 +1,67 @@
+import os
+import shutil
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from palletizing_sim import DataAnalysis
+
+@pytest.fixture
+def localCSV(ordersCSV, tmp_path):
+  """Copia del CSV de pedidos que cada test puede modificar"""
+  filePath = str(tmp_path / 'orders.csv')
+  shutil.copy(ordersCSV, filePath)
+  return filePath
+
+def cacheFiles(cacheDir):
+  return [name for name in os.listdir(cacheDir) if name.endswith('.cache.npz')] if os.path.isdir(cacheDir) else []
+
+def failRead(*args, **kwargs):
+  raise AssertionError('Se releyó el CSV')
+
+def test_cache_round_trip(localCSV, tmp_path, monkeypatch):
+  cacheDir = str(tmp_path / 'cache')
+  parsed = DataAnalysis(localCSV, cacheDir=cacheDir)
+  assert len(cacheFiles(cacheDir)) == 1
+  assert not [name for name in os.listdir(tmp_path) if name.endswith('.npz')]   #Nada junto a los datos
+
+  monkeypatch.setattr(pd, 'read_csv', failRead)
+  cached = DataAnalysis(localCSV, cacheDir=cacheDir)
+  pd.testing.assert_frame_equal(cached.fileDF, parsed.fileDF)
+  pd.testing.assert_series_equal(cached.destinations, parsed.destinations)
+  assert list(cached.skus) == list(parsed.skus)
+  assert list(cached.days) == list(parsed.days)
+
+def test_cache_survives_touch(localCSV, tmp_path, monkeypatch):
+  cacheDir = str(tmp_path / 'cache')
+  DataAnalysis(localCSV, cacheDir=cacheDir)
+  stat = os.stat(localCSV)
+  os.utime(localCSV, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))   #Mismo contenido, otra fecha: vale por hash
+  monkeypatch.setattr(pd, 'read_csv', failRead)
+  DataAnalysis(localCSV, cacheDir=cacheDir)
+
+def test_cache_invalidated_by_new_lines(localCSV, tmp_path):
+  cacheDir = str(tmp_path / 'cache')
+  before = DataAnalysis(localCSV, cacheDir=cacheDir)
+  with open(localCSV, 'a', encoding='latin-1') as f:
+    f.write('999999;01/04/2023 08:00;C999;1000;9;9;9;9;9;0;CV1;01/04/2023;4;13\n')
+  after = DataAnalysis(localCSV, cacheDir=cacheDir)
+  assert len(after.fileDF) == len(before.fileDF) + 1
+  assert 'C999' in set(after.destinations)
+  pd.testing.assert_frame_equal(after.fileDF, DataAnalysis(localCSV, useCache=False).fileDF)
+
+def test_unwritable_cache_dir_falls_back(localCSV, tmp_path, caplog):
+  blocker = tmp_path / 'blocker'
+  blocker.write_text('')                                            #Un archivo donde debería ir la carpeta del caché
+  analysis = DataAnalysis(localCSV, cacheDir=str(blocker / 'cache'))
+  pd.testing.assert_frame_equal(analysis.fileDF, DataAnalysis(localCSV, useCache=False).fileDF)
+  assert 'No se pudo guardar el caché' in caplog.text
+
+def test_default_cache_dir(localCSV, tmp_path, monkeypatch):
+  cacheDir = str(tmp_path / 'env-cache')
+  monkeypatch.setenv('PALLETIZING_CACHE_DIR', cacheDir)
+  DataAnalysis(localCSV)
+  assert len(cacheFiles(cacheDir)) == 1
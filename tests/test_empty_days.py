@@ -0,0 +1,28 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import packing
+from palletizing_sim import Simulation, layersPerPallet
+
+#Día con todas las líneas por debajo de una capa (menos de 4 bandejas): el dataset del día queda sin capas
+lowVolumeDay = pd.DataFrame({'Destino': ['C001', 'C001', 'C002'], 'SKU': [1001, 1002, 1001], 'Cantidad': [3, 2, 1]},
+                            index=pd.DatetimeIndex(['2023-03-01']*3))
+
+def test_groupExitPallets_empty():
+  palletsEntrada, palletsSalida = packing.groupExitPallets(packing.packDay(lowVolumeDay.assign(Cantidad=0), layersPerPallet), 6, layersPerPallet)
+  assert palletsEntrada.empty and list(palletsEntrada.columns) == ['Grupo', 'SKU', 'CantidadPallets']
+  assert palletsSalida.empty and list(palletsSalida.columns) == ['Grupo', 'Destino', 'Pallet', 'SKU', 'Cantidad']
+
+@pytest.mark.parametrize('limited', [False, True])
+def test_daySimulation_low_volume_day(limited):
+  sim = Simulation()
+  sim.getSimulationDayDataset(np.datetime64('2023-03-01'), lowVolumeDay)
+  sim.daySimulation(6, rng=np.random.default_rng(0), limited=limited, maxExitPallets=4)
+  assert sim.getDayMetrics() == {'BatchTransfers': 0, 'TransferedLayers': 0, 'RemainingLayers': 0, 'TotalLayers': 0,
+                                 'MaxExitPallets': 0, 'PalletChanges': 0}
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from palletizing_sim import EntryPalletSelector, OrderBook, Simulation, entryPolicies
+
+#Demanda en capas: el SKU 1 tiene más capas, el SKU 3 más destinos
+dayDataset = pd.DataFrame({'Destino': ['A', 'A', 'B', 'C', 'D'], 'SKU': [1, 2, 3, 3, 3], 'Cantidad': [40, 5, 2, 2, 2]})
+skuAllocation = pd.DataFrame({'PalletsParciales': [3, 1, 1]}, index=pd.Index([1, 2, 3], name='SKU'))
+
+def test_unknown_policy():
+  with pytest.raises(ValueError):
+    EntryPalletSelector(skuAllocation, OrderBook(dayDataset), policy='fifo')
+
+@pytest.mark.parametrize('policy, expected', [('demand', 1), ('destinations', 3)])
+def test_priority_choice(policy, expected):
+  selector = EntryPalletSelector(skuAllocation, OrderBook(dayDataset), policy=policy)
+  assert selector.skus[selector.choose(set(), set())] == expected
+
+def test_priority_skips_assigned_and_exhausted():
+  orderBook = OrderBook(dayDataset)
+  selector = EntryPalletSelector(skuAllocation, orderBook, policy='demand')
+  orderBook.subtract('A', 2, 5)                                     #El SKU 2 se queda sin demanda
+  assert selector.skus[selector.choose(set(), {0})] == 3
+  assert selector.choose(set(), {0, 2}) is None
+
+def test_release_counts_remaining_pallets():
+  selector = EntryPalletSelector(skuAllocation, OrderBook(dayDataset), policy='random', rng=np.random.default_rng(0))
+  assert selector.remaining == 5
+  i = selector.release(2)
+  assert selector.remaining == 4 and not selector.useful(i)
+  assert selector.skus[selector.choose(set(), {0})] == 3           #El SKU 2 no tiene pallets restantes
+
+def test_priority_policies_reduce_pallet_changes(ordersCSV):
+  sim = Simulation(ordersCSV, useCache=False)
+  robotDF = sim.datasetForRobot(30)
+  changes = {}
+  for policy in entryPolicies:
+    metrics = []
+    for day in sim.days:
+      sim.getSimulationDayDataset(day, robotDF)
+      sim.daySimulation(6, rng=np.random.default_rng(0), entryPolicy=policy)
+      metrics += [sim.getDayMetrics()]
+      sim.resetSimulation()
+    assert all(m['RemainingLayers'] == 0 for m in metrics)
+    changes[policy] = sum(m['PalletChanges'] for m in metrics)
+  assert changes['demand'] < changes['random']
+  assert changes['destinations'] < changes['random']
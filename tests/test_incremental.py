@@ -0,0 +1,56 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from palletizing_sim import Simulation
+
+@pytest.fixture
+def splitOrders(ordersCSV, tmp_path):
+  """CSV con todos los días menos el último y las líneas del último día como DataFrame"""
+  ordersDF = pd.read_csv(ordersCSV, sep=';', encoding='latin-1')
+  lastDay = ordersDF['Fecha Comercial'].iloc[-1]
+  historyPath = str(tmp_path / 'history.csv')
+  ordersDF[ordersDF['Fecha Comercial'] != lastDay].to_csv(historyPath, sep=';', index=False, encoding='latin-1')
+  return historyPath, ordersDF[ordersDF['Fecha Comercial'] == lastDay]
+
+def test_appendOrders_matches_full_load(ordersCSV, splitOrders):
+  historyPath, newOrders = splitOrders
+  full = Simulation(ordersCSV, useCache=False)
+  incremental = Simulation(historyPath, useCache=False)
+  incremental.getRobotDataset(20)
+  incremental.appendOrders(newOrders)
+  pd.testing.assert_frame_equal(incremental.fileDF, full.fileDF)
+  assert list(incremental.days) == list(full.days)
+  assert sorted(incremental.skus) == sorted(full.skus)
+  pd.testing.assert_frame_equal(incremental.getRobotDataset(20), full.datasetForRobot(20))
+
+def test_simulateNewDay_refreshes_robot_cache(ordersCSV, splitOrders):
+  historyPath, newOrders = splitOrders
+  full = Simulation(ordersCSV, useCache=False)
+  robotDF = full.datasetForRobot(20)
+  day = full.days.iloc[-1]
+  full.getSimulationDayDataset(day, robotDF)
+  full.daySimulation(6, rng=np.random.default_rng(3))
+
+  incremental = Simulation(historyPath, useCache=False)
+  metricsDF = incremental.simulateNewDay(newOrders, 20, 6, rng=np.random.default_rng(3))
+  assert list(metricsDF.index) == [day]
+  assert metricsDF.loc[day].to_dict() == full.getDayMetrics()
+  pd.testing.assert_frame_equal(incremental.robotCache[20], robotDF)
+
+def test_state_round_trip(splitOrders, tmp_path):
+  historyPath, newOrders = splitOrders
+  sim = Simulation(historyPath, useCache=False)
+  sim.simulateNewDay(newOrders, 20, 6, rng=np.random.default_rng(0))
+  statePath = str(tmp_path / 'state.npz')
+  sim.saveState(statePath)
+
+  restored = Simulation.loadState(statePath)
+  pd.testing.assert_frame_equal(restored.fileDF, sim.fileDF)
+  pd.testing.assert_frame_equal(restored.robotCache[20], sim.robotCache[20])
+  pd.testing.assert_frame_equal(restored.dayMetrics, sim.dayMetrics, check_freq=False)
@@ -0,0 +1,34 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from decorators import Instrumentation
+
+def registry():
+  instrumentation = Instrumentation()
+  instrumentation.enable()
+  instrumentation.record('carga', 0.5)                              #Fuera de un día: preparación
+  instrumentation.beginDay()
+  instrumentation.record('simulacion', 0.25)
+  instrumentation.count('capas', 3)
+  return instrumentation
+
+def test_setup_work_has_its_own_bucket():
+  instrumentation = registry()
+  instrumentation.endDay('d1')
+  assert [row['Nombre'] for row in instrumentation.setupSummary()] == ['carga']
+  assert {row['Nombre'] for row in instrumentation.daySummary()} == {'simulacion', 'capas'}
+
+def test_runSummary_is_read_only():
+  instrumentation = registry()
+  first = instrumentation.runSummary()
+  assert instrumentation.runSummary() == first
+  assert instrumentation.dayOpen and instrumentation.daySummary() == []
+  assert {row['Nombre']: row['Llamadas'] for row in first} == {'carga': 1, 'simulacion': 1, 'capas': 3}
+
+def test_exportCSV_unknown_level(tmp_path):
+  with pytest.raises(ValueError):
+    registry().exportCSV(str(tmp_path / 'resumen.csv'), level='day')
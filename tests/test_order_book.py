@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from palletizing_sim import OrderBook
+
+#El par (A, 1) aparece dos veces y se suma; el par (C, 2) no tiene capas
+dayDataset = pd.DataFrame({'Destino': ['A', 'B', 'A', 'C', 'B', 'A'], 'SKU': [1, 1, 2, 2, 3, 1], 'Cantidad': [3, 2, 4, 0, 5, 1]},
+                          index=pd.Index([10, 11, 12, 13, 14, 15], name='Fila'))
+
+def test_totals():
+  orderBook = OrderBook(dayDataset)
+  assert orderBook.total == 15
+  assert orderBook.layers('A', 1) == 4 and orderBook.layers('C', 2) == 0 and orderBook.layers('Z', 1) == 0
+  assert orderBook.destinationLayers('A') == 8 and orderBook.skuLayers(1) == 6
+  assert orderBook.destinationsForSku(1) == ['A', 'B'] and orderBook.destinationsForSku(2) == ['A']
+  assert orderBook.skuDestinationCount(9) == 0 and orderBook.destinationsForSku(9) == []
+
+def test_subtract_updates_index_and_totals():
+  orderBook = OrderBook(dayDataset)
+  orderBook.subtract('A', 1, 4)
+  assert orderBook.destinationsForSku(1) == ['B'] and orderBook.skuDestinationCount(1) == 1
+  assert orderBook.total == 11 and orderBook.destinationLayers('A') == 4 and orderBook.skuLayers(1) == 2
+  assert orderBook.modified
+
+def test_subtract_more_than_pending():
+  orderBook = OrderBook(dayDataset)
+  with pytest.raises(ValueError):
+    orderBook.subtract('B', 1, 3)
+  with pytest.raises(ValueError):
+    orderBook.subtract('Z', 1)
+  assert orderBook.total == 15 and not orderBook.modified
+
+def test_toDataFrame_keeps_first_rows_in_order():
+  orderBook = OrderBook(dayDataset)
+  orderBook.subtract('B', 3, 5)
+  expected = pd.DataFrame({'Destino': ['A', 'B', 'A'], 'SKU': [1, 1, 2], 'Cantidad': [4, 2, 4]}, index=pd.Index([10, 11, 12], name='Fila'))
+  pd.testing.assert_frame_equal(orderBook.toDataFrame(), expected, check_dtype=False)
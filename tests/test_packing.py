@@ -0,0 +1,75 @@
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import packing
+from palletizing_sim import Simulation, layersPerPallet
+
+def test_exactSubset_uses_fewest_items():
+  chosen = packing.exactSubset([5, 4, 6, 9, 1], 15)
+  assert sorted(chosen) == [2, 3]
+  assert packing.exactSubset([4, 4, 4], 15) == []
+
+@pytest.mark.parametrize('splitSkus', [False, True])
+def test_packDestination_invariants(splitSkus):
+  skus = [1, 2, 3, 4, 5, 6]
+  quantities = [32, 7, 8, 11, 6, 3]
+  assignments = packing.packDestination(skus, quantities, layersPerPallet, splitSkus=splitSkus)
+  assignmentDF = pd.DataFrame(assignments, columns=['Pallet', 'SKU', 'Cantidad'])
+  assert assignmentDF.groupby('SKU')['Cantidad'].sum().to_dict() == dict(zip(skus, quantities))
+  palletLayers = assignmentDF.groupby('Pallet')['Cantidad'].sum()
+  assert (palletLayers <= layersPerPallet).all()
+  assert list(palletLayers.index) == list(range(1, len(palletLayers) + 1))
+  if splitSkus:
+    assert len(palletLayers) == math.ceil(sum(quantities)/layersPerPallet)
+    assert (palletLayers.iloc[:-1] == layersPerPallet).all()
+  else:
+    partial = assignmentDF[assignmentDF['Cantidad'] < layersPerPallet]
+    assert not partial['SKU'].duplicated().any()                    #Sin dividir, el resto de cada SKU va en un único pallet
+
+@pytest.fixture(scope='module')
+def dayAssignment(ordersCSV):
+  sim = Simulation(ordersCSV, useCache=False)
+  sim.getSimulationDayDataset(sim.days.iloc[0], sim.datasetForRobot(30))
+  return sim.dayDataset, sim.exitPalletDefinition()
+
+def test_packDay_preserves_demand(dayAssignment):
+  dayDataset, assignmentDF = dayAssignment
+  demand = dayDataset[dayDataset['Cantidad'] > 0].groupby(['Destino', 'SKU'])['Cantidad'].sum()
+  pd.testing.assert_series_equal(assignmentDF.groupby(['Destino', 'SKU'])['Cantidad'].sum(), demand, check_dtype=False)
+  assert (assignmentDF.groupby(['Destino', 'Pallet'])['Cantidad'].sum() <= layersPerPallet).all()
+  summaryDF = packing.packingSummary(assignmentDF, layersPerPallet)
+  assert (summaryDF['Exceso'] >= 0).all()
+
+def test_packDay_destination_order():
+  dayDataset = pd.DataFrame({'Destino': ['B', 'A', 'B', 'C'], 'SKU': [1, 2, 3, 4], 'Cantidad': [5, 15, 0, 2]})
+  assignmentDF = packing.packDay(dayDataset, layersPerPallet, destinations=['C', 'A', 'B'])
+  assert pd.unique(assignmentDF['Destino']).tolist() == ['C', 'A', 'B']
+  assert 3 not in set(assignmentDF['SKU'])
+
+@pytest.mark.parametrize('numPalletsEntry', [1, 3, 6])
+def test_groupExitPallets_invariants(dayAssignment, numPalletsEntry):
+  _, assignmentDF = dayAssignment
+  palletsEntrada, palletsSalida = packing.groupExitPallets(assignmentDF, numPalletsEntry, layersPerPallet)
+
+  #Cada pallet de salida queda en un único grupo y se conservan todas las filas
+  assert len(palletsSalida) == len(assignmentDF)
+  assert (palletsSalida.groupby(['Destino', 'Pallet'])['Grupo'].nunique() == 1).all()
+  pd.testing.assert_frame_equal(palletsSalida.sort_values(['Destino', 'Pallet', 'SKU']).drop(columns='Grupo').reset_index(drop=True),
+                                assignmentDF.sort_values(['Destino', 'Pallet', 'SKU']).reset_index(drop=True))
+
+  #Cada grupo entra en las posiciones de entrada, salvo un pallet que por sí solo tiene más SKUs
+  groupSkus = palletsSalida.groupby('Grupo')['SKU'].nunique()
+  palletSkus = palletsSalida.groupby(['Grupo', 'Destino', 'Pallet'])['SKU'].nunique().groupby(level='Grupo').max()
+  assert (groupSkus <= np.maximum(numPalletsEntry, palletSkus)).all()
+
+  #Pallets de entrada necesarios por grupo y SKU
+  layers = palletsSalida.groupby(['Grupo', 'SKU'])['Cantidad'].sum()
+  expected = (-(-layers // layersPerPallet)).rename('CantidadPallets').reset_index()
+  pd.testing.assert_frame_equal(palletsEntrada.reset_index(drop=True), expected, check_dtype=False)
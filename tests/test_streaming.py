@@ -0,0 +1,39 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from palletizing_sim import DataAnalysis, Simulation
+
+def test_streamDays_matches_full_load(ordersCSV):
+  full = DataAnalysis(ordersCSV, useCache=False)
+  streamed = list(DataAnalysis().streamDays(ordersCSV, chunkSize=97))   #Bloques que cortan los días
+  assert [day for day, _ in streamed] == list(full.days)
+  for day, dayDF in streamed:
+    expected = full.fileDF[full.fileDF.index.normalize() == day]
+    pd.testing.assert_frame_equal(dayDF, expected)
+
+def test_streamDays_rejects_unsorted_file(ordersCSV, tmp_path):
+  ordersDF = pd.read_csv(ordersCSV, sep=';', encoding='latin-1')
+  unsortedPath = str(tmp_path / 'unsorted.csv')
+  ordersDF.iloc[::-1].to_csv(unsortedPath, sep=';', index=False, encoding='latin-1')
+  with pytest.raises(ValueError):
+    list(DataAnalysis().streamDays(unsortedPath, chunkSize=97))
+
+def test_streamSimulation_matches_full_run(ordersCSV):
+  full = Simulation(ordersCSV, useCache=False)
+  robotDF = full.datasetForRobot(20)
+  rng = np.random.default_rng(5)                                    #Un generador compartido por todos los días, como streamSimulation
+  expected = []
+  for day in full.days:
+    full.resetSimulation()
+    full.getSimulationDayDataset(day, robotDF)
+    full.daySimulation(6, rng=rng)
+    expected += [{'Fecha': day, **full.getDayMetrics()}]
+
+  rows = list(Simulation().streamSimulation(ordersCSV, 20, 6, chunkSize=97, rng=np.random.default_rng(5)))
+  assert rows == expected
@@ -0,0 +1,88 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import replay
+from movement_trace import MovementTrace, loadDestinations, loadTrace, traceMove, traceOpen
+from palletizing_sim import Simulation
+
+def test_file_trace_matches_memory_trace(tmp_path):
+  path = str(tmp_path / 'trace.npy')
+  longName = 'Destino con un nombre bastante más largo que dieciséis caracteres'
+  inMemory = MovementTrace()
+  with MovementTrace(path, bufferRows=3) as onDisk:               #Varios volcados parciales
+    for step in range(10):
+      for trace in (inMemory, onDisk):
+        trace.append(pd.Timestamp('2023-03-01'), step, step, 1000 + step, 50 + step, longName if step % 2 else 'C001', step % 4 + 1)
+      if step == 4:
+        onDisk.append(pd.Timestamp('2023-03-01'), step, -1, -1, 99, 'C002', 0, traceOpen)
+        inMemory.append(pd.Timestamp('2023-03-01'), step, -1, -1, 99, 'C002', 0, traceOpen)
+  assert len(onDisk) == 11
+  np.testing.assert_array_equal(loadTrace(path), inMemory.toArray())
+  assert list(loadDestinations(path)) == ['C001', longName, 'C002']
+  assert list(replay._destinationNames(path, loadTrace(path)['destination'][:2])) == ['C001', longName]
+
+@pytest.fixture(params=[False, True], ids=['unlimited', 'limited'])
+def tracedRun(request, ordersCSV, tmp_path):
+  """Simula todos los días con traza en archivo y guarda simulationRecord, métricas y pallets completados de cada día"""
+  path = str(tmp_path / 'trace.npy')
+  trace = MovementTrace(path, bufferRows=64)
+  sim = Simulation(ordersCSV, useCache=False, trace=trace)
+  robotDF = sim.datasetForRobot(20)
+  records, metrics, pallets = [], {}, []
+  for k, day in enumerate(sim.days):
+    sim.resetSimulation()
+    sim.getSimulationDayDataset(day, robotDF)
+    sim.daySimulation(6, rng=np.random.default_rng(k), limited=request.param, maxExitPallets=4,
+                      entryPolicy='demand' if k % 2 else 'random')
+    recordDF = sim.simulationRecord
+    recordDF.index = pd.MultiIndex.from_arrays([pd.DatetimeIndex([day]*len(recordDF)), recordDF.index], names=['Fecha', 'Paso'])
+    records += [recordDF]
+    metrics[day] = sim.getDayMetrics()
+    pallets += [(day, pallet) for pallet in sim.completedExitPallets]
+  trace.close()
+  return path, pd.concat(records), metrics, pallets
+
+def test_replayRecord_matches_simulationRecord(tracedRun):
+  path, recordDF, _, _ = tracedRun
+  replayedDF = replay.replayRecord(path)
+  assert list(replayedDF.columns) == list(recordDF.columns)
+  pd.testing.assert_frame_equal(replayedDF, recordDF, check_dtype=False)
+
+def test_summaryStats_matches_day_metrics(tracedRun):
+  path, _, metrics, _ = tracedRun
+  statsDF = replay.summaryStats(path)
+  for day, dayMetrics in metrics.items():
+    for column in ['BatchTransfers', 'TransferedLayers', 'MaxExitPallets', 'PalletChanges']:
+      assert statsDF.loc[day, column] == dayMetrics[column]
+
+def test_palletCompositions_matches_layerListToDF(tracedRun):
+  path, _, _, pallets = tracedRun
+  compositionsDF = replay.palletCompositions(path)
+  for day, pallet in pallets:
+    palletDF = compositionsDF[compositionsDF['Pallet'] == pallet.id]
+    assert (palletDF['Fecha'] == day).all() and (palletDF['Destino'] == pallet.destination).all()
+    expected = pallet.layerListToDF()
+    assert palletDF['Capa'].tolist() == expected['Capa'].tolist() and palletDF['SKU'].tolist() == expected['SKU'].tolist()
+
+def test_batchHistogram_counts_only_moves(tracedRun):
+  path, _, metrics, _ = tracedRun
+  trace = loadTrace(path)
+  assert (trace['kind'] != traceMove).any()
+  histogramDF = replay.batchHistogram(path)
+  assert histogramDF.sum(axis=1).to_dict() == {day: dayMetrics['BatchTransfers'] for day, dayMetrics in metrics.items()}
+
+def test_replayRecord_with_record_stride(ordersCSV):
+  trace = MovementTrace()
+  sim = Simulation(ordersCSV, useCache=False, recordStride=5, trace=trace)
+  day = sim.days.iloc[0]
+  sim.getSimulationDayDataset(day, sim.datasetForRobot(20))
+  sim.daySimulation(6, rng=np.random.default_rng(0))
+  replayedDF = replay.replayRecord(trace).loc[day]
+  assert len(replayedDF) > len(sim.simulationRecord)
+  pd.testing.assert_frame_equal(replayedDF.loc[sim.simulationRecord.index], sim.simulationRecord, check_dtype=False, check_names=False)